@@ -1,28 +1,42 @@
 from flask import Flask
 from app.config import Config
-from app.auth.manager import CompleteAuthenticationManager
-from app.clients import HemoesClient, DetranClient, SesaClient
-from app.agents.factory import AgentFactory
+from app.agents.runtime import AgentRuntime
 from app.routes import register_blueprints
+from app.utils.admission import AdmissionController
+from app.utils.orgao_classifier import OrgaoClassifier
+from app.utils.profiling import SamplingProfiler
+from app.utils.sessions import SessionStore
 
 def create_app():
     """Factory para criar e configurar uma instância da aplicação Flask."""
     app = Flask(__name__)
     app.config.from_object(Config)
     
-    # Inicializar componentes
-    auth_manager = CompleteAuthenticationManager()
+    # Autenticação, registro de clientes (injetado nas ferramentas) e agentes, sem dependência do Flask
+    runtime = AgentRuntime.from_config()
+    app.runtime = runtime
+    app.auth_manager = runtime.auth_manager
+    app.clients = runtime.clients
+    app.agents = runtime.agents
+    app.agent_tiers = runtime.agent_tiers
     
-    # Registrar clientes
-    app.clients = {
-        'hemoes': HemoesClient(auth_manager),
-        'detran': DetranClient(auth_manager),
-        'sesa': SesaClient(auth_manager)
-    }
+    # Escopos de sistema declarados pelos clientes, aquecidos em segundo plano (ver /ready)
+    if Config.AUTH_WARMUP_ON_STARTUP:
+        app.auth_manager.warm_up_async()
     
-    # Registrar agentes
-    agent_factory = AgentFactory()
-    app.agents = agent_factory.create_all_agents()
+    # Classificador local de órgão da rota unificada /query
+    app.classifier = OrgaoClassifier.from_agents(app.agents)
+    
+    # Controle de admissão das rotas de agentes
+    app.admission = AdmissionController.from_config()
+    
+    # Sessões de conversa (conversation_id) das rotas de agentes
+    app.sessions = SessionStore.from_config()
+    
+    # Profiling sob demanda (acionável em /admin/profiling)
+    app.profiler = SamplingProfiler.from_config()
+    if Config.PROFILING_ENABLED:
+        app.profiler.start()
     
     # Registrar blueprints/rotas
     register_blueprints(app)
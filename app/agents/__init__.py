@@ -1,3 +1,4 @@
 from .factory import AgentFactory
+from .runtime import AgentRuntime, run_query
 
-__all__ = ['AgentFactory']
\ No newline at end of file
+__all__ = ['AgentFactory', 'AgentRuntime', 'run_query']
\ No newline at end of file
@@ -1,27 +1,89 @@
 import os
-from typing import Dict
+import logging
+from typing import Any, Callable, Dict, List, Mapping, Optional
 from crewai import Agent
 from langchain_openai import ChatOpenAI
 from app.config import Config
+from app.llm import DiskCompletionCache, LlmTimingCallback
+from app.utils.logging_setup import truncate_body
 from app.tools import (
-    HemoesGetDoadorTool, HemoesGetDoacaoTool,
+    HemoesGetDoadorTool, HemoesGetDoacaoTool, HemoesGetDoadoresTool, HemoesGetDoacoesTool,
     DetranSearchVehiclesTool, DetranFetchProfileTool, DetranAtualizarVeiculosTool,
     SesaGetMunicipiosTool, SesaGetServicosTool, SesaGetUnidadesTool,
-    SesaGetHorariosTool, SesaGetSugestaoAgendamentoTool, SesaReservarHorarioTool,
-    SesaCheckAgendamentoExistenteTool, SesaCancelarAgendamentoTool
+    SesaGetHorariosTool, SesaBuscarHorariosDisponiveisTool, SesaGetSugestaoAgendamentoTool,
+    SesaReservarHorarioTool, SesaCheckAgendamentoExistenteTool, SesaCancelarAgendamentoTool,
+    ExecutarEmParaleloTool
 )
 
+step_logger = logging.getLogger('app.agents.steps')
+
+def _step_logger(orgao: str) -> Callable[[Any], None]:
+    """Callback de passo do agente que registra ações e observações no logging (nível DEBUG)."""
+    def log_step(step: Any):
+        if not step_logger.isEnabledFor(logging.DEBUG):
+            return
+        passos = step if isinstance(step, list) else [step]
+        for passo in passos:
+            if isinstance(passo, tuple) and len(passo) == 2:
+                action, observation = passo
+                step_logger.debug("Passo do agente %s: ferramenta=%s entrada=%s observacao=%s",
+                                  orgao, getattr(action, 'tool', None),
+                                  truncate_body(getattr(action, 'tool_input', '')),
+                                  truncate_body(observation))
+            else:
+                step_logger.debug("Passo do agente %s: %s", orgao,
+                                  truncate_body(getattr(passo, 'return_values', passo)))
+    return log_step
+
+def _with_parallel(tools: List[Any]) -> List[Any]:
+    """Acrescenta a ferramenta de execução em lote sobre as ferramentas do agente."""
+    if not Config.TOOL_PARALLEL_ENABLED:
+        return tools
+    return tools + [ExecutarEmParaleloTool.for_tools(tools)]
+
 class AgentFactory:
     """Factory para criar agentes CrewAI."""
     
-    def __init__(self):
-        self.llm = ChatOpenAI(
-            model=Config.OPENAI_MODEL,
-            api_key=Config.OPENAI_API_KEY,
-            temperature=Config.LLM_TEMPERATURE
-        )
+    def __init__(self, clients: Mapping[str, Any]):
+        # Registro de clientes de API entregue às ferramentas (app.clients.ClientRegistry)
+        self.clients = clients
+        self.llm_cache = None
+        if Config.LLM_CACHE_ENABLED:
+            self.llm_cache = DiskCompletionCache(
+                path=Config.LLM_CACHE_PATH,
+                ttl=Config.LLM_CACHE_TTL,
+                max_bytes=Config.LLM_CACHE_MAX_BYTES,
+                pii_policy=Config.LLM_CACHE_PII_POLICY
+            )
+        
+        self._llms: Dict[str, ChatOpenAI] = {}
+        self.llm_timing = LlmTimingCallback()
+        self.llm = self.get_llm(Config.OPENAI_MODEL)
+
+    def get_llm(self, model: str) -> ChatOpenAI:
+        """Retorna (e reaproveita) o cliente de LLM para um modelo."""
+        if model not in self._llms:
+            self._llms[model] = ChatOpenAI(
+                model=model,
+                api_key=Config.OPENAI_API_KEY,
+                temperature=Config.LLM_TEMPERATURE,
+                cache=self.llm_cache,
+                callbacks=[self.llm_timing]
+            )
+        return self._llms[model]
 
-    def create_hemoes_agent(self) -> Agent:
+    def _agent_options(self, orgao: str, llm: Optional[ChatOpenAI], max_iter: Optional[int]) -> Dict:
+        """Opções comuns a todos os agentes."""
+        return {
+            'llm': llm or self.llm,
+            'max_iter': max_iter or Config.agent_limits(orgao)['max_iter'],
+            'verbose': Config.AGENT_VERBOSE,
+            'step_callback': _step_logger(orgao),
+            'allow_delegation': False
+        }
+
+    def create_hemoes_agent(self, llm: Optional[ChatOpenAI] = None,
+                            max_iter: Optional[int] = None) -> Agent:
         """Cria agente para HEMOES."""
         return Agent(
             role='Assistente Virtual do HEMOES',
@@ -29,15 +91,20 @@ class AgentFactory:
             backstory=(
                 "Você é um assistente virtual especializado nos serviços do HEMOES. "
                 "Sua principal função é ajudar os usuários a consultar informações sobre doadores por CPF e detalhes de doações por ID. "
+                "Para consultar várias doações (como o histórico de um doador), busque todas de uma vez pelos IDs. "
                 "Responda sempre em português do Brasil e de maneira amigável."
             ),
-            llm=self.llm,
-            tools=[HemoesGetDoadorTool(), HemoesGetDoacaoTool()],
-            verbose=True,
-            allow_delegation=False
+            tools=_with_parallel([
+                HemoesGetDoadorTool(clients=self.clients),
+                HemoesGetDoacaoTool(clients=self.clients),
+                HemoesGetDoadoresTool(clients=self.clients),
+                HemoesGetDoacoesTool(clients=self.clients)
+            ]),
+            **self._agent_options('hemoes', llm, max_iter)
         )
 
-    def create_detran_agent(self) -> Agent:
+    def create_detran_agent(self, llm: Optional[ChatOpenAI] = None,
+                            max_iter: Optional[int] = None) -> Agent:
         """Cria agente para DETRAN."""
         return Agent(
             role='Assistente Virtual do DETRAN-ES',
@@ -47,17 +114,16 @@ class AgentFactory:
                 "Você utiliza ferramentas para consultar veículos, perfis de usuários e atualizar dados. "
                 "Sua comunicação deve ser clara, objetiva e estritamente em português do Brasil."
             ),
-            llm=self.llm,
-            tools=[
-                DetranSearchVehiclesTool(),
-                DetranFetchProfileTool(),
-                DetranAtualizarVeiculosTool()
-            ],
-            verbose=True,
-            allow_delegation=False
+            tools=_with_parallel([
+                DetranSearchVehiclesTool(clients=self.clients),
+                DetranFetchProfileTool(clients=self.clients),
+                DetranAtualizarVeiculosTool(clients=self.clients)
+            ]),
+            **self._agent_options('detran', llm, max_iter)
         )
 
-    def create_sesa_agent(self) -> Agent:
+    def create_sesa_agent(self, llm: Optional[ChatOpenAI] = None,
+                          max_iter: Optional[int] = None) -> Agent:
         """Cria agente para SESA."""
         return Agent(
             role='Assistente Virtual de Saúde Pública',
@@ -65,21 +131,21 @@ class AgentFactory:
             backstory=(
                 "Você é um assistente virtual da Secretaria de Saúde (SESA), projetado para facilitar o acesso aos serviços. "
                 "Você pode listar municípios e serviços, encontrar unidades, verificar horários, obter sugestões, e ajudar a realizar ou cancelar agendamentos. "
+                "Para encontrar o primeiro horário livre, prefira a busca de horários disponíveis em todas as unidades em vez de consultar unidade por unidade. "
                 "Seja sempre prestativo e responda em português do Brasil."
             ),
-            llm=self.llm,
-            tools=[
-                SesaGetMunicipiosTool(),
-                SesaGetServicosTool(),
-                SesaGetUnidadesTool(),
-                SesaGetHorariosTool(),
-                SesaGetSugestaoAgendamentoTool(),
-                SesaReservarHorarioTool(),
-                SesaCheckAgendamentoExistenteTool(),
-                SesaCancelarAgendamentoTool()
-            ],
-            verbose=True,
-            allow_delegation=False
+            tools=_with_parallel([
+                SesaGetMunicipiosTool(clients=self.clients),
+                SesaGetServicosTool(clients=self.clients),
+                SesaGetUnidadesTool(clients=self.clients),
+                SesaGetHorariosTool(clients=self.clients),
+                SesaBuscarHorariosDisponiveisTool(clients=self.clients),
+                SesaGetSugestaoAgendamentoTool(clients=self.clients),
+                SesaReservarHorarioTool(clients=self.clients),
+                SesaCheckAgendamentoExistenteTool(clients=self.clients),
+                SesaCancelarAgendamentoTool(clients=self.clients)
+            ]),
+            **self._agent_options('sesa', llm, max_iter)
         )
 
     def create_all_agents(self) -> Dict[str, Agent]:
@@ -88,4 +154,25 @@ class AgentFactory:
             'hemoes': self.create_hemoes_agent(),
             'detran': self.create_detran_agent(),
             'sesa': self.create_sesa_agent()
-        }
\ No newline at end of file
+        }
+
+    def create_agent_tiers(self, orgao: str) -> List[Agent]:
+        """Cria a cascata de agentes de um órgão, do modelo mais rápido ao mais capaz.
+        
+        Todos os níveis, exceto o último, têm limite de iterações reduzido para que uma
+        consulta difícil seja escalonada cedo.
+        """
+        create = getattr(self, f'create_{orgao}_agent')
+        models = Config.llm_tiers(orgao)
+        return [
+            create(
+                llm=self.get_llm(model),
+                max_iter=(min(Config.LLM_TIER_MAX_ITER, Config.agent_limits(orgao)['max_iter'])
+                          if i < len(models) - 1 else None)
+            )
+            for i, model in enumerate(models)
+        ]
+
+    def create_all_agent_tiers(self) -> Dict[str, List[Agent]]:
+        """Cria as cascatas de agentes de todos os órgãos."""
+        return {orgao: self.create_agent_tiers(orgao) for orgao in ('hemoes', 'detran', 'sesa')}
\ No newline at end of file
@@ -0,0 +1,50 @@
+from typing import Any, Dict, Optional
+from app.auth.manager import CompleteAuthenticationManager
+from app.clients import ClientRegistry
+from app.utils.helpers import process_query_cascade
+from app.utils.sessions import ConversationSession
+from .factory import AgentFactory
+
+class AgentRuntime:
+    """Autenticação, clientes e agentes de todos os órgãos, montados sem a aplicação Flask.
+
+    create_app usa a mesma montagem; jobs de linha de comando e pools de threads ou de
+    processos criam a sua e chamam run() diretamente, sem contexto de aplicação.
+    """
+
+    def __init__(self, auth_manager: CompleteAuthenticationManager, clients: ClientRegistry):
+        self.auth_manager = auth_manager
+        self.clients = clients
+        # Escopos de sistema declarados pelos clientes (aquecidos com auth_manager.warm_up)
+        auth_manager.register_scopes(clients.required_scopes())
+        self.agent_tiers = AgentFactory(clients).create_all_agent_tiers()
+        # Agente principal de cada órgão: o último nível (modelo mais capaz) da cascata
+        self.agents = {orgao: tiers[-1] for orgao, tiers in self.agent_tiers.items()}
+
+    @classmethod
+    def from_config(cls) -> "AgentRuntime":
+        auth_manager = CompleteAuthenticationManager()
+        return cls(auth_manager, ClientRegistry.from_auth_manager(auth_manager))
+
+    def run(self, orgao: str, query: str, user_context: Optional[Dict] = None,
+            session: Optional[ConversationSession] = None) -> Dict[str, Any]:
+        """Processa uma consulta na cascata de agentes do órgão (ex.: 'SESA')."""
+        return process_query_cascade(
+            self.agent_tiers[orgao.lower()],
+            query,
+            orgao.upper(),
+            user_context,
+            self.clients,
+            session=session
+        )
+
+# Um runtime por processo, criado sob demanda pelos workers de um ProcessPoolExecutor
+_process_runtime: Optional[AgentRuntime] = None
+
+def run_query(orgao: str, query: str, user_context: Optional[Dict] = None) -> Dict[str, Any]:
+    """Processa uma consulta com o runtime do processo atual (função de nível de módulo,
+    serializável para pools de processos)."""
+    global _process_runtime
+    if _process_runtime is None:
+        _process_runtime = AgentRuntime.from_config()
+    return _process_runtime.run(orgao, query, user_context)
\ No newline at end of file
@@ -2,9 +2,14 @@ import os
 import base64
 import time
 import logging
-from typing import Dict, Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional
 import requests
-from app.models.types import TokenResponse
+from app.config import Config
+from app.models.records import TokenRecord
+from app.utils.metrics import metrics
+from app.utils.timing import FASE_TOKEN, timed_phase
 
 logger = logging.getLogger(__name__)
 
@@ -28,16 +33,47 @@ class CompleteAuthenticationManager:
         self._user_tokens: Dict[str, str] = {}
         self._user_token_expires: Dict[str, float] = {}
         self._refresh_tokens: Dict[str, str] = {}
+        self._required_scopes = set()
+        self._scope_locks: Dict[str, threading.Lock] = {}
+        self._warm_up_lock = threading.Lock()
 
+    def register_scopes(self, scopes: Iterable[str]):
+        """Registra escopos de sistema exigidos pelos clientes (aquecidos por warm_up)."""
+        self._required_scopes.update(scopes)
+
+    @property
+    def required_scopes(self) -> List[str]:
+        return sorted(self._required_scopes)
+
+    def _has_valid_system_token(self, scope: str) -> bool:
+        return scope in self._system_tokens and time.time() < self._system_token_expires.get(scope, 0)
+
+    def missing_scopes(self) -> List[str]:
+        """Escopos registrados sem token de sistema válido em cache."""
+        return [scope for scope in self.required_scopes if not self._has_valid_system_token(scope)]
+
+    @timed_phase(FASE_TOKEN)
     def get_system_token(self, scope: str) -> Optional[str]:
         """Obtém token de sistema para escopo específico."""
-        if (scope in self._system_tokens and 
-            time.time() < self._system_token_expires.get(scope, 0)):
+        if self._has_valid_system_token(scope):
             return self._system_tokens[scope]
         
+        # Uma única busca por escopo, mesmo com várias threads esperando o token
+        with self._scope_locks.setdefault(scope, threading.Lock()):
+            if self._has_valid_system_token(scope):
+                return self._system_tokens[scope]
+            covered = self._fetch_system_token([scope])
+            return self._system_tokens[scope] if scope in covered else None
+
+    def _fetch_system_token(self, scopes: List[str]) -> List[str]:
+        """Pede um token de sistema para um ou mais escopos e o associa a cada escopo concedido.
+        
+        Retorna os escopos cobertos pelo token obtido (vazio em caso de falha).
+        """
+        scope_str = ' '.join(scopes)
         if not self.client_id or not self.client_secret:
-            logger.critical(f"CLIENT_ID e CLIENT_SECRET são obrigatórios (escopo: {scope}).")
-            return None
+            logger.critical("CLIENT_ID e CLIENT_SECRET são obrigatórios (escopo: %s).", scope_str)
+            return []
         
         try:
             credentials = f"{self.client_id}:{self.client_secret}"
@@ -50,7 +86,7 @@ class CompleteAuthenticationManager:
             
             data = {
                 'grant_type': GRANT_TYPE_CLIENT_CREDENTIALS,
-                'scope': scope
+                'scope': scope_str
             }
             
             response = requests.post(
@@ -61,19 +97,64 @@ class CompleteAuthenticationManager:
             )
             response.raise_for_status()
             
-            token_data: TokenResponse = response.json()
-            self._system_tokens[scope] = token_data['access_token']
-            self._system_token_expires[scope] = (
-                time.time() + token_data.get('expires_in', 3600) - 60
-            )
+            token = TokenRecord.decode(response.json())
+            if token is None:
+                logger.error("Resposta de token de sistema inválida (%s).", scope_str)
+                return []
+            # O servidor pode conceder só parte dos escopos pedidos; sem 'scope', vale o pedido
+            granted = (token.scope or scope_str).split()
+            covered = [scope for scope in scopes if scope in granted]
+            expires = time.time() + token.expires_in - 60
+            for scope in covered:
+                self._system_tokens[scope] = token.access_token
+                self._system_token_expires[scope] = expires
             
-            logger.info(f"Token de sistema obtido com sucesso para escopo: {scope}")
-            return self._system_tokens[scope]
+            logger.info("Token de sistema obtido com sucesso para escopo(s): %s", ' '.join(covered))
+            return covered
             
         except requests.exceptions.RequestException as e:
-            logger.error(f"Erro na requisição ao obter token de sistema ({scope}): {e}")
-            return None
+            logger.error("Erro na requisição ao obter token de sistema (%s): %s", scope_str, e)
+            return []
+
+    def warm_up(self, scopes: Optional[Iterable[str]] = None) -> Dict[str, bool]:
+        """Obtém de antemão os tokens dos escopos registrados (ou dos informados).
+        
+        Tenta primeiro um único token com todos os escopos (se AUTH_MULTI_SCOPE); os escopos
+        não concedidos são pedidos individualmente, em paralelo.
+        """
+        pending = [scope for scope in (scopes or self.required_scopes)
+                   if not self._has_valid_system_token(scope)]
+        inicio = time.monotonic()
+        
+        if len(pending) > 1 and Config.AUTH_MULTI_SCOPE:
+            covered = self._fetch_system_token(pending)
+            pending = [scope for scope in pending if scope not in covered]
+        
+        if pending:
+            with ThreadPoolExecutor(max_workers=min(len(pending), 8)) as executor:
+                list(executor.map(self.get_system_token, pending))
+        
+        status = {scope: self._has_valid_system_token(scope) for scope in (scopes or self.required_scopes)}
+        metrics.observe('auth.warm_up_ms', (time.monotonic() - inicio) * 1000)
+        if not all(status.values()):
+            logger.warning("Aquecimento de tokens incompleto: %s",
+                           ', '.join(scope for scope, ok in status.items() if not ok))
+        return status
+
+    def warm_up_async(self):
+        """Executa warm_up em segundo plano (uma execução por vez)."""
+        if not self._warm_up_lock.acquire(blocking=False):
+            return
+        
+        def run():
+            try:
+                self.warm_up()
+            finally:
+                self._warm_up_lock.release()
+        
+        threading.Thread(target=run, name='auth-warm-up', daemon=True).start()
 
+    @timed_phase(FASE_TOKEN)
     def get_user_token(self, user_id: str, authorization_code: Optional[str] = None, 
                       refresh_token_val: Optional[str] = None) -> Optional[str]:
         """Obtém token de usuário."""
@@ -90,18 +171,18 @@ class CompleteAuthenticationManager:
         if authorization_code:
             return self._get_new_user_token(user_id, authorization_code)
         
-        logger.warning(f"Não foi possível obter token de usuário para user_id: {user_id}.")
+        logger.warning("Não foi possível obter token de usuário para user_id: %s.", user_id)
         return None
 
-    def _update_user_token_data(self, user_id: str, token_data: TokenResponse):
+    def _update_user_token_data(self, user_id: str, token: TokenRecord):
         """Atualiza dados do token de usuário."""
-        self._user_tokens[user_id] = token_data['access_token']
+        self._user_tokens[user_id] = token.access_token
         self._user_token_expires[user_id] = (
-            time.time() + token_data.get('expires_in', 3600) - 60
+            time.time() + token.expires_in - 60
         )
         
-        if 'refresh_token' in token_data and token_data['refresh_token']:
-            self._refresh_tokens[user_id] = token_data['refresh_token']
+        if token.refresh_token:
+            self._refresh_tokens[user_id] = token.refresh_token
 
     def _get_new_user_token(self, user_id: str, authorization_code: str) -> Optional[str]:
         """Obtém novo token de usuário com código de autorização."""
@@ -147,10 +228,13 @@ class CompleteAuthenticationManager:
             )
             response.raise_for_status()
             
-            token_data: TokenResponse = response.json()
-            self._update_user_token_data(user_id, token_data)
+            token = TokenRecord.decode(response.json())
+            if token is None:
+                logger.error("Resposta de token de usuário inválida (%s).", user_id)
+                return None
+            self._update_user_token_data(user_id, token)
             return self._user_tokens[user_id]
             
         except requests.exceptions.RequestException as e:
-            logger.error(f"Erro na requisição ao obter token de usuário ({user_id}): {e}")
+            logger.error("Erro na requisição ao obter token de usuário (%s): %s", user_id, e)
             return None
\ No newline at end of file
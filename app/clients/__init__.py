@@ -2,10 +2,12 @@ from .base import BaseApiClient
 from .hemoes import HemoesClient
 from .detran import DetranClient
 from .sesa import SesaClient
+from .registry import ClientRegistry
 
 __all__ = [
     'BaseApiClient',
     'HemoesClient',
     'DetranClient',
-    'SesaClient'
+    'SesaClient',
+    'ClientRegistry'
 ]
\ No newline at end of file
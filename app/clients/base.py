@@ -1,7 +1,15 @@
 import logging
 import re
-from typing import Dict, Any, TYPE_CHECKING
+import time
+from typing import Dict, Any, Hashable, Union, TYPE_CHECKING
 import requests
+from app.config import Config
+from app.utils.logging_setup import truncate_body
+from app.utils.metrics import metrics
+from app.utils.raw_response import RawResponse, invalid_json
+from app.utils.timing import record_upstream
+from .http_cache import CachedResponse, HttpCachePolicy, HttpResponseCache, principal_for
+from .pacing import AdaptiveLimiter
 
 if TYPE_CHECKING:
     from app.auth.manager import CompleteAuthenticationManager
@@ -10,37 +18,167 @@ logger = logging.getLogger(__name__)
 
 APPLICATION_JSON = 'application/json'
 
+class ResponseTooLarge(Exception):
+    """Corpo de resposta acima de Config.RESPONSE_MAX_BYTES."""
+
+    def __init__(self, size: int):
+        super().__init__(f"{size} bytes")
+        self.size = size
+
 class BaseApiClient:
     """Classe base para clientes de API com lógica de requisição centralizada."""
     
+    # Nome do cliente nas políticas de cache (Config.HTTP_CACHE_POLICIES) e nas métricas
+    NAME = 'base'
+    # Escopos de token de sistema usados pelo cliente (aquecidos na inicialização)
+    REQUIRED_SCOPES: tuple = ()
+    
     def __init__(self, auth_manager: "CompleteAuthenticationManager"):
         self.base_url = auth_manager.base_url
         self.auth_manager = auth_manager
+        self.cache_policy = HttpCachePolicy.from_dict(Config.http_cache_policy(self.NAME))
+        self.http_cache = None
+        if self.cache_policy.enabled:
+            self.http_cache = HttpResponseCache(
+                max_bytes=Config.HTTP_CACHE_MAX_BYTES,
+                max_entries=Config.HTTP_CACHE_MAX_ENTRIES
+            )
+        # Limite adaptativo de requisições simultâneas ao serviço (ver app/clients/pacing.py)
+        self.limiter = None
+        if Config.PACING_ENABLED:
+            self.limiter = AdaptiveLimiter.from_config(self.NAME, Config.pacing_options(self.NAME))
 
-    def _make_request(self, method: str, endpoint: str, **kwargs) -> Dict[str, Any]:
-        """Método central para fazer requisições e tratar erros comuns."""
+    def _cache_key(self, endpoint: str, kwargs: Dict[str, Any]) -> Hashable:
+        """Chave do cache HTTP: URL, parâmetros e titular da credencial."""
+        params = kwargs.get('params') or {}
+        items = params.items() if isinstance(params, dict) else params
+        return (endpoint, tuple(sorted((str(k), str(v)) for k, v in items)), principal_for(kwargs.get('headers')))
+
+    def _read_body(self, response: requests.Response) -> bytes:
+        """Lê o corpo da resposta respeitando RESPONSE_MAX_BYTES."""
+        limite = Config.RESPONSE_MAX_BYTES
+        declarado = response.headers.get('Content-Length')
+        if declarado and declarado.isdigit() and int(declarado) > limite:
+            raise ResponseTooLarge(int(declarado))
+        body = bytearray()
+        for chunk in response.iter_content(chunk_size=65536):
+            body.extend(chunk)
+            if len(body) > limite:
+                raise ResponseTooLarge(len(body))
+        return bytes(body)
+
+    def _make_raw_request(self, method: str, endpoint: str, cache: bool = True,
+                          **kwargs) -> Union[RawResponse, Dict[str, Any]]:
+        """Faz a requisição e devolve o corpo bruto (RawResponse), sem decodificar o JSON.
+        
+        GETs passam pelo cache HTTP do cliente (quando habilitado): respostas válidas são
+        servidas localmente e as vencidas, revalidadas com If-None-Match/If-Modified-Since.
+        Use cache=False para ignorar o cache em uma chamada. Erros são devolvidos como
+        dicionário com a chave 'error', como em _make_request.
+        """
+        is_get = method.lower() == 'get'
+        use_cache = (cache and is_get and self.http_cache is not None
+                     and self.cache_policy.cacheable(endpoint))
+        entry = None
+        if use_cache:
+            key = self._cache_key(endpoint, kwargs)
+            entry = self.http_cache.get(key)
+            if entry is not None and entry.fresh:
+                metrics.incr(f"http_cache.{self.NAME}.hits")
+                metrics.incr(f"http_cache.{self.NAME}.bytes_economizados", len(entry.content))
+                return RawResponse(entry.content)
+            if entry is not None and entry.revalidatable:
+                kwargs['headers'] = {**(kwargs.get('headers') or {}), **entry.conditional_headers()}
+            else:
+                entry = None
+        
+        if self.limiter is not None and not self.limiter.acquire():
+            logger.warning("Limite de requisições simultâneas a %s esgotado; chamada para %s recusada.",
+                           self.NAME, endpoint)
+            return {
+                "error": "Upstream Saturated",
+                "message": "O serviço está sobrecarregado; tente novamente em instantes."
+            }
+        
+        # Resultado observado pelo limitador: latência até os cabeçalhos (None = sem resposta)
+        latency = status = headers = None
+        inicio = time.perf_counter()
         try:
-            response = requests.request(method, endpoint, timeout=30, **kwargs)
-            response.raise_for_status()
-            return response.json() if response.content else {"success": True}
+            with requests.request(method, endpoint, timeout=30, stream=True, **kwargs) as response:
+                latency = response.elapsed.total_seconds()
+                status, headers = response.status_code, response.headers
+                content = self._read_body(response)
+            
+            if entry is not None and response.status_code == 304:
+                entry.refresh(self.cache_policy.ttl_for(endpoint, response.headers) or 0.0)
+                metrics.incr(f"http_cache.{self.NAME}.revalidacoes")
+                metrics.incr(f"http_cache.{self.NAME}.bytes_economizados", len(entry.content))
+                return RawResponse(entry.content)
+            if response.status_code >= 400:
+                logger.error("Erro HTTP em %s: %s - %s", endpoint, response.status_code,
+                             truncate_body(content.decode('utf-8', errors='replace')))
+                return {
+                    "error": f"HTTP Error {response.status_code}",
+                    "message": "Erro na comunicação com o serviço."
+                }
+            
+            if use_cache:
+                self._store(key, endpoint, response, content)
+            elif not is_get and self.http_cache is not None:
+                # Métodos não seguros invalidam as respostas armazenadas da mesma URL (RFC 9111, 4.4)
+                self.http_cache.invalidate_url(endpoint)
+            return RawResponse(content, response.status_code, response.headers)
+        except ResponseTooLarge as e:
+            logger.error("Resposta de %s excede o limite de %d bytes (%d bytes).",
+                         endpoint, Config.RESPONSE_MAX_BYTES, e.size)
+            metrics.incr(f"respostas.{self.NAME}.excedidas")
+            return {
+                "error": "Response Too Large",
+                "message": "A resposta do serviço excede o tamanho máximo permitido."
+            }
         except requests.exceptions.Timeout:
-            logger.error(f"Timeout na chamada para {endpoint}")
+            logger.error("Timeout na chamada para %s", endpoint)
             return {
                 "error": "Timeout",
                 "message": "A requisição demorou muito para responder."
             }
-        except requests.exceptions.HTTPError as e:
-            logger.error(f"Erro HTTP em {endpoint}: {e.response.status_code} - {e.response.text}")
-            return {
-                "error": f"HTTP Error {e.response.status_code}",
-                "message": "Erro na comunicação com o serviço."
-            }
         except requests.exceptions.RequestException as e:
-            logger.error(f"Erro de requisição para {endpoint}: {e}")
+            logger.error("Erro de requisição para %s: %s", endpoint, e)
             return {
                 "error": str(e),
                 "message": "Não foi possível conectar ao serviço."
             }
+        finally:
+            record_upstream(self.NAME, time.perf_counter() - inicio)
+            if self.limiter is not None:
+                self.limiter.release(latency, status, headers)
+
+    def _make_request(self, method: str, endpoint: str, cache: bool = True, **kwargs) -> Dict[str, Any]:
+        """Método central para fazer requisições e tratar erros comuns."""
+        result = self._make_raw_request(method, endpoint, cache=cache, **kwargs)
+        if not isinstance(result, RawResponse):
+            return result
+        try:
+            return result.json()
+        except ValueError as e:
+            logger.error("Resposta inválida de %s: %s", endpoint, e)
+            return invalid_json()
+
+    def _store(self, key: Hashable, endpoint: str, response: requests.Response, content: bytes):
+        """Armazena uma resposta GET bem-sucedida conforme a política do cliente."""
+        metrics.incr(f"http_cache.{self.NAME}.misses")
+        ttl = self.cache_policy.ttl_for(endpoint, response.headers)
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if ttl is None or (ttl <= 0 and not (etag or last_modified)):
+            return
+        self.http_cache.set(key, CachedResponse(content, etag, last_modified, ttl))
+        metrics.incr(f"http_cache.{self.NAME}.armazenados")
+        metrics.set_gauge(f"http_cache.{self.NAME}.bytes", self.http_cache.size)
+
+    def _is_error(self, result: Any) -> bool:
+        """Indica se o resultado de _make_request/_make_raw_request representa um erro."""
+        return isinstance(result, dict) and 'error' in result
 
     def _clean_cpf(self, cpf: str) -> str:
         """Remove caracteres não numéricos do CPF."""
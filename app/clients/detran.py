@@ -1,6 +1,14 @@
+import hashlib
+import json
+import logging
 from typing import Dict, Any, List, Optional
 from .base import BaseApiClient
+from app.config import Config
 from app.models.types import Veiculo, AtualizarVeiculosPayload
+from app.utils.cache import TTLCache
+from app.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
 
 # Constantes específicas do DETRAN
 SCOPE_DETRAN_VEHICLES = 'detran_vehicles'
@@ -8,9 +16,58 @@ SOURCE_DETRAN = 'DETRAN'
 SERVICE_CODE_MEUS_VEICULOS = 'meusVeiculos'
 HEADER_AUTH = 'Authorization'
 
+def _hash_payload(payload: AtualizarVeiculosPayload) -> str:
+    """Hash compacto e canônico do conteúdo de um payload de veículos."""
+    canonical = json.dumps(payload, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.blake2b(canonical.encode('utf-8'), digest_size=16).hexdigest()
+
+def _chave_veiculo(veiculo: Dict[str, Any]) -> str:
+    """Identificador estável de um veículo (id, ou placa na falta dele)."""
+    return str(veiculo.get('id') or veiculo.get('plate'))
+
+def _extrair_veiculos_perfil(profile: Any) -> Optional[List[Veiculo]]:
+    """Localiza a lista de veículos do serviço 'meusVeiculos' dentro do perfil do cidadão."""
+    if isinstance(profile, dict):
+        if profile.get('serviceCode') == SERVICE_CODE_MEUS_VEICULOS:
+            data = profile.get('data') or {}
+            veiculos = data.get('veiculos') if isinstance(data, dict) else None
+            return veiculos if isinstance(veiculos, list) else None
+        children = profile.values()
+    elif isinstance(profile, list):
+        children = profile
+    else:
+        return None
+    
+    for child in children:
+        veiculos = _extrair_veiculos_perfil(child)
+        if veiculos is not None:
+            return veiculos
+    return None
+
+def diff_veiculos(atuais: List[Veiculo], novos: List[Veiculo]) -> Dict[str, List[Veiculo]]:
+    """Compara duas listas de veículos e retorna os adicionados, removidos e alterados."""
+    antes = {_chave_veiculo(v): v for v in atuais}
+    depois = {_chave_veiculo(v): v for v in novos}
+    return {
+        "adicionados": [v for k, v in depois.items() if k not in antes],
+        "removidos": [v for k, v in antes.items() if k not in depois],
+        "alterados": [v for k, v in depois.items() if k in antes and antes[k] != v]
+    }
+
 class DetranClient(BaseApiClient):
     """Cliente para APIs do DETRAN."""
     
+    NAME = 'detran'
+    REQUIRED_SCOPES = (SCOPE_DETRAN_VEHICLES,)
+    
+    def __init__(self, auth_manager):
+        super().__init__(auth_manager)
+        # user_id -> hash do último payload de veículos enviado com sucesso
+        self._pushed_hashes = TTLCache(
+            ttl=Config.DETRAN_PUSH_HASH_TTL,
+            max_entries=Config.DETRAN_PUSH_HASH_MAX_ENTRIES
+        )
+    
     def _get_auth_header(self, token: str) -> Dict[str, str]:
         """Retorna headers com autenticação Bearer."""
         headers = self._get_basic_headers()
@@ -50,18 +107,14 @@ class DetranClient(BaseApiClient):
         return self._make_request("get", endpoint, headers=headers)
 
     def atualizar_veiculos(self, user_id: str, veiculos: List[Veiculo], 
-                          user_token_override: Optional[str] = None) -> Dict[str, Any]:
-        """Atualiza a lista de veículos no perfil de um cidadão."""
-        user_token = user_token_override or self.auth_manager.get_user_token(user_id)
-        
-        if not user_token:
-            return {
-                "error": "Authentication Error",
-                "message": f"Token de usuário para DETRAN (user_id: {user_id}) não obtido."
-            }
-        
-        headers = self._get_auth_header(user_token)
+                          user_token_override: Optional[str] = None,
+                          force: bool = False,
+                          comparar_com_perfil: bool = False) -> Dict[str, Any]:
+        """Atualiza a lista de veículos no perfil de um cidadão.
         
+        O PATCH é omitido quando o conteúdo é idêntico ao último enviado com sucesso para o
+        usuário ou, com comparar_com_perfil, ao que já consta no perfil (exceto com force).
+        """
         payload: AtualizarVeiculosPayload = {
             "source": SOURCE_DETRAN,
             "serviceCodesData": [
@@ -71,7 +124,51 @@ class DetranClient(BaseApiClient):
                 }
             ]
         }
+        payload_hash = _hash_payload(payload)
+        
+        # O token é resolvido antes da comparação: sem autenticação não se revela o último envio
+        user_token = user_token_override or self.auth_manager.get_user_token(user_id)
+        
+        if not user_token:
+            return {
+                "error": "Authentication Error",
+                "message": f"Token de usuário para DETRAN (user_id: {user_id}) não obtido."
+            }
         
+        if not force and self._pushed_hashes.get(user_id) == payload_hash:
+            metrics.incr('detran.atualizar_veiculos.ignorados')
+            return {
+                "success": True,
+                "skipped": True,
+                "message": "Lista de veículos idêntica à última enviada; nenhuma atualização necessária."
+            }
+        
+        diff = None
+        if comparar_com_perfil and not force:
+            profile = self.fetch_user_profile(user_id, user_token_override=user_token)
+            atuais = None if self._is_error(profile) else _extrair_veiculos_perfil(profile)
+            if atuais == veiculos:
+                self._pushed_hashes.set(user_id, payload_hash)
+                metrics.incr('detran.atualizar_veiculos.ignorados')
+                return {
+                    "success": True,
+                    "skipped": True,
+                    "message": "O perfil já contém esta lista de veículos; nenhuma atualização necessária."
+                }
+            if atuais is not None:
+                diff = diff_veiculos(atuais, veiculos)
+        
+        headers = self._get_auth_header(user_token)
         endpoint = f"{self.base_url}/v1/profile/external-data"
         
-        return self._make_request("patch", endpoint, headers=headers, json=payload)
\ No newline at end of file
+        result = self._make_request("patch", endpoint, headers=headers, json=payload)
+        
+        if self._is_error(result):
+            metrics.incr('detran.atualizar_veiculos.falhas')
+            return result
+        
+        self._pushed_hashes.set(user_id, payload_hash)
+        metrics.incr('detran.atualizar_veiculos.enviados')
+        if diff is not None and isinstance(result, dict):
+            result = dict(result, diff=diff)
+        return result
\ No newline at end of file
@@ -1,9 +1,15 @@
-from typing import Dict, Any
+from typing import Dict, Any, Iterable, List
 from .base import BaseApiClient
+from app.config import Config
+from app.models.records import DoadorRecord, DoacaoRecord, project_response
+
+RECORDS_POR_COLECAO = {'doador': DoadorRecord, 'doacao': DoacaoRecord}
 
 class HemoesClient(BaseApiClient):
     """Cliente para APIs de Doação de Sangue (Hemoes)."""
     
+    NAME = 'hemoes'
+    
     def get_doador(self, cpf: str) -> Dict[str, Any]:
         """Busca informações de um doador pelo CPF."""
         params = {
@@ -13,12 +19,13 @@ class HemoesClient(BaseApiClient):
         
         endpoint = f"{self.base_url}/api/hemoes/items/doador"
         
-        return self._make_request(
+        result = self._make_raw_request(
             "get",
             endpoint,
             headers=self._get_basic_headers(),
             params=params
         )
+        return project_response(result, DoadorRecord)
 
     def get_doacao(self, doacao_id: int) -> Dict[str, Any]:
         """Busca detalhes de uma doação específica pelo ID."""
@@ -29,9 +36,57 @@ class HemoesClient(BaseApiClient):
         
         endpoint = f"{self.base_url}/api/hemoes/items/doacao"
         
-        return self._make_request(
+        result = self._make_raw_request(
             "get",
             endpoint,
             headers=self._get_basic_headers(),
             params=params
-        )
\ No newline at end of file
+        )
+        return project_response(result, DoacaoRecord)
+
+    def _buscar_em_lote(self, colecao: str, campo: str, valores: Iterable[Any]) -> Dict[str, Any]:
+        """Busca vários itens de uma coleção com o filtro '_in', em blocos e com paginação."""
+        unicos = list(dict.fromkeys(str(v) for v in valores))
+        endpoint = f"{self.base_url}/api/hemoes/items/{colecao}"
+        chunk_size = Config.HEMOES_BATCH_CHUNK_SIZE
+        limit = Config.HEMOES_PAGE_LIMIT
+        itens: List[Dict[str, Any]] = []
+        
+        for inicio in range(0, len(unicos), chunk_size):
+            bloco = unicos[inicio:inicio + chunk_size]
+            page = 1
+            while True:
+                params = {
+                    'fields': '*.*',
+                    f'filter[{campo}][_in]': ','.join(bloco),
+                    'limit': limit,
+                    'page': page
+                }
+                result = self._make_request(
+                    "get",
+                    endpoint,
+                    headers=self._get_basic_headers(),
+                    params=params
+                )
+                if self._is_error(result):
+                    return result
+                
+                pagina = result.get('data', []) if isinstance(result, dict) else result
+                itens.extend(project_response(pagina, RECORDS_POR_COLECAO[colecao]))
+                if len(pagina) < limit:
+                    break
+                page += 1
+        
+        encontrados = {str(item.get(campo)) for item in itens if isinstance(item, dict)}
+        return {
+            "data": itens,
+            "nao_encontrados": [v for v in unicos if v not in encontrados]
+        }
+
+    def get_doadores(self, cpfs: Iterable[str]) -> Dict[str, Any]:
+        """Busca informações de vários doadores pelos CPFs em uma única consulta."""
+        return self._buscar_em_lote('doador', 'cpf', (self._clean_cpf(cpf) for cpf in cpfs))
+
+    def get_doacoes(self, doacao_ids: Iterable[int]) -> Dict[str, Any]:
+        """Busca detalhes de várias doações pelos IDs em uma única consulta."""
+        return self._buscar_em_lote('doacao', 'id', doacao_ids)
\ No newline at end of file
@@ -0,0 +1,157 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Hashable, Mapping, Optional
+
+def _parse_cache_control(value: Optional[str]) -> Dict[str, Optional[str]]:
+    directives: Dict[str, Optional[str]] = {}
+    for part in (value or '').split(','):
+        name, _, arg = part.strip().partition('=')
+        if name:
+            directives[name.lower()] = arg.strip('"') or None
+    return directives
+
+def _http_date(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+def principal_for(headers: Optional[Mapping[str, str]]) -> str:
+    """Identificador (hash) da credencial de uma requisição, para separar o cache por titular."""
+    auth = (headers or {}).get('Authorization')
+    return hashlib.sha256(auth.encode('utf-8')).hexdigest()[:16] if auth else ''
+
+class HttpCachePolicy:
+    """Política de cache HTTP de um cliente.
+
+    O tempo de validade vem de Cache-Control/Expires da resposta, limitado a `max_ttl`;
+    sem cabeçalhos de validade usa `default_ttl`. `overrides` mapeia trechos do caminho
+    para um TTL fixo (0 = sempre revalidar, None = nunca armazenar).
+    """
+
+    def __init__(self, enabled: bool = True, default_ttl: float = 0.0, max_ttl: float = 3600.0,
+                 overrides: Optional[Dict[str, Optional[float]]] = None):
+        self.enabled = enabled
+        self.default_ttl = default_ttl
+        self.max_ttl = max_ttl
+        self.overrides = overrides or {}
+
+    @classmethod
+    def from_dict(cls, options: Dict[str, Any]) -> "HttpCachePolicy":
+        return cls(**options)
+
+    def cacheable(self, url: str) -> bool:
+        for trecho, ttl in self.overrides.items():
+            if trecho in url:
+                return ttl is not None
+        return True
+
+    def ttl_for(self, url: str, headers: Mapping[str, str]) -> Optional[float]:
+        """Segundos de validade de uma resposta, ou None se ela não deve ser armazenada."""
+        cache_control = _parse_cache_control(headers.get('Cache-Control'))
+        if 'no-store' in cache_control or not self.cacheable(url):
+            return None
+
+        for trecho, ttl in self.overrides.items():
+            if trecho in url:
+                return min(ttl, self.max_ttl)
+
+        if 'no-cache' in cache_control:
+            return 0.0
+        if cache_control.get('max-age') is not None:
+            try:
+                ttl = float(cache_control['max-age']) - float(headers.get('Age') or 0)
+            except ValueError:
+                ttl = 0.0
+        elif headers.get('Expires') is not None:
+            expires = _http_date(headers.get('Expires'))
+            date = _http_date(headers.get('Date')) or time.time()
+            ttl = expires - date if expires is not None else 0.0
+        else:
+            ttl = self.default_ttl
+        return max(0.0, min(ttl, self.max_ttl))
+
+class CachedResponse:
+    """Corpo de uma resposta armazenada, com validadores e instante de expiração."""
+
+    __slots__ = ('content', 'etag', 'last_modified', 'expires')
+
+    def __init__(self, content: bytes, etag: Optional[str], last_modified: Optional[str], ttl: float):
+        self.content = content
+        self.etag = etag
+        self.last_modified = last_modified
+        self.expires = time.monotonic() + ttl
+
+    @property
+    def fresh(self) -> bool:
+        return time.monotonic() < self.expires
+
+    @property
+    def revalidatable(self) -> bool:
+        return bool(self.etag or self.last_modified)
+
+    def conditional_headers(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+    def refresh(self, ttl: float):
+        self.expires = time.monotonic() + ttl
+
+class HttpResponseCache:
+    """Armazém LRU de respostas HTTP, limitado em bytes e em número de entradas.
+
+    Entradas vencidas são mantidas enquanto houver espaço, pois ainda servem para a
+    revalidação condicional (If-None-Match / If-Modified-Since).
+    """
+
+    def __init__(self, max_bytes: int, max_entries: int):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.size = 0
+        self._data: "OrderedDict[Hashable, CachedResponse]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                self._data.move_to_end(key)
+            return entry
+
+    def set(self, key: Hashable, entry: CachedResponse):
+        if len(entry.content) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._data.pop(key, None)
+            if previous is not None:
+                self.size -= len(previous.content)
+            self._data[key] = entry
+            self.size += len(entry.content)
+            while self.size > self.max_bytes or len(self._data) > self.max_entries:
+                _, removed = self._data.popitem(last=False)
+                self.size -= len(removed.content)
+
+    def invalidate_url(self, url: str) -> int:
+        """Remove as entradas de uma URL (para todos os parâmetros e titulares)."""
+        with self._lock:
+            keys = [key for key in self._data if key[0] == url]
+            for key in keys:
+                self.size -= len(self._data.pop(key).content)
+            return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.size = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
\ No newline at end of file
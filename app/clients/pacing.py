@@ -0,0 +1,139 @@
+import logging
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Mapping, Optional
+from app.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Respostas que indicam sobrecarga do serviço
+STATUS_SOBRECARGA = (429, 503)
+
+def parse_retry_after(headers: Mapping[str, str]) -> Optional[float]:
+    """Segundos indicados em Retry-After (número ou data HTTP), ou None."""
+    value = headers.get('Retry-After')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+class AdaptiveLimiter:
+    """Limite adaptativo de requisições simultâneas a um serviço (AIMD guiado por latência).
+
+    Cada resposta rápida aumenta o limite em 1/limite (cerca de +1 por "janela" completa);
+    uma resposta 429/503, um timeout ou uma latência acima de `latency_tolerance` vezes a
+    latência de referência reduzem o limite pelo fator `backoff` (no máximo uma redução por
+    latência de referência, para não desabar com uma rajada de respostas lentas). Retry-After
+    suspende novas requisições ao serviço pelo tempo indicado.
+
+    A latência de referência acompanha imediatamente as quedas e sobe devagar, de modo que
+    uma mudança duradoura do serviço seja absorvida.
+    """
+
+    def __init__(self, name: str, initial: float = 8, min_limit: float = 1, max_limit: float = 64,
+                 backoff: float = 0.7, latency_tolerance: float = 2.0, acquire_timeout: float = 10.0,
+                 max_retry_after: float = 60.0):
+        self.name = name
+        self.limit = float(initial)
+        self.min_limit = float(min_limit)
+        self.max_limit = float(max_limit)
+        self.backoff = backoff
+        self.latency_tolerance = latency_tolerance
+        self.acquire_timeout = acquire_timeout
+        self.max_retry_after = max_retry_after
+        self.in_flight = 0
+        self.baseline: Optional[float] = None
+        self.latency: Optional[float] = None
+        self.paused_until = 0.0
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+        self._publish()
+
+    @classmethod
+    def from_config(cls, name: str, options: Dict[str, Any]) -> "AdaptiveLimiter":
+        return cls(name, **options)
+
+    def acquire(self) -> bool:
+        """Aguarda uma vaga (e o fim de uma pausa por Retry-After); False se o tempo esgotar."""
+        inicio = time.monotonic()
+        deadline = inicio + self.acquire_timeout
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                if now >= self.paused_until and self.in_flight < max(1, int(self.limit)):
+                    break
+                if now >= deadline:
+                    metrics.incr(f"pacing.{self.name}.rejeitados")
+                    return False
+                wake = self.paused_until if now < self.paused_until else deadline
+                self._cond.wait(min(wake, deadline) - now)
+            self.in_flight += 1
+            self._publish()
+        metrics.observe(f"pacing.{self.name}.espera_ms", (time.monotonic() - inicio) * 1000)
+        return True
+
+    def release(self, latency: Optional[float], status: Optional[int] = None,
+                headers: Optional[Mapping[str, str]] = None):
+        """Libera a vaga e ajusta o limite pelo resultado.
+
+        latency=None indica falha sem resposta (timeout ou erro de conexão).
+        """
+        with self._cond:
+            self.in_flight -= 1
+            now = time.monotonic()
+            if status in STATUS_SOBRECARGA:
+                retry_after = parse_retry_after(headers or {})
+                if retry_after:
+                    retry_after = min(retry_after, self.max_retry_after)
+                    self.paused_until = max(self.paused_until, now + retry_after)
+                    metrics.incr(f"pacing.{self.name}.retry_after")
+                    logger.warning("Serviço %s pediu pausa de %.1fs (HTTP %s).", self.name, retry_after, status)
+                self._decrease(now, f"http_{status}")
+            elif latency is None:
+                self._decrease(now, 'falha')
+            else:
+                self._observe_latency(latency)
+                if self.latency > self.baseline * self.latency_tolerance:
+                    self._decrease(now, 'latencia')
+                elif self.in_flight + 1 >= int(self.limit):
+                    # Só cresce quando o limite está de fato sendo usado
+                    self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            self._publish()
+            self._cond.notify_all()
+
+    def _observe_latency(self, latency: float):
+        self.latency = latency if self.latency is None else 0.7 * self.latency + 0.3 * latency
+        if self.baseline is None or latency < self.baseline:
+            self.baseline = latency
+        else:
+            self.baseline += (latency - self.baseline) * 0.01
+
+    def _decrease(self, now: float, motivo: str):
+        if now - self._last_decrease < (self.baseline or 0.0):
+            return
+        self._last_decrease = now
+        anterior = self.limit
+        self.limit = max(self.min_limit, self.limit * self.backoff)
+        metrics.incr(f"pacing.{self.name}.reducoes.{motivo}")
+        logger.info("Limite de %s reduzido de %.1f para %.1f (%s).", self.name, anterior, self.limit, motivo)
+
+    def _publish(self):
+        metrics.set_gauge(f"pacing.{self.name}.limite", round(self.limit, 2))
+        metrics.set_gauge(f"pacing.{self.name}.em_voo", self.in_flight)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "limite": round(self.limit, 2),
+                "em_voo": self.in_flight,
+                "latencia_ms": round(self.latency * 1000, 1) if self.latency is not None else None,
+                "latencia_referencia_ms": round(self.baseline * 1000, 1) if self.baseline is not None else None,
+                "pausado_por_s": round(max(0.0, self.paused_until - time.monotonic()), 1)
+            }
\ No newline at end of file
@@ -0,0 +1,43 @@
+from collections.abc import Mapping
+from typing import Dict, Iterator, List, TYPE_CHECKING
+from .base import BaseApiClient
+from .hemoes import HemoesClient
+from .detran import DetranClient
+from .sesa import SesaClient
+
+if TYPE_CHECKING:
+    from app.auth.manager import CompleteAuthenticationManager
+
+# Clientes criados por padrão, pelo nome usado nas ferramentas ('hemoes', 'detran', 'sesa')
+CLIENT_CLASSES = (HemoesClient, DetranClient, SesaClient)
+
+class ClientRegistry(Mapping):
+    """Registro dos clientes de API por nome, injetado nas ferramentas dos agentes.
+
+    É montado uma vez (em create_app ou em um job) e compartilhado por todas as threads;
+    os clientes são seguros para uso concorrente. Para testes ou jobs, clientes podem ser
+    substituídos com register().
+    """
+
+    def __init__(self, clients: Dict[str, BaseApiClient]):
+        self._clients = dict(clients)
+
+    @classmethod
+    def from_auth_manager(cls, auth_manager: "CompleteAuthenticationManager") -> "ClientRegistry":
+        return cls({client_cls.NAME: client_cls(auth_manager) for client_cls in CLIENT_CLASSES})
+
+    def register(self, name: str, client: BaseApiClient):
+        self._clients[name] = client
+
+    def required_scopes(self) -> List[str]:
+        """Escopos de token de sistema declarados pelos clientes."""
+        return [scope for client in self._clients.values() for scope in client.REQUIRED_SCOPES]
+
+    def __getitem__(self, name: str) -> BaseApiClient:
+        return self._clients[name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._clients)
+
+    def __len__(self) -> int:
+        return len(self._clients)
\ No newline at end of file
@@ -1,12 +1,113 @@
-from typing import Dict, Any, Optional
+import contextvars
+import logging
+import math
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from typing import Dict, Any, List, Optional, Tuple, Union
 from .base import BaseApiClient
+from app.config import Config
 from app.models.types import SugestaoAgendamentoPayload, ReservaHorarioPayload
+from app.models.records import HorarioRecord, UnidadeRecord, project_response
+from app.utils.raw_response import RawResponse, invalid_json
+from app.utils.cache import TTLCache
+
+logger = logging.getLogger(__name__)
 
 HEADER_AUTH = 'Authorization'
+ORDENAR_POR_HORARIO = 'horario'
+ORDENAR_POR_DISTANCIA = 'distancia'
+RAIO_TERRA_KM = 6371.0
+# Erros de buscar_horarios_disponiveis causados pelos parâmetros (e não pelo serviço)
+ERROS_PARAMETRO = ('Invalid Date', 'Invalid Parameter')
+
+def _extrair_itens(result: Any) -> Optional[List[Any]]:
+    """Extrai a lista de itens de uma resposta da API (lista pura ou envelopada em 'data').
+
+    Retorna None se o corpo bruto da resposta não for um JSON válido.
+    """
+    if isinstance(result, RawResponse):
+        if result.truncated:
+            logger.error("Resposta truncada da SESA (%d bytes).", len(result))
+            return None
+        if not result.has_list('data'):
+            return []
+        try:
+            return list(result.iter_items('data'))
+        except ValueError as e:
+            logger.error("Resposta inválida da SESA: %s", e)
+            return None
+    if isinstance(result, list):
+        return result
+    if isinstance(result, dict) and isinstance(result.get('data'), list):
+        return result['data']
+    return []
+
+def _coordenadas(item: Dict[str, Any]) -> Optional[Tuple[float, float]]:
+    """Retorna (latitude, longitude) de uma unidade, se disponíveis."""
+    lat = item.get('latitude', item.get('lat'))
+    lon = item.get('longitude', item.get('lng', item.get('lon')))
+    try:
+        return float(lat), float(lon)
+    except (TypeError, ValueError):
+        return None
+
+def _parametro_invalido(message: str) -> Dict[str, Any]:
+    return {"error": "Invalid Parameter", "message": message}
+
+def _validar_busca(ordenar_por: Any, latitude: Any, longitude: Any,
+                   limite: Any) -> Tuple[Optional[Tuple[float, float]], Optional[int], Optional[Dict[str, Any]]]:
+    """Valida os parâmetros da busca de horários; retorna (origem, limite, erro)."""
+    if ordenar_por not in (ORDENAR_POR_HORARIO, ORDENAR_POR_DISTANCIA):
+        return None, None, _parametro_invalido(
+            f"ordenar_por deve ser '{ORDENAR_POR_HORARIO}' ou '{ORDENAR_POR_DISTANCIA}'.")
+
+    origem = None
+    if latitude is not None or longitude is not None:
+        try:
+            if isinstance(latitude, (bool, dict, list)) or isinstance(longitude, (bool, dict, list)):
+                raise TypeError("coordenada não numérica")
+            origem = (float(latitude), float(longitude))
+        except (TypeError, ValueError):
+            return None, None, _parametro_invalido("latitude e longitude devem ser números informados juntos.")
+        if not (-90 <= origem[0] <= 90 and -180 <= origem[1] <= 180):
+            return None, None, _parametro_invalido("latitude ou longitude fora do intervalo válido.")
+
+    if limite is not None:
+        texto = str(limite).strip() if isinstance(limite, (int, str)) and not isinstance(limite, bool) else ''
+        if not texto.isdigit() or int(texto) <= 0:
+            return None, None, _parametro_invalido("limite deve ser um inteiro positivo.")
+        limite = int(texto)
+    return origem, limite, None
+
+def _distancia_km(origem: Tuple[float, float], destino: Tuple[float, float]) -> float:
+    """Distância em km entre dois pontos (fórmula de haversine)."""
+    lat1, lon1 = map(math.radians, origem)
+    lat2, lon2 = map(math.radians, destino)
+    a = (math.sin((lat2 - lat1) / 2) ** 2 +
+         math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * RAIO_TERRA_KM * math.asin(math.sqrt(a))
 
 class SesaClient(BaseApiClient):
     """Cliente para APIs da SESA."""
     
+    NAME = 'sesa'
+    
+    def __init__(self, auth_manager):
+        super().__init__(auth_manager)
+        self._horarios_cache = TTLCache(
+            ttl=Config.SESA_HORARIOS_CACHE_TTL,
+            max_entries=Config.SESA_HORARIOS_CACHE_MAX_ENTRIES
+        )
+        # agendamento_id -> (unidade, data) das reservas feitas por este cliente
+        self._agendamentos_reservados = TTLCache(ttl=86400, max_entries=10000)
+
+    def _invalidar_horarios(self, unidade_id: Optional[str] = None, data: Optional[str] = None):
+        """Invalida o cache de horários de uma unidade/data (ou todo o cache, se desconhecidas)."""
+        if unidade_id is not None and data is not None:
+            self._horarios_cache.delete((str(unidade_id), str(data)))
+        else:
+            self._horarios_cache.clear()
+
     def _get_auth_headers(self, user_token: Optional[str] = None) -> Dict[str, str]:
         """Retorna headers com autenticação opcional."""
         headers = self._get_basic_headers()
@@ -14,15 +115,15 @@ class SesaClient(BaseApiClient):
             headers[HEADER_AUTH] = f'Bearer {user_token}'
         return headers
 
-    def get_municipios(self) -> Dict[str, Any]:
+    def get_municipios(self) -> Union[RawResponse, Dict[str, Any]]:
         """Lista todos os municípios disponíveis para agendamento."""
         endpoint = f"{self.base_url}/api/agendamento/municipios"
-        return self._make_request("get", endpoint, headers=self._get_auth_headers())
+        return self._make_raw_request("get", endpoint, headers=self._get_auth_headers())
 
-    def get_servicos(self) -> Dict[str, Any]:
+    def get_servicos(self) -> Union[RawResponse, Dict[str, Any]]:
         """Lista todos os serviços disponíveis para agendamento."""
         endpoint = f"{self.base_url}/api/agendamento/servicos"
-        return self._make_request("get", endpoint, headers=self._get_auth_headers())
+        return self._make_raw_request("get", endpoint, headers=self._get_auth_headers())
 
     def get_unidades(self, municipio_id: str, servico_id: str) -> Dict[str, Any]:
         """Lista unidades de atendimento baseado no município e serviço."""
@@ -31,16 +132,29 @@ class SesaClient(BaseApiClient):
             'servico_id': servico_id
         }
         endpoint = f"{self.base_url}/api/agendamento/unidades"
-        return self._make_request("get", endpoint, headers=self._get_auth_headers(), params=params)
+        result = self._make_raw_request("get", endpoint, headers=self._get_auth_headers(), params=params)
+        return project_response(result, UnidadeRecord)
     
     def get_horarios(self, unidade_id: str, data: str) -> Dict[str, Any]:
         """Consulta horários disponíveis para uma unidade em uma data."""
+        cache_key = (str(unidade_id), str(data))
+        cached = self._horarios_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
         params = {
             'unidade': unidade_id,
             'data': data
         }
         endpoint = f"{self.base_url}/api/agendamento/horarios-disponiveis"
-        return self._make_request("get", endpoint, headers=self._get_auth_headers(), params=params)
+        result = project_response(
+            self._make_raw_request("get", endpoint, headers=self._get_auth_headers(), params=params),
+            HorarioRecord
+        )
+        
+        if not self._is_error(result):
+            self._horarios_cache.set(cache_key, result)
+        return result
 
     def get_sugestao_agendamento(self, payload: SugestaoAgendamentoPayload) -> Dict[str, Any]:
         """Obtém sugestões de agendamento."""
@@ -59,7 +173,16 @@ class SesaClient(BaseApiClient):
             }
         
         endpoint = f"{self.base_url}/api/agendamento/reservar"
-        return self._make_request("post", endpoint, headers=self._get_auth_headers(user_token), json=payload)
+        result = self._make_request("post", endpoint, headers=self._get_auth_headers(user_token), json=payload)
+        
+        if not self._is_error(result):
+            self._invalidar_horarios(payload.get('unidade'), payload.get('data'))
+            agendamento_id = result.get('id', result.get('agendamento_id')) if isinstance(result, dict) else None
+            if agendamento_id is not None:
+                self._agendamentos_reservados.set(
+                    str(agendamento_id), (payload.get('unidade'), payload.get('data'))
+                )
+        return result
     
     def check_agendamento_existente(self, servico_id: str, user_id: str, ativo: bool, 
                                    user_token_override: Optional[str] = None) -> Dict[str, Any]:
@@ -91,4 +214,113 @@ class SesaClient(BaseApiClient):
             }
         
         endpoint = f"{self.base_url}/api/agendamento/meus-agendamentos/{agendamento_id}/cancelar"
-        return self._make_request("post", endpoint, headers=self._get_auth_headers(user_token))
\ No newline at end of file
+        result = self._make_request("post", endpoint, headers=self._get_auth_headers(user_token))
+        
+        if not self._is_error(result):
+            unidade = result.get('unidade') if isinstance(result, dict) else None
+            data = result.get('data') if isinstance(result, dict) else None
+            if unidade is None or data is None:
+                unidade, data = self._agendamentos_reservados.get(str(agendamento_id)) or (None, None)
+            self._agendamentos_reservados.delete(str(agendamento_id))
+            self._invalidar_horarios(unidade, data)
+        return result
+
+    def buscar_horarios_disponiveis(self, municipio_id: str, servico_id: str, data_inicio: str,
+                                    data_fim: Optional[str] = None,
+                                    ordenar_por: str = ORDENAR_POR_HORARIO,
+                                    latitude: Optional[float] = None,
+                                    longitude: Optional[float] = None,
+                                    limite: Optional[int] = None) -> Dict[str, Any]:
+        """Busca os horários livres de todas as unidades em uma janela de datas, em paralelo.
+
+        Parâmetros inválidos resultam em erro "Invalid Date" ou "Invalid Parameter" (ERROS_PARAMETRO),
+        antes de qualquer chamada ao serviço.
+        """
+        origem, limite, erro = _validar_busca(ordenar_por, latitude, longitude, limite)
+        if erro:
+            return erro
+        try:
+            inicio = date.fromisoformat(data_inicio)
+            fim = date.fromisoformat(data_fim) if data_fim else inicio
+        except (TypeError, ValueError):
+            return {
+                "error": "Invalid Date",
+                "message": "As datas devem estar no formato YYYY-MM-DD."
+            }
+        
+        if fim < inicio:
+            return {
+                "error": "Invalid Date",
+                "message": "A data final deve ser igual ou posterior à data inicial."
+            }
+        
+        dias = min((fim - inicio).days + 1, Config.SESA_SLOT_SEARCH_MAX_DIAS)
+        datas = [(inicio + timedelta(days=i)).isoformat() for i in range(dias)]
+        
+        unidades_result = self.get_unidades(municipio_id, servico_id)
+        if self._is_error(unidades_result):
+            return unidades_result
+        
+        itens = _extrair_itens(unidades_result)
+        if itens is None:
+            return invalid_json()
+        unidades = [u for u in itens if isinstance(u, dict) and 'id' in u]
+        if not unidades:
+            return {"success": True, "total": 0, "horarios": [], "falhas": []}
+        
+        consultas = [(unidade, data) for unidade in unidades for data in datas]
+        max_workers = max(1, min(Config.SESA_SLOT_SEARCH_MAX_WORKERS, len(consultas)))
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # Cada consulta roda numa cópia do contexto, para que o tempo gasto na SESA entre
+            # nos tempos da requisição (Server-Timing) e da ferramenta em andamento
+            futures = [
+                executor.submit(contextvars.copy_context().run, self.get_horarios, str(unidade['id']), data)
+                for unidade, data in consultas
+            ]
+            respostas = [future.result() for future in futures]
+        
+        horarios: List[Dict[str, Any]] = []
+        falhas: List[Dict[str, Any]] = []
+        for (unidade, data), resposta in zip(consultas, respostas):
+            if self._is_error(resposta):
+                falhas.append({"unidade_id": unidade['id'], "data": data, "error": resposta['error']})
+                continue
+            itens = _extrair_itens(resposta)
+            if itens is None:
+                falhas.append({"unidade_id": unidade['id'], "data": data, "error": invalid_json()['error']})
+                continue
+            
+            coordenadas = _coordenadas(unidade)
+            distancia = (round(_distancia_km(origem, coordenadas), 2)
+                         if origem and coordenadas else None)
+            
+            for item in itens:
+                hora = item.get('hora', item.get('horario')) if isinstance(item, dict) else item
+                if not hora:
+                    continue
+                horarios.append({
+                    "unidade_id": unidade['id'],
+                    "unidade_nome": unidade.get('nome'),
+                    "data": data,
+                    "hora": str(hora),
+                    "distancia_km": distancia
+                })
+        
+        if ordenar_por == ORDENAR_POR_DISTANCIA:
+            horarios.sort(key=lambda h: (
+                h['distancia_km'] if h['distancia_km'] is not None else math.inf,
+                h['data'], h['hora']
+            ))
+        else:
+            horarios.sort(key=lambda h: (h['data'], h['hora']))
+        
+        if falhas:
+            logger.warning("%d de %d consultas de horários falharam (município: %s, serviço: %s).",
+                           len(falhas), len(consultas), municipio_id, servico_id)
+        
+        total = len(horarios)
+        if limite:
+            horarios = horarios[:limite]
+        
+        return {"success": True, "total": total, "horarios": horarios, "falhas": falhas}
\ No newline at end of file
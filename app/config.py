@@ -23,5 +23,242 @@ class Config:
     # Timeouts
     REQUEST_TIMEOUT = 30
     
+    # Tamanho máximo aceito para o corpo das respostas dos serviços
+    RESPONSE_MAX_BYTES = int(os.getenv('RESPONSE_MAX_BYTES', str(10 * 1024 * 1024)))
+    
     # LLM Configuration
-    LLM_TEMPERATURE = 0.2
\ No newline at end of file
+    LLM_TEMPERATURE = 0.2
+    
+    # Cascata de modelos: do mais rápido ao mais capaz, separados por vírgula.
+    # LLM_TIERS_<ORGAO> (ex.: LLM_TIERS_SESA) sobrescreve a cascata de um órgão.
+    LLM_TIERS = os.getenv('LLM_TIERS', OPENAI_MODEL)
+    LLM_TIER_MAX_ITER = int(os.getenv('LLM_TIER_MAX_ITER', '6'))
+    # Custo por 1 mil tokens (entrada, saída) em USD, para as métricas por nível
+    LLM_COST_PER_1K_TOKENS = {
+        'gpt-4o-mini': (0.00015, 0.0006),
+        'gpt-4o': (0.0025, 0.01),
+        'gpt-4.1-mini': (0.0004, 0.0016),
+        'gpt-4.1': (0.002, 0.008)
+    }
+    
+    @classmethod
+    def llm_tiers(cls, orgao: str) -> list:
+        """Modelos da cascata de um órgão, do mais rápido ao mais capaz."""
+        tiers = os.getenv(f'LLM_TIERS_{orgao.upper()}', cls.LLM_TIERS)
+        return [model.strip() for model in tiers.split(',') if model.strip()]
+    
+    # Cache em disco das completions do LLM (opcional)
+    LLM_CACHE_ENABLED = os.getenv('LLM_CACHE_ENABLED', 'False').lower() == 'true'
+    LLM_CACHE_PATH = os.getenv('LLM_CACHE_PATH', '.cache/llm_completions.sqlite3')
+    LLM_CACHE_TTL = float(os.getenv('LLM_CACHE_TTL', '86400'))
+    LLM_CACHE_MAX_BYTES = int(os.getenv('LLM_CACHE_MAX_BYTES', str(256 * 1024 * 1024)))
+    # 'exclude' não armazena prompts com CPF/tokens; 'namespace' os isola por titular
+    LLM_CACHE_PII_POLICY = os.getenv('LLM_CACHE_PII_POLICY', 'exclude')
+    
+    # SESA - Busca de horários
+    SESA_SLOT_SEARCH_MAX_WORKERS = int(os.getenv('SESA_SLOT_SEARCH_MAX_WORKERS', '8'))
+    SESA_SLOT_SEARCH_MAX_DIAS = int(os.getenv('SESA_SLOT_SEARCH_MAX_DIAS', '14'))
+    
+    # SESA - Cache de horários disponíveis (segundos de staleness máxima; 0 desativa)
+    SESA_HORARIOS_CACHE_TTL = float(os.getenv('SESA_HORARIOS_CACHE_TTL', '30'))
+    SESA_HORARIOS_CACHE_MAX_ENTRIES = int(os.getenv('SESA_HORARIOS_CACHE_MAX_ENTRIES', '2048'))
+    
+    # DETRAN - Hash do último PATCH de veículos por usuário (evita escritas sem alteração)
+    DETRAN_PUSH_HASH_TTL = float(os.getenv('DETRAN_PUSH_HASH_TTL', '86400'))
+    DETRAN_PUSH_HASH_MAX_ENTRIES = int(os.getenv('DETRAN_PUSH_HASH_MAX_ENTRIES', '100000'))
+    
+    # DETRAN - Sincronização em lote de veículos
+    DETRAN_SYNC_MAX_WORKERS = int(os.getenv('DETRAN_SYNC_MAX_WORKERS', '8'))
+    DETRAN_SYNC_CHECKPOINT_EVERY = int(os.getenv('DETRAN_SYNC_CHECKPOINT_EVERY', '50'))
+    
+    # HEMOES - Consultas em lote
+    HEMOES_BATCH_CHUNK_SIZE = int(os.getenv('HEMOES_BATCH_CHUNK_SIZE', '100'))
+    HEMOES_PAGE_LIMIT = int(os.getenv('HEMOES_PAGE_LIMIT', '100'))
+    
+    # Pré-carregamento de dados do cidadão (ferramentas por órgão, separadas por vírgula)
+    PREFETCH_ENABLED = os.getenv('PREFETCH_ENABLED', 'True').lower() == 'true'
+    PREFETCH_MAX_WORKERS = int(os.getenv('PREFETCH_MAX_WORKERS', '16'))
+    PREFETCH = {
+        'HEMOES': os.getenv('PREFETCH_HEMOES', 'hemoes_get_doador'),
+        'DETRAN': os.getenv('PREFETCH_DETRAN', 'detran_search_vehicles'),
+        'SESA': os.getenv('PREFETCH_SESA', 'sesa_check_agendamento_existente')
+    }
+    
+    # Orçamento de prompt (tokens) por órgão e compactação de observações das ferramentas
+    PROMPT_BUDGET_DEFAULT = int(os.getenv('PROMPT_BUDGET_DEFAULT', '12000'))
+    PROMPT_BUDGET = {
+        'HEMOES': int(os.getenv('PROMPT_BUDGET_HEMOES', '8000')),
+        'DETRAN': int(os.getenv('PROMPT_BUDGET_DETRAN', '8000')),
+        'SESA': int(os.getenv('PROMPT_BUDGET_SESA', '12000'))
+    }
+    PROMPT_MAX_OBSERVATION_TOKENS = int(os.getenv('PROMPT_MAX_OBSERVATION_TOKENS', '4000'))
+    PROMPT_MIN_OBSERVATION_TOKENS = int(os.getenv('PROMPT_MIN_OBSERVATION_TOKENS', '300'))
+    PROMPT_CONTEXT_MAX_VALUE_CHARS = int(os.getenv('PROMPT_CONTEXT_MAX_VALUE_CHARS', '200'))
+    # Chaves do user_context repassadas ao agente de cada órgão
+    PROMPT_CONTEXT_KEYS = {
+        'HEMOES': {'cpf', 'nome', 'doacao_id'},
+        'DETRAN': {'cpf', 'user_id', 'nome', 'placa'},
+        'SESA': {'cpf', 'user_id', 'nome', 'nome_do_usuario', 'servico_id', 'municipio_id',
+                 'unidade_id', 'dataNascimento', 'cep', 'latitude', 'longitude'}
+    }
+    
+    # Limites por execução de agente (iterações do LLM, chamadas de ferramentas e tempo)
+    AGENT_LIMITS_DEFAULT = {'max_iter': 10, 'max_tool_calls': 12, 'max_seconds': 90}
+    AGENT_LIMITS = {
+        'HEMOES': {'max_iter': 6, 'max_tool_calls': 6, 'max_seconds': 45},
+        'DETRAN': {'max_iter': 8, 'max_tool_calls': 8, 'max_seconds': 60},
+        'SESA': {'max_iter': 12, 'max_tool_calls': 15, 'max_seconds': 120}
+    }
+    
+    @classmethod
+    def agent_limits(cls, orgao: str) -> dict:
+        """Limites de execução do agente de um órgão (sobrescritos por AGENT_<LIMITE>_<ORGAO>)."""
+        limits = dict(cls.AGENT_LIMITS.get(orgao.upper(), cls.AGENT_LIMITS_DEFAULT))
+        for name in limits:
+            value = os.getenv(f'AGENT_{name.upper()}_{orgao.upper()}')
+            if value:
+                limits[name] = float(value) if name == 'max_seconds' else int(value)
+        return limits
+    
+    # Tamanho máximo da resposta parcial montada quando o agente esgota as iterações
+    PARTIAL_RESPONSE_MAX_CHARS = int(os.getenv('PARTIAL_RESPONSE_MAX_CHARS', '2000'))
+    
+    # Controle de admissão das rotas de agentes (concorrência, fila e taxa)
+    ADMISSION_MAX_CONCURRENT = int(os.getenv('ADMISSION_MAX_CONCURRENT', '16'))
+    ADMISSION_MAX_CONCURRENT_POR_ORGAO = {
+        'HEMOES': int(os.getenv('ADMISSION_MAX_CONCURRENT_HEMOES', '6')),
+        'DETRAN': int(os.getenv('ADMISSION_MAX_CONCURRENT_DETRAN', '6')),
+        'SESA': int(os.getenv('ADMISSION_MAX_CONCURRENT_SESA', '10'))
+    }
+    ADMISSION_MAX_QUEUE = int(os.getenv('ADMISSION_MAX_QUEUE', '64'))
+    ADMISSION_QUEUE_TIMEOUT_S = float(os.getenv('ADMISSION_QUEUE_TIMEOUT_S', '20'))
+    ADMISSION_RETRY_AFTER_S = float(os.getenv('ADMISSION_RETRY_AFTER_S', '5'))
+    RATE_LIMIT_CALLER_PER_MIN = float(os.getenv('RATE_LIMIT_CALLER_PER_MIN', '120'))
+    RATE_LIMIT_CALLER_BURST = float(os.getenv('RATE_LIMIT_CALLER_BURST', '20'))
+    RATE_LIMIT_CPF_PER_MIN = float(os.getenv('RATE_LIMIT_CPF_PER_MIN', '10'))
+    RATE_LIMIT_CPF_BURST = float(os.getenv('RATE_LIMIT_CPF_BURST', '5'))
+    
+    # Pesos da fila de admissão por classe de requisição (fila justa ponderada)
+    SCHEDULER_WEIGHTS = {
+        'transacional': float(os.getenv('SCHEDULER_WEIGHT_TRANSACIONAL', '6')),
+        'consulta_pessoal': float(os.getenv('SCHEDULER_WEIGHT_CONSULTA_PESSOAL', '3')),
+        'catalogo': float(os.getenv('SCHEDULER_WEIGHT_CATALOGO', '1'))
+    }
+    
+    # Administração e profiling sob demanda
+    ADMIN_TOKEN = os.getenv('ADMIN_TOKEN')
+    PROFILING_ENABLED = os.getenv('PROFILING_ENABLED', 'False').lower() == 'true'
+    PROFILING_SAMPLE_RATE = float(os.getenv('PROFILING_SAMPLE_RATE', '0.05'))
+    PROFILING_INTERVAL_MS = float(os.getenv('PROFILING_INTERVAL_MS', '5'))
+    PROFILING_OUTPUT_DIR = os.getenv('PROFILING_OUTPUT_DIR', 'profiles')
+    
+    # Logging: fila assíncrona, formato ('json' ou 'text') e níveis por componente,
+    # ex.: LOG_LEVELS="app.clients=DEBUG,crewai=INFO"
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+    LOG_FORMAT = os.getenv('LOG_FORMAT', 'json')
+    LOG_ASYNC = os.getenv('LOG_ASYNC', 'True').lower() == 'true'
+    LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', '10000'))
+    LOG_MAX_BODY_CHARS = int(os.getenv('LOG_MAX_BODY_CHARS', '500'))
+    LOG_LEVELS = os.getenv('LOG_LEVELS', '')
+    LOG_LEVELS_DEFAULT = {
+        'crewai': 'WARNING',
+        'httpx': 'WARNING',
+        'openai': 'WARNING',
+        'urllib3': 'WARNING'
+    }
+    # Saída detalhada dos agentes (CrewAI); os passos também vão para o logger app.agents.steps em DEBUG
+    AGENT_VERBOSE = os.getenv('AGENT_VERBOSE', 'False').lower() == 'true'
+    
+    # Cache HTTP das consultas GET (Cache-Control, ETag/Last-Modified), desligado por padrão.
+    # HTTP_CACHE_<CLIENTE>=false desliga e HTTP_CACHE_MAX_TTL_<CLIENTE> limita a validade por cliente.
+    HTTP_CACHE_ENABLED = os.getenv('HTTP_CACHE_ENABLED', 'False').lower() == 'true'
+    HTTP_CACHE_MAX_BYTES = int(os.getenv('HTTP_CACHE_MAX_BYTES', str(32 * 1024 * 1024)))
+    HTTP_CACHE_MAX_ENTRIES = int(os.getenv('HTTP_CACHE_MAX_ENTRIES', '5000'))
+    # overrides: trecho do caminho -> TTL fixo em segundos (0 = sempre revalidar, None = não armazenar)
+    HTTP_CACHE_POLICIES = {
+        'hemoes': {'default_ttl': 0, 'max_ttl': 300},
+        'detran': {'default_ttl': 0, 'max_ttl': 60, 'overrides': {'/v1/profile': 0}},
+        'sesa': {
+            'default_ttl': 0,
+            'max_ttl': 3600,
+            'overrides': {
+                '/agendamento/municipios': 3600,
+                '/agendamento/servicos': 3600,
+                '/agendamento/horarios-disponiveis': 0,
+                '/agendamento/meus-agendamentos': None
+            }
+        }
+    }
+    
+    @classmethod
+    def http_cache_policy(cls, cliente: str) -> dict:
+        """Política de cache HTTP de um cliente, com as sobrescritas por variável de ambiente."""
+        policy = dict(cls.HTTP_CACHE_POLICIES.get(cliente, {}))
+        enabled = os.getenv(f'HTTP_CACHE_{cliente.upper()}')
+        policy['enabled'] = cls.HTTP_CACHE_ENABLED if enabled is None else enabled.lower() == 'true'
+        max_ttl = os.getenv(f'HTTP_CACHE_MAX_TTL_{cliente.upper()}')
+        if max_ttl:
+            policy['max_ttl'] = float(max_ttl)
+        return policy
+    
+    # Tokens de sistema: aquecimento na inicialização e pedido único com vários escopos
+    # (desligue AUTH_MULTI_SCOPE se o servidor de identidade não emitir tokens multi-escopo)
+    AUTH_WARMUP_ON_STARTUP = os.getenv('AUTH_WARMUP_ON_STARTUP', 'True').lower() == 'true'
+    AUTH_MULTI_SCOPE = os.getenv('AUTH_MULTI_SCOPE', 'True').lower() == 'true'
+    
+    # Projeção das respostas nos registros de app/models/records.py (descarta campos não usados)
+    MODEL_PROJECTION_ENABLED = os.getenv('MODEL_PROJECTION_ENABLED', 'True').lower() == 'true'
+    
+    # Sessões de conversa: últimas trocas e resultados de ferramentas reaproveitados nos seguimentos
+    SESSION_TTL = float(os.getenv('SESSION_TTL', '1800'))
+    SESSION_MAX_ENTRIES = int(os.getenv('SESSION_MAX_ENTRIES', '10000'))
+    SESSION_MAX_TURNS = int(os.getenv('SESSION_MAX_TURNS', '4'))
+    SESSION_SUMMARY_CHARS = int(os.getenv('SESSION_SUMMARY_CHARS', '400'))
+    SESSION_MAX_TOOL_RESULTS = int(os.getenv('SESSION_MAX_TOOL_RESULTS', '20'))
+    SESSION_TOOL_RESULT_TTL = float(os.getenv('SESSION_TOOL_RESULT_TTL', '600'))
+    # Validade por ferramenta (0 = não guardar entre turnos); dados que mudam com agendamentos expiram antes
+    SESSION_TOOL_TTL = {
+        'sesa_get_horarios': 60,
+        'sesa_buscar_horarios_disponiveis': 60,
+        'sesa_check_agendamento_existente': 60
+    }
+    
+    # Rota unificada /query: classificador local de órgão e despacho concorrente
+    QUERY_CLASSIFIER_MIN_SCORE = float(os.getenv('QUERY_CLASSIFIER_MIN_SCORE', '0.5'))
+    # Órgãos adicionais são incluídos se pontuarem ao menos esta fração do melhor
+    QUERY_CLASSIFIER_RATIO = float(os.getenv('QUERY_CLASSIFIER_RATIO', '0.6'))
+    QUERY_MAX_WORKERS = int(os.getenv('QUERY_MAX_WORKERS', '8'))
+    # Classifica também as consultas das rotas por órgão, para medir a acurácia do roteador
+    QUERY_CLASSIFIER_SHADOW = os.getenv('QUERY_CLASSIFIER_SHADOW', 'True').lower() == 'true'
+    
+    # Ferramenta executar_em_paralelo: leituras independentes de um passo do agente rodam em paralelo
+    TOOL_PARALLEL_ENABLED = os.getenv('TOOL_PARALLEL_ENABLED', 'True').lower() == 'true'
+    TOOL_PARALLEL_MAX_WORKERS = int(os.getenv('TOOL_PARALLEL_MAX_WORKERS', '16'))
+    TOOL_PARALLEL_MAX_CALLS = int(os.getenv('TOOL_PARALLEL_MAX_CALLS', '8'))
+    
+    # Ritmo adaptativo por serviço: limite de requisições simultâneas ajustado por latência e 429/503.
+    # PACING_<OPCAO>_<CLIENTE> (ex.: PACING_MAX_LIMIT_DETRAN) sobrescreve uma opção para um cliente.
+    PACING_ENABLED = os.getenv('PACING_ENABLED', 'True').lower() == 'true'
+    PACING_DEFAULTS = {
+        'initial': float(os.getenv('PACING_INITIAL', '8')),
+        'min_limit': float(os.getenv('PACING_MIN_LIMIT', '1')),
+        'max_limit': float(os.getenv('PACING_MAX_LIMIT', '64')),
+        'backoff': float(os.getenv('PACING_BACKOFF', '0.7')),
+        'latency_tolerance': float(os.getenv('PACING_LATENCY_TOLERANCE', '2.0')),
+        'acquire_timeout': float(os.getenv('PACING_ACQUIRE_TIMEOUT', '10')),
+        'max_retry_after': float(os.getenv('PACING_MAX_RETRY_AFTER', '60'))
+    }
+    
+    @classmethod
+    def pacing_options(cls, cliente: str) -> dict:
+        """Opções do limitador adaptativo de um cliente, com as sobrescritas por variável de ambiente."""
+        options = dict(cls.PACING_DEFAULTS)
+        for name in options:
+            value = os.getenv(f'PACING_{name.upper()}_{cliente.upper()}')
+            if value:
+                options[name] = float(value)
+        return options
+    
+    # Tempos por fase nas rotas dos órgãos (cabeçalho Server-Timing; campo "timings" com "timings": true)
+    SERVER_TIMING_ENABLED = os.getenv('SERVER_TIMING_ENABLED', 'True').lower() == 'true'
+    SERVER_TIMING_MAX_TOOLS = int(os.getenv('SERVER_TIMING_MAX_TOOLS', '20'))
\ No newline at end of file
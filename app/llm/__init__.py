@@ -0,0 +1,4 @@
+from .cache import DiskCompletionCache
+from .callbacks import LlmTimingCallback
+
+__all__ = ['DiskCompletionCache', 'LlmTimingCallback']
@@ -0,0 +1,179 @@
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Optional, Sequence, Tuple
+
+from langchain_core.caches import BaseCache
+from langchain_core.load import dumps, loads
+from langchain_core.outputs import Generation
+
+from app.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+PII_POLICY_EXCLUDE = 'exclude'
+PII_POLICY_NAMESPACE = 'namespace'
+
+CPF_PATTERN = re.compile(r'\b\d{3}\.?\d{3}\.?\d{3}-?\d{2}\b')
+# user_id do contexto do usuário incluído no prompt ('user_id': 'abc', "user_id": 42, user_id=abc)
+USER_ID_PATTERN = re.compile(r'''\buser_id['"]?\s*[:=]\s*['"]?([\w.@-]+)''')
+# Tokens Bearer e JWTs
+TOKEN_PATTERNS = [
+    re.compile(r'Bearer\s+[\w\-\.~+/]+=*', re.IGNORECASE),
+    re.compile(r'\beyJ[\w-]+\.[\w-]+\.[\w-]+')
+]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS completions (
+    key TEXT PRIMARY KEY,
+    namespace TEXT NOT NULL,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_completions_accessed ON completions (accessed_at);
+CREATE INDEX IF NOT EXISTS idx_completions_namespace ON completions (namespace);
+"""
+
+def _hash_titular(valor: str) -> str:
+    return hashlib.sha256(valor.encode('utf-8')).hexdigest()[:16]
+
+def namespace_for_cpf(cpf: str) -> str:
+    """Identificador do titular usado para isolar (e apagar) as entradas de um CPF."""
+    return _hash_titular(re.sub(r'[^\d]', '', cpf))
+
+def namespace_for_user(user_id: str) -> str:
+    """Identificador do titular usado para isolar (e apagar) as entradas de um user_id."""
+    return _hash_titular(f"user:{user_id}")
+
+class DiskCompletionCache(BaseCache):
+    """Cache de completions do LLM em SQLite, com TTL, limite de tamanho e proteção de dados pessoais.
+
+    A chave é o hash do modelo/parâmetros (llm_string) e das mensagens (prompt). O arquivo pode
+    ser compartilhado por vários workers no mesmo host. Prompts com CPF, user_id ou tokens são
+    ignorados (política 'exclude') ou isolados em um namespace por titular (política 'namespace'),
+    o que permite apagar as entradas de um cidadão com clear(cpf=...) ou clear(user_id=...).
+    """
+
+    def __init__(self, path: str, ttl: float, max_bytes: int,
+                 pii_policy: str = PII_POLICY_EXCLUDE):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.pii_policy = pii_policy
+        self._local = threading.local()
+        self._writes_since_evict = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn().executescript(SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def _key(self, prompt: str, llm_string: str) -> Optional[Tuple[str, str]]:
+        """Retorna (chave, namespace), ou None se o prompt não puder ser armazenado."""
+        cpfs = CPF_PATTERN.findall(prompt)
+        user_ids = USER_ID_PATTERN.findall(prompt)
+        tokens = [t for pattern in TOKEN_PATTERNS for t in pattern.findall(prompt)]
+        namespace = ''
+        if cpfs or user_ids or tokens:
+            if self.pii_policy != PII_POLICY_NAMESPACE:
+                return None
+            titulares = sorted(
+                {namespace_for_cpf(c) for c in cpfs} |
+                {namespace_for_user(u) for u in user_ids} |
+                {_hash_titular(t) for t in tokens}
+            )
+            namespace = ',' + ','.join(titulares) + ','
+        digest = hashlib.sha256(f"{namespace}\x00{llm_string}\x00{prompt}".encode('utf-8')).hexdigest()
+        return digest, namespace
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[Sequence[Generation]]:
+        key = self._key(prompt, llm_string)
+        if key is None:
+            metrics.incr('llm_cache.excluidos')
+            return None
+
+        now = time.time()
+        try:
+            row = self._conn().execute(
+                'SELECT value, created_at FROM completions WHERE key = ?', (key[0],)
+            ).fetchone()
+            if row is None or now - row[1] > self.ttl:
+                metrics.incr('llm_cache.misses')
+                return None
+            self._conn().execute('UPDATE completions SET accessed_at = ? WHERE key = ?', (now, key[0]))
+            metrics.incr('llm_cache.hits')
+            return loads(row[0])
+        except (sqlite3.Error, ValueError) as e:
+            logger.warning("Falha ao consultar o cache de completions: %s", e)
+            return None
+
+    def update(self, prompt: str, llm_string: str, return_val: Sequence[Generation]) -> None:
+        key = self._key(prompt, llm_string)
+        if key is None:
+            return
+
+        value = dumps(list(return_val))
+        now = time.time()
+        try:
+            self._conn().execute(
+                'INSERT OR REPLACE INTO completions (key, namespace, value, size, created_at, accessed_at) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (key[0], key[1], value, len(value), now, now)
+            )
+            with self._lock:
+                self._writes_since_evict += 1
+                evict = self._writes_since_evict >= 50
+                if evict:
+                    self._writes_since_evict = 0
+            if evict:
+                self.evict()
+        except sqlite3.Error as e:
+            logger.warning("Falha ao gravar no cache de completions: %s", e)
+
+    def evict(self):
+        """Remove entradas expiradas e, acima de max_bytes, as menos acessadas."""
+        conn = self._conn()
+        conn.execute('DELETE FROM completions WHERE created_at < ?', (time.time() - self.ttl,))
+        total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM completions').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        excesso = total - int(self.max_bytes * 0.9)
+        removidos = 0
+        for key, size in conn.execute('SELECT key, size FROM completions ORDER BY accessed_at').fetchall():
+            if removidos >= excesso:
+                break
+            conn.execute('DELETE FROM completions WHERE key = ?', (key,))
+            removidos += size
+        metrics.incr('llm_cache.bytes_removidos', removidos)
+
+    def clear(self, **kwargs: Any) -> None:
+        """Esvazia o cache; com cpf=... e/ou user_id=..., remove apenas as entradas daquele titular."""
+        cpf = kwargs.get('cpf')
+        user_id = kwargs.get('user_id')
+        if cpf is None and user_id is None:
+            self._conn().execute('DELETE FROM completions')
+            return
+        namespaces = []
+        if cpf is not None:
+            namespaces.append(namespace_for_cpf(cpf))
+        if user_id is not None:
+            namespaces.append(namespace_for_user(user_id))
+        for namespace in namespaces:
+            self._conn().execute('DELETE FROM completions WHERE namespace LIKE ?', (f"%,{namespace},%",))
@@ -0,0 +1,42 @@
+import threading
+import time
+from typing import Any, Dict
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from app.utils.timing import FASE_LLM, current_timings
+
+class LlmTimingCallback(BaseCallbackHandler):
+    """Soma a duração de cada chamada ao modelo na fase 'llm' da requisição cronometrada.
+
+    Cada chamada corresponde a uma iteração do agente (pensamento + escolha da ferramenta).
+    """
+
+    def __init__(self):
+        self._starts: Dict[UUID, float] = {}
+        self._lock = threading.Lock()
+
+    def _start(self, run_id: UUID):
+        if current_timings() is not None:
+            with self._lock:
+                self._starts[run_id] = time.perf_counter()
+
+    def on_llm_start(self, serialized: Dict[str, Any], prompts: Any, *, run_id: UUID, **kwargs: Any):
+        self._start(run_id)
+
+    def on_chat_model_start(self, serialized: Dict[str, Any], messages: Any, *, run_id: UUID, **kwargs: Any):
+        self._start(run_id)
+
+    def _end(self, run_id: UUID):
+        with self._lock:
+            inicio = self._starts.pop(run_id, None)
+        timings = current_timings()
+        if inicio is not None and timings is not None:
+            timings.add(FASE_LLM, time.perf_counter() - inicio)
+
+    def on_llm_end(self, response: Any, *, run_id: UUID, **kwargs: Any):
+        self._end(run_id)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any):
+        self._end(run_id)
\ No newline at end of file
@@ -6,6 +6,16 @@ from .types import (
     ReservaHorarioPayload,
     SugestaoAgendamentoPayload
 )
+from .records import (
+    Record,
+    TokenRecord,
+    VeiculoRecord,
+    DoadorRecord,
+    DoacaoRecord,
+    UnidadeRecord,
+    HorarioRecord,
+    project_response
+)
 
 __all__ = [
     'TokenResponse',
@@ -13,5 +23,13 @@ __all__ = [
     'ServiceCodeDataItem',
     'AtualizarVeiculosPayload',
     'ReservaHorarioPayload',
-    'SugestaoAgendamentoPayload'
+    'SugestaoAgendamentoPayload',
+    'Record',
+    'TokenRecord',
+    'VeiculoRecord',
+    'DoadorRecord',
+    'DoacaoRecord',
+    'UnidadeRecord',
+    'HorarioRecord',
+    'project_response'
 ]
\ No newline at end of file
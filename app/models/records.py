@@ -0,0 +1,241 @@
+import logging
+from typing import Any, Callable, ClassVar, Dict, Iterable, List, Optional, Tuple
+
+from app.config import Config
+from app.utils.metrics import metrics
+from app.utils.raw_response import RawResponse, invalid_json
+
+logger = logging.getLogger(__name__)
+
+# --- Registros compactos (__slots__) decodificados das respostas das APIs ---
+#
+# Cada registro declara os campos que a aplicação usa; a decodificação lê esses campos
+# (com nomes alternativos) e converte tipos em uma passada. Registros com o slot `extras`
+# guardam ali os campos não declarados, para que a projeção não perca dados da resposta.
+
+Campo = Tuple[str, Tuple[str, ...], Callable[[Any], Any], bool, Any]
+
+def texto(value: Any) -> str:
+    if isinstance(value, (dict, list)):
+        raise TypeError("esperado valor escalar")
+    return value if isinstance(value, str) else str(value)
+
+def inteiro(value: Any) -> int:
+    if isinstance(value, bool):
+        raise TypeError("esperado inteiro")
+    return int(value)
+
+def real(value: Any) -> float:
+    if isinstance(value, bool):
+        raise TypeError("esperado número")
+    return float(value)
+
+def booleano(value: Any) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() in ('1', 'true', 'sim', 's')
+    return bool(value)
+
+def ident(value: Any) -> Any:
+    """Identificador escalar; relações expandidas ({"id": ...}) viram o próprio id."""
+    if isinstance(value, dict):
+        value = value.get('id')
+    if value is None or isinstance(value, (dict, list)):
+        raise TypeError("esperado identificador")
+    return value
+
+def idents(value: Any) -> List[Any]:
+    if not isinstance(value, list):
+        raise TypeError("esperada lista")
+    return [ident(item) for item in value if item is not None]
+
+def campo(nome: str, *aliases: str, tipo: Callable[[Any], Any] = texto,
+          obrigatorio: bool = False, padrao: Any = None) -> Campo:
+    """Declara um campo: nome do atributo, chaves aceitas na resposta, conversor e padrão."""
+    return (nome, (nome,) + aliases, tipo, obrigatorio, padrao)
+
+class Record:
+    """Base dos registros: decodificação com projeção e validação barata."""
+
+    __slots__ = ()
+    FIELDS: ClassVar[Tuple[Campo, ...]] = ()
+    # Campo que recebe o item quando a API devolve um escalar em vez de um objeto
+    SCALAR_FIELD: ClassVar[Optional[str]] = None
+    # Chaves declaradas (nomes e aliases), excluídas de `extras`
+    _CHAVES: ClassVar[frozenset] = frozenset()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._CHAVES = frozenset(chave for field in cls.FIELDS for chave in field[1])
+
+    @classmethod
+    def decode(cls, data: Any) -> Optional["Record"]:
+        """Cria o registro a partir de um item da resposta; None se inválido."""
+        if not isinstance(data, dict):
+            if cls.SCALAR_FIELD is None or data is None or isinstance(data, list):
+                return None
+            data = {cls.SCALAR_FIELD: data}
+
+        record = cls.__new__(cls)
+        for nome, chaves, tipo, obrigatorio, padrao in cls.FIELDS:
+            value = None
+            for chave in chaves:
+                value = data.get(chave)
+                if value is not None:
+                    break
+            if value is not None:
+                try:
+                    value = tipo(value)
+                except (TypeError, ValueError):
+                    value = None
+            if value is None or value == '':
+                if obrigatorio:
+                    return None
+                value = padrao if value is None else value
+            setattr(record, nome, value)
+        if 'extras' in cls.__slots__:
+            record.extras = {k: v for k, v in data.items() if k not in cls._CHAVES}
+        return record
+
+    @classmethod
+    def decode_list(cls, items: Iterable[Any]) -> List["Record"]:
+        """Decodifica uma lista de itens, descartando (e contando) os inválidos."""
+        records = []
+        invalidos = 0
+        for item in items:
+            record = cls.decode(item)
+            if record is None:
+                invalidos += 1
+            else:
+                records.append(record)
+        if invalidos:
+            metrics.incr(f"modelos.{cls.__name__}.invalidos", invalidos)
+        return records
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Representação em dicionário, sem os campos ausentes, com os campos extras."""
+        result = dict(getattr(self, 'extras', None) or {})
+        for nome in self.__slots__:
+            if nome == 'extras':
+                continue
+            value = getattr(self, nome)
+            if value is not None:
+                result[nome] = value
+        return result
+
+    def __eq__(self, other: Any) -> bool:
+        return type(self) is type(other) and all(
+            getattr(self, nome) == getattr(other, nome) for nome in self.__slots__
+        )
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+def _slots(fields: Tuple[Campo, ...]) -> Tuple[str, ...]:
+    return tuple(field[0] for field in fields)
+
+class TokenRecord(Record):
+    FIELDS = (
+        campo('access_token', obrigatorio=True),
+        campo('expires_in', tipo=inteiro, padrao=3600),
+        campo('refresh_token'),
+        campo('scope'),
+        campo('token_type')
+    )
+    __slots__ = _slots(FIELDS)
+
+class VeiculoRecord(Record):
+    """Veículo gravado de volta no perfil: nenhum campo é obrigatório e os campos não
+    declarados são preservados em `extras`, para que a projeção não perca dados."""
+
+    FIELDS = (
+        campo('id', tipo=ident, padrao=''),
+        campo('plate', 'placa', padrao=''),
+        campo('model', 'modelo', padrao=''),
+        campo('brandLogo', 'logoMarca', padrao='')
+    )
+    __slots__ = _slots(FIELDS) + ('extras',)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Formato Veiculo do perfil (todos os campos, id como texto), com os campos extras."""
+        return {**self.extras, "id": str(self.id), "plate": self.plate, "model": self.model,
+                "brandLogo": self.brandLogo}
+
+class DoadorRecord(Record):
+    FIELDS = (
+        campo('id', tipo=ident, obrigatorio=True),
+        campo('cpf'),
+        campo('nome'),
+        campo('sexo'),
+        campo('data_nascimento'),
+        campo('tipo_sanguineo'),
+        campo('fator_rh'),
+        campo('apto', 'apto_doacao', tipo=booleano),
+        campo('data_ultima_doacao'),
+        campo('doacoes', tipo=idents)
+    )
+    __slots__ = _slots(FIELDS) + ('extras',)
+
+class DoacaoRecord(Record):
+    FIELDS = (
+        campo('id', tipo=ident, obrigatorio=True),
+        campo('doador', tipo=ident),
+        campo('data', 'data_doacao'),
+        campo('tipo', 'tipo_doacao'),
+        campo('volume_ml', 'volume', tipo=real),
+        campo('local', 'hemocentro', 'unidade', tipo=lambda v: v.get('nome') if isinstance(v, dict) else texto(v)),
+        campo('status')
+    )
+    __slots__ = _slots(FIELDS) + ('extras',)
+
+class UnidadeRecord(Record):
+    FIELDS = (
+        campo('id', tipo=ident, obrigatorio=True),
+        campo('nome'),
+        campo('endereco'),
+        campo('municipio', tipo=ident),
+        campo('telefone'),
+        campo('latitude', 'lat', tipo=real),
+        campo('longitude', 'lng', 'lon', tipo=real)
+    )
+    __slots__ = _slots(FIELDS) + ('extras',)
+
+class HorarioRecord(Record):
+    """Horário de atendimento; a hora não é obrigatória, já que o formato da SESA varia."""
+
+    FIELDS = (
+        campo('hora', 'horario'),
+        campo('data'),
+        campo('vagas', tipo=inteiro),
+        campo('id', tipo=ident)
+    )
+    __slots__ = _slots(FIELDS) + ('extras',)
+    SCALAR_FIELD = 'hora'
+
+def project_response(result: Any, record_cls: type) -> Any:
+    """Projeta os itens de uma resposta (lista pura ou envelopada em 'data') no registro informado.
+
+    Corpos brutos (RawResponse) são percorridos item a item, sem decodificar a resposta inteira;
+    um corpo inválido vira o mesmo erro "Invalid JSON" de _make_request. Respostas de erro e
+    formatos desconhecidos são devolvidos sem alteração.
+    """
+    if not Config.MODEL_PROJECTION_ENABLED:
+        return result
+    if isinstance(result, RawResponse):
+        if result.truncated:
+            logger.error("Resposta truncada ao projetar %s (%d bytes).", record_cls.__name__, len(result))
+            return invalid_json()
+        if not result.has_list('data'):
+            return result
+        try:
+            projected = [record.to_dict() for record in record_cls.decode_list(result.iter_items('data'))]
+        except ValueError as e:
+            logger.error("Resposta inválida ao projetar %s: %s", record_cls.__name__, e)
+            return invalid_json()
+        return projected if result.is_list else {"data": projected}
+    if isinstance(result, list):
+        return [record.to_dict() for record in record_cls.decode_list(result)]
+    if isinstance(result, dict) and 'error' not in result and isinstance(result.get('data'), list):
+        projected = dict(result)
+        projected['data'] = [record.to_dict() for record in record_cls.decode_list(result['data'])]
+        return projected
+    return result
\ No newline at end of file
@@ -6,6 +6,7 @@ class TokenResponse(TypedDict):
     access_token: str
     expires_in: int
     refresh_token: Optional[str]
+    scope: Optional[str]
 
 class Veiculo(TypedDict):
     id: str
@@ -0,0 +1,3 @@
+from .detran_sync import DetranSyncPipeline, ler_pares
+
+__all__ = ['DetranSyncPipeline', 'ler_pares']
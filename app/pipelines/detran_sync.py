@@ -0,0 +1,194 @@
+import csv
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from app.clients.detran import DetranClient
+from app.config import Config
+from app.models.types import Veiculo
+from app.models.records import VeiculoRecord
+from app.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+STATUS_SINCRONIZADO = 'sincronizado'
+STATUS_IGNORADO = 'ignorado'
+STATUS_FALHA = 'falha'
+
+# (cpf, user_id, user_token opcional)
+Par = Tuple[str, str, Optional[str]]
+
+def ler_pares(path: str) -> Iterator[Par]:
+    """Lê pares CPF/user_id de um arquivo CSV (com cabeçalho) ou JSONL, sob demanda."""
+    with open(path, encoding='utf-8') as f:
+        if path.endswith('.jsonl'):
+            for line in f:
+                if line.strip():
+                    item = json.loads(line)
+                    yield item['cpf'], str(item['user_id']), item.get('user_token')
+        else:
+            for row in csv.DictReader(f):
+                yield row['cpf'], row['user_id'], row.get('user_token') or None
+
+def _veiculos_da_resposta(result: Any) -> Optional[List[Veiculo]]:
+    """Converte a resposta de get_vehicles na lista de veículos esperada pelo perfil.
+
+    Retorna None se o formato não for reconhecido ou se algum item não puder ser decodificado:
+    a lista enviada substitui a do perfil, então só é devolvida completa (e a lista vazia só
+    quando a API devolveu explicitamente uma lista vazia).
+    """
+    if isinstance(result, dict):
+        if isinstance(result.get('data'), list):
+            result = result['data']
+        elif isinstance(result.get('veiculos'), list):
+            result = result['veiculos']
+        else:
+            return None
+    if not isinstance(result, list):
+        return None
+
+    veiculos = VeiculoRecord.decode_list(result)
+    if len(veiculos) != len(result):
+        # Itens que não puderam ser decodificados seriam apagados do perfil
+        return None
+    return [veiculo.to_dict() for veiculo in veiculos]
+
+class DetranSyncPipeline:
+    """Sincroniza em lote os "meus veículos" de muitos cidadãos, sem agente/LLM.
+
+    As entradas são consumidas em streaming com concorrência limitada; cada par concluído
+    é registrado no checkpoint (JSONL) e ignorado em execuções seguintes.
+    """
+
+    def __init__(self, client: DetranClient, max_workers: Optional[int] = None,
+                 checkpoint_path: Optional[str] = None,
+                 checkpoint_every: Optional[int] = None):
+        self.client = client
+        self.max_workers = max_workers or Config.DETRAN_SYNC_MAX_WORKERS
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_every = checkpoint_every or Config.DETRAN_SYNC_CHECKPOINT_EVERY
+        self._lock = threading.Lock()
+        self._checkpoint_file = None
+        self._pendentes_flush = 0
+
+    def _carregar_checkpoint(self) -> Set[str]:
+        """Retorna os user_ids já concluídos em execuções anteriores."""
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return set()
+
+        concluidos = set()
+        with open(self.checkpoint_path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    concluidos.add(json.loads(line)['user_id'])
+                except (ValueError, KeyError):
+                    # Linha truncada por uma interrupção anterior
+                    continue
+        return concluidos
+
+    def _registrar_checkpoint(self, user_id: str, status: str):
+        """Anota um par concluído no checkpoint, gravando em disco a cada checkpoint_every."""
+        if not self._checkpoint_file:
+            return
+        with self._lock:
+            self._checkpoint_file.write(json.dumps({"user_id": user_id, "status": status}) + '\n')
+            self._pendentes_flush += 1
+            if self._pendentes_flush >= self.checkpoint_every:
+                self._checkpoint_file.flush()
+                self._pendentes_flush = 0
+
+    def sincronizar(self, cpf: str, user_id: str, user_token: Optional[str] = None) -> Dict[str, Any]:
+        """Busca os veículos de um CPF e atualiza o perfil do respectivo usuário."""
+        vehicles = self.client.get_vehicles(cpf)
+        if isinstance(vehicles, dict) and 'error' in vehicles:
+            return {"status": STATUS_FALHA, "etapa": "get_vehicles", "error": vehicles['error']}
+
+        veiculos = _veiculos_da_resposta(vehicles)
+        if veiculos is None:
+            return {"status": STATUS_FALHA, "etapa": "get_vehicles", "error": "formato inesperado"}
+
+        result = self.client.atualizar_veiculos(user_id, veiculos, user_token_override=user_token)
+        if isinstance(result, dict) and 'error' in result:
+            return {"status": STATUS_FALHA, "etapa": "atualizar_veiculos", "error": result['error']}
+
+        status = STATUS_IGNORADO if isinstance(result, dict) and result.get('skipped') else STATUS_SINCRONIZADO
+        return {"status": status}
+
+    def run(self, pares: Iterable[Par]) -> Dict[str, Any]:
+        """Executa a sincronização e retorna o relatório de vazão e falhas."""
+        concluidos = self._carregar_checkpoint()
+        contagem = {STATUS_SINCRONIZADO: 0, STATUS_IGNORADO: 0, STATUS_FALHA: 0, 'retomados': 0}
+        falhas: List[Dict[str, Any]] = []
+
+        # Obtém os tokens de sistema compartilhados antes de abrir a concorrência
+        self.client.auth_manager.warm_up(self.client.REQUIRED_SCOPES)
+
+        if self.checkpoint_path:
+            self._checkpoint_file = open(self.checkpoint_path, 'a', encoding='utf-8')
+
+        inicio = time.monotonic()
+        pendentes: Dict[Future, Par] = {}
+
+        def coletar(done: Iterable[Future]):
+            for future in done:
+                cpf, user_id, _ = pendentes.pop(future)
+                try:
+                    resultado = future.result()
+                except Exception as e:
+                    logger.error("Erro inesperado ao sincronizar user_id %s: %s", user_id, e, exc_info=True)
+                    resultado = {"status": STATUS_FALHA, "etapa": "interno", "error": str(e)}
+
+                contagem[resultado['status']] += 1
+                metrics.incr(f"detran.sync.{resultado['status']}")
+                if resultado['status'] == STATUS_FALHA:
+                    falhas.append({"user_id": user_id, "etapa": resultado['etapa'], "error": resultado['error']})
+                else:
+                    self._registrar_checkpoint(user_id, resultado['status'])
+
+                processados = sum(contagem[s] for s in (STATUS_SINCRONIZADO, STATUS_IGNORADO, STATUS_FALHA))
+                if processados % 100 == 0:
+                    logger.info("Sincronização DETRAN: %d processados (%.1f/s).",
+                                processados, processados / max(time.monotonic() - inicio, 1e-6))
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                for cpf, user_id, user_token in pares:
+                    if user_id in concluidos:
+                        contagem['retomados'] += 1
+                        continue
+
+                    if len(pendentes) >= self.max_workers * 2:
+                        done, _ = wait(pendentes, return_when=FIRST_COMPLETED)
+                        coletar(done)
+
+                    future = executor.submit(self.sincronizar, cpf, user_id, user_token)
+                    pendentes[future] = (cpf, user_id, user_token)
+
+                while pendentes:
+                    done, _ = wait(pendentes, return_when=FIRST_COMPLETED)
+                    coletar(done)
+        finally:
+            if self._checkpoint_file:
+                self._checkpoint_file.close()
+                self._checkpoint_file = None
+
+        duracao = time.monotonic() - inicio
+        processados = contagem[STATUS_SINCRONIZADO] + contagem[STATUS_IGNORADO] + contagem[STATUS_FALHA]
+        relatorio = {
+            "processados": processados,
+            "sincronizados": contagem[STATUS_SINCRONIZADO],
+            "ignorados": contagem[STATUS_IGNORADO],
+            "falhas": contagem[STATUS_FALHA],
+            "retomados_do_checkpoint": contagem['retomados'],
+            "duracao_s": round(duracao, 3),
+            "vazao_por_s": round(processados / duracao, 2) if duracao > 0 else None,
+            "erros": falhas
+        }
+
+        logger.info("Sincronização DETRAN concluída: %d processados, %d falhas, %s/s.",
+                    processados, contagem[STATUS_FALHA], relatorio['vazao_por_s'])
+        return relatorio
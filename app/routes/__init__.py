@@ -1,7 +1,15 @@
-from flask import Flask, jsonify
+import threading
+from flask import Flask, jsonify, request, g
+from app.config import Config
+from app.utils.metrics import metrics
+from .admin import admin_bp
 from .hemoes import hemoes_bp
 from .detran import detran_bp
 from .sesa import sesa_bp
+from .query import query_bp
+
+ORGAO_BLUEPRINTS = ('hemoes', 'detran', 'sesa')
+PROFILED_BLUEPRINTS = ORGAO_BLUEPRINTS + ('query',)
 
 def register_blueprints(app: Flask):
     """Registra todos os blueprints da aplicação."""
@@ -14,7 +22,49 @@ def register_blueprints(app: Flask):
             "version": "1.0"
         })
     
+    # Prontidão: tokens de sistema dos escopos registrados já obtidos
+    @app.route('/ready')
+    def ready():
+        pendentes = app.auth_manager.missing_scopes()
+        if pendentes:
+            app.auth_manager.warm_up_async()
+            return jsonify({"ready": False, "escopos_pendentes": pendentes}), 503
+        return jsonify({"ready": True})
+    
+    # Métricas internas
+    @app.route('/metrics')
+    def metrics_endpoint():
+        snapshot = metrics.snapshot()
+        snapshot['pacing'] = {
+            name: client.limiter.snapshot()
+            for name, client in app.clients.items() if client.limiter is not None
+        }
+        return jsonify(snapshot)
+    
+    # Profiling por amostragem das rotas dos órgãos
+    @app.before_request
+    def profiling_begin():
+        if request.blueprint in PROFILED_BLUEPRINTS and app.profiler.should_sample():
+            g.profiled_thread = threading.get_ident()
+            app.profiler.begin(g.profiled_thread)
+    
+    @app.teardown_request
+    def profiling_end(exc):
+        thread_id = g.pop('profiled_thread', None)
+        if thread_id is not None:
+            app.profiler.end(thread_id)
+    
+    # Acurácia do roteador de /query medida nas rotas por órgão (o órgão chamado é o esperado)
+    @app.before_request
+    def classifier_shadow():
+        if Config.QUERY_CLASSIFIER_SHADOW and request.blueprint in ORGAO_BLUEPRINTS:
+            data = request.get_json(silent=True)
+            if isinstance(data, dict) and isinstance(data.get('query'), str):
+                app.classifier.observe(data['query'], request.blueprint.upper())
+    
     # Registrar blueprints
     app.register_blueprint(hemoes_bp)
     app.register_blueprint(detran_bp)
-    app.register_blueprint(sesa_bp)
\ No newline at end of file
+    app.register_blueprint(sesa_bp)
+    app.register_blueprint(query_bp)
+    app.register_blueprint(admin_bp)
\ No newline at end of file
@@ -0,0 +1,66 @@
+import hmac
+from functools import wraps
+from typing import Any, Optional
+from flask import Blueprint, request, jsonify, current_app
+from app.config import Config
+
+admin_bp = Blueprint('admin', __name__)
+
+def admin_required(view):
+    """Exige o cabeçalho X-Admin-Token igual a ADMIN_TOKEN (rotas desativadas se não configurado)."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        token = request.headers.get('X-Admin-Token', '')
+        if not Config.ADMIN_TOKEN or not hmac.compare_digest(token, Config.ADMIN_TOKEN):
+            return jsonify({"error": "Acesso restrito a administradores."}), 403
+        return view(*args, **kwargs)
+    return wrapper
+
+def _taxa_valida(value: Any) -> Optional[float]:
+    """Taxa de amostragem informada (0 < taxa <= 1), ou None se inválida."""
+    if isinstance(value, bool):
+        return None
+    try:
+        taxa = float(value)
+    except (TypeError, ValueError):
+        return None
+    return taxa if 0 < taxa <= 1 else None
+
+@admin_bp.route('/admin/profiling', methods=['GET'])
+@admin_required
+def profiling_status():
+    """Estado atual do profiling e resumo das amostras coletadas."""
+    profiler = current_app.profiler
+    return jsonify({
+        "ativo": profiler.running,
+        "taxa_amostragem": profiler.sample_rate,
+        "resumo": profiler.summary()
+    })
+
+@admin_bp.route('/admin/profiling', methods=['POST'])
+@admin_required
+def profiling_control():
+    """Controla o profiling: {"acao": "iniciar" | "parar" | "gravar", "taxa": 0.1}."""
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        data = {}
+    acao = data.get('acao')
+    profiler = current_app.profiler
+    
+    if acao == 'iniciar':
+        taxa = data.get('taxa')
+        if taxa is not None:
+            taxa = _taxa_valida(taxa)
+            if taxa is None:
+                return jsonify({"error": "Campo 'taxa' deve ser um número entre 0 e 1."}), 400
+        profiler.start(taxa)
+        return jsonify({"ativo": True, "taxa_amostragem": profiler.sample_rate})
+    
+    if acao == 'parar':
+        profiler.stop()
+        return jsonify({"ativo": False, "arquivos": profiler.dump()})
+    
+    if acao == 'gravar':
+        return jsonify({"ativo": profiler.running, "arquivos": profiler.dump()})
+    
+    return jsonify({"error": "Campo 'acao' deve ser 'iniciar', 'parar' ou 'gravar'."}), 400
\ No newline at end of file
@@ -0,0 +1,63 @@
+import math
+from functools import wraps
+from typing import Any, Dict
+from flask import current_app, jsonify, make_response, request
+from app.config import Config
+from app.utils.admission import AdmissionRejected
+from app.utils.request_scope import cpf_key
+from app.utils.scheduler import classificar_requisicao
+from app.utils.timing import FASE_ADMISSAO, RequestTimings, request_timings, timed
+
+def admission_args() -> Dict[str, Any]:
+    """Chamador, CPF e classe da requisição atual, para AdmissionController.acquire.
+
+    O chamador é o endereço de origem da conexão: o cabeçalho X-Client-Id é informado
+    pelo próprio cliente e não pode servir de chave para o limite de taxa.
+    """
+    data = request.get_json(silent=True) or {}
+    user_context = data.get('user_context') if isinstance(data, dict) else None
+    cpf = user_context.get('cpf') if isinstance(user_context, dict) else None
+    return {
+        "caller": request.remote_addr,
+        "cpf": cpf_key(cpf) if cpf else None,
+        "classe": classificar_requisicao(data.get('query', '') if isinstance(data, dict) else '', user_context)
+    }
+
+def rejection_response(e: AdmissionRejected):
+    response = jsonify({"error": e.motivo})
+    response.status_code = e.status
+    response.headers['Retry-After'] = str(max(1, math.ceil(e.retry_after)))
+    return response
+
+def with_timings(response, timings: RequestTimings):
+    """Anexa os tempos por fase: cabeçalho Server-Timing e, se pedido ("timings": true), o campo timings."""
+    if Config.SERVER_TIMING_ENABLED:
+        response.headers['Server-Timing'] = timings.server_timing(Config.SERVER_TIMING_MAX_TOOLS)
+    data = request.get_json(silent=True)
+    if isinstance(data, dict) and data.get('timings') is True and response.is_json:
+        body = response.get_json()
+        if isinstance(body, dict):
+            body['timings'] = timings.to_dict()
+            response.set_data(current_app.json.dumps(body))
+    return response
+
+def admitted(orgao: str):
+    """Submete o endpoint ao controle de admissão da aplicação (concorrência, fila, prioridade e taxa)."""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            controller = current_app.admission
+            with request_timings() as timings:
+                try:
+                    with timed(FASE_ADMISSAO):
+                        controller.acquire(orgao, **admission_args())
+                except AdmissionRejected as e:
+                    return rejection_response(e)
+                
+                try:
+                    response = make_response(view(*args, **kwargs))
+                finally:
+                    controller.release(orgao)
+                return with_timings(response, timings)
+        return wrapper
+    return decorator
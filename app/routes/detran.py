@@ -1,9 +1,11 @@
 from flask import Blueprint, request, jsonify, current_app
-from app.utils.helpers import process_query
+from app.utils.helpers import process_query_cascade
+from .admission import admitted
 
 detran_bp = Blueprint('detran', __name__)
 
 @detran_bp.route('/detran', methods=['POST'])
+@admitted('DETRAN')
 def detran_endpoint():
     """Endpoint para consultas do DETRAN."""
     data = request.get_json()
@@ -11,11 +13,15 @@ def detran_endpoint():
     if not data or 'query' not in data:
         return jsonify({"error": "Campo 'query' é obrigatório."}), 400
     
-    result = process_query(
-        current_app.agents['detran'],
+    session = current_app.sessions.resolve(data.get('conversation_id'), 'DETRAN', data.get('user_context'))
+    result = process_query_cascade(
+        current_app.agent_tiers['detran'],
         data['query'],
         'DETRAN',
-        data.get('user_context')
+        data.get('user_context'),
+        current_app.clients,
+        session=session
     )
+    result['conversation_id'] = session.id
     
     return jsonify(result)
\ No newline at end of file
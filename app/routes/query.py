@@ -0,0 +1,107 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+from flask import Blueprint, Flask, request, jsonify, current_app
+from app.config import Config
+from app.utils.admission import AdmissionRejected
+from .admission import admission_args, rejection_response
+
+logger = logging.getLogger(__name__)
+
+query_bp = Blueprint('query', __name__)
+
+# Execuções simultâneas dos órgãos de uma consulta multi-órgão
+_executor = ThreadPoolExecutor(max_workers=Config.QUERY_MAX_WORKERS, thread_name_prefix='query')
+
+def _run_orgao(app: Flask, orgao: str, query: str, user_context: Optional[Dict],
+               conversation_id: Optional[str], classe: str) -> Dict[str, Any]:
+    """Executa a consulta no agente de um órgão, ocupando uma vaga daquele órgão no controle de
+    admissão (em uma thread do pool, sem contexto da aplicação). A taxa já foi cobrada na rota."""
+    try:
+        app.admission.acquire(orgao, classe=classe)
+    except AdmissionRejected as e:
+        return {"success": False, "error": e.motivo, "status": e.status, "retry_after": e.retry_after}
+    try:
+        session = app.sessions.resolve(conversation_id, orgao, user_context)
+        result = app.runtime.run(orgao, query, user_context, session=session)
+        result['conversation_id'] = session.id
+        return result
+    except Exception:
+        logger.exception("Erro na consulta %s da rota unificada.", orgao)
+        return {"success": False, "error": "Ocorreu um erro interno ao processar sua solicitação."}
+    finally:
+        app.admission.release(orgao)
+
+def _merge(orgaos: List[str], results: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Combina as respostas dos órgãos em uma só, identificando a origem de cada trecho."""
+    respostas = [
+        f"[{orgao}]\n{results[orgao]['response']}"
+        for orgao in orgaos if results[orgao].get('success')
+    ]
+    erros = {
+        orgao: results[orgao].get('error', 'Falha desconhecida.')
+        for orgao in orgaos if not results[orgao].get('success')
+    }
+    merged: Dict[str, Any] = {
+        "success": bool(respostas),
+        "orgaos": orgaos,
+        "metadata": {orgao: results[orgao].get('metadata', {}) for orgao in orgaos if results[orgao].get('success')},
+        "conversation_ids": {
+            orgao: results[orgao]['conversation_id'] for orgao in orgaos if 'conversation_id' in results[orgao]
+        }
+    }
+    if respostas:
+        merged['response'] = '\n\n'.join(respostas)
+    if erros:
+        merged['erros'] = erros
+    if not respostas:
+        merged['error'] = "Nenhum órgão conseguiu responder à consulta."
+    return merged
+
+@query_bp.route('/query', methods=['POST'])
+def query_endpoint():
+    """Endpoint unificado: escolhe o(s) órgão(s) pela consulta e combina as respostas."""
+    data = request.get_json()
+
+    if not isinstance(data, dict) or 'query' not in data:
+        return jsonify({"error": "Campo 'query' é obrigatório."}), 400
+    if not isinstance(data['query'], str) or not data['query'].strip():
+        return jsonify({"error": "Campo 'query' deve ser um texto não vazio."}), 400
+
+    classifier = current_app.classifier
+    orgaos = classifier.classify(data['query'])
+    if data.get('orgao_esperado'):
+        classifier.observe(data['query'], str(data['orgao_esperado']).upper(), orgaos)
+    if not orgaos:
+        return jsonify({
+            "error": "Não foi possível identificar o órgão da consulta; use /hemoes, /detran ou /sesa.",
+            "orgaos": []
+        }), 422
+
+    app = current_app._get_current_object()
+    conversation_ids = data.get('conversation_ids') or {}
+    if not isinstance(conversation_ids, dict):
+        conversation_ids = {}
+    admission = admission_args()
+    try:
+        # A taxa é cobrada uma vez por requisição, qualquer que seja o número de órgãos
+        app.admission.check_rate(admission['caller'], admission['cpf'])
+    except AdmissionRejected as e:
+        return rejection_response(e)
+    args = [
+        (app, orgao, data['query'], data.get('user_context'), conversation_ids.get(orgao), admission['classe'])
+        for orgao in orgaos
+    ]
+
+    if len(orgaos) == 1:
+        # Um único órgão roda na própria thread da requisição
+        result = _run_orgao(*args[0])
+        if not result.get('success') and 'status' in result:
+            return rejection_response(AdmissionRejected(result['status'], result['error'], result['retry_after']))
+        result['orgaos'] = orgaos
+        result['conversation_ids'] = {orgaos[0]: result['conversation_id']} if 'conversation_id' in result else {}
+        return jsonify(result)
+
+    futures = {orgao: _executor.submit(_run_orgao, *arg) for orgao, arg in zip(orgaos, args)}
+    results = {orgao: future.result() for orgao, future in futures.items()}
+    return jsonify(_merge(orgaos, results))
\ No newline at end of file
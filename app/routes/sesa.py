@@ -1,9 +1,12 @@
 from flask import Blueprint, request, jsonify, current_app
-from app.utils.helpers import process_query
+from app.clients.sesa import ERROS_PARAMETRO, ORDENAR_POR_HORARIO
+from app.utils.helpers import process_query_cascade
+from .admission import admitted
 
 sesa_bp = Blueprint('sesa', __name__)
 
 @sesa_bp.route('/sesa', methods=['POST'])
+@admitted('SESA')
 def sesa_endpoint():
     """Endpoint para consultas da SESA."""
     data = request.get_json()
@@ -11,11 +14,38 @@ def sesa_endpoint():
     if not data or 'query' not in data:
         return jsonify({"error": "Campo 'query' é obrigatório."}), 400
     
-    result = process_query(
-        current_app.agents['sesa'],
+    session = current_app.sessions.resolve(data.get('conversation_id'), 'SESA', data.get('user_context'))
+    result = process_query_cascade(
+        current_app.agent_tiers['sesa'],
         data['query'],
         'SESA',
-        data.get('user_context')
+        data.get('user_context'),
+        current_app.clients,
+        session=session
     )
+    result['conversation_id'] = session.id
     
-    return jsonify(result)
\ No newline at end of file
+    return jsonify(result)
+
+@sesa_bp.route('/sesa/horarios-disponiveis', methods=['POST'])
+def sesa_horarios_disponiveis_endpoint():
+    """Busca direta (sem agente) dos horários livres em todas as unidades."""
+    data = request.get_json()
+    
+    campos = ('municipio_id', 'servico_id', 'data_inicio')
+    if not isinstance(data, dict) or any(campo not in data for campo in campos):
+        return jsonify({"error": "Campos 'municipio_id', 'servico_id' e 'data_inicio' são obrigatórios."}), 400
+    
+    result = current_app.clients['sesa'].buscar_horarios_disponiveis(
+        data['municipio_id'],
+        data['servico_id'],
+        data['data_inicio'],
+        data.get('data_fim'),
+        ordenar_por=data.get('ordenar_por', ORDENAR_POR_HORARIO),
+        latitude=data.get('latitude'),
+        longitude=data.get('longitude'),
+        limite=data.get('limite')
+    )
+    
+    status = 400 if result.get('error') in ERROS_PARAMETRO else 200
+    return jsonify(result), status
\ No newline at end of file
@@ -1,15 +1,18 @@
-from .hemoes_tools import HemoesGetDoadorTool, HemoesGetDoacaoTool
+from .hemoes_tools import HemoesGetDoadorTool, HemoesGetDoacaoTool, HemoesGetDoadoresTool, HemoesGetDoacoesTool
 from .detran_tools import DetranSearchVehiclesTool, DetranFetchProfileTool, DetranAtualizarVeiculosTool
 from .sesa_tools import (
     SesaGetMunicipiosTool, SesaGetServicosTool, SesaGetUnidadesTool,
-    SesaGetHorariosTool, SesaGetSugestaoAgendamentoTool, SesaReservarHorarioTool,
-    SesaCheckAgendamentoExistenteTool, SesaCancelarAgendamentoTool
+    SesaGetHorariosTool, SesaBuscarHorariosDisponiveisTool, SesaGetSugestaoAgendamentoTool,
+    SesaReservarHorarioTool, SesaCheckAgendamentoExistenteTool, SesaCancelarAgendamentoTool
 )
+from .parallel import ExecutarEmParaleloTool
 
 __all__ = [
     # HEMOES Tools
     'HemoesGetDoadorTool',
     'HemoesGetDoacaoTool',
+    'HemoesGetDoadoresTool',
+    'HemoesGetDoacoesTool',
     
     # DETRAN Tools
     'DetranSearchVehiclesTool',
@@ -21,8 +24,12 @@ __all__ = [
     'SesaGetServicosTool',
     'SesaGetUnidadesTool',
     'SesaGetHorariosTool',
+    'SesaBuscarHorariosDisponiveisTool',
     'SesaGetSugestaoAgendamentoTool',
     'SesaReservarHorarioTool',
     'SesaCheckAgendamentoExistenteTool',
-    'SesaCancelarAgendamentoTool'
+    'SesaCancelarAgendamentoTool',
+    
+    # Execução em lote
+    'ExecutarEmParaleloTool'
 ]
\ No newline at end of file
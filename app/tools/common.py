@@ -0,0 +1,78 @@
+import json
+from typing import Any, Callable, Hashable, Iterable, Optional, Tuple
+from crewai.tools import BaseTool
+from app.utils.helpers import json_dumps
+from app.utils.metrics import metrics
+from app.utils.request_scope import cpf_key, current_scope
+from app.utils.timing import timed_tool
+
+# (ferramenta de leitura, quantidade de argumentos iniciais a casar com os da escrita)
+Invalidacao = Tuple[str, int]
+
+MENSAGEM_LIMITE = (
+    "LIMITE ATINGIDO ({limite}): não execute mais ferramentas. Responda agora ao usuário "
+    "com as informações já obtidas, deixando claro o que não foi possível verificar."
+)
+MENSAGEM_ESCRITA_REPETIDA = (
+    "OPERAÇÃO JÁ REALIZADA nesta solicitação ({ferramenta}); ela não foi executada novamente. "
+    "Resultado da execução anterior:\n{resultado}"
+)
+
+class ClientTool(BaseTool):
+    """Ferramenta que acessa as APIs pelo registro de clientes recebido na criação
+    (app.clients.ClientRegistry), sem depender do contexto da aplicação Flask."""
+    clients: Any
+
+def canonico(value: Any) -> str:
+    """Forma canônica (JSON ordenado) de um argumento estruturado, para compor chaves de escrita."""
+    return json.dumps(value, sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=str)
+
+def _limite_excedido() -> Optional[str]:
+    """Contabiliza a chamada no escopo e retorna a instrução de parada, se algum limite foi excedido."""
+    scope = current_scope()
+    limite = scope.consume_tool_call() if scope is not None else None
+    return MENSAGEM_LIMITE.format(limite=limite) if limite else None
+
+def _render(result: Any) -> str:
+    """Serializa o resultado para o agente, compactando-o se houver orçamento de prompt ativo."""
+    scope = current_scope()
+    if scope is not None and scope.budget is not None:
+        return scope.budget.render(result)
+    return json_dumps(result)
+
+def run_read_tool(tool_name: str, args: Tuple[Hashable, ...], func: Callable[[], Any]) -> str:
+    """Executa uma ferramenta de leitura, reaproveitando o resultado dentro da mesma requisição."""
+    parada = _limite_excedido()
+    if parada:
+        return parada
+    scope = current_scope()
+    with timed_tool(tool_name):
+        result = scope.memoize(tool_name, args, func) if scope else func()
+    return _render(result)
+
+def run_write_tool(tool_name: str, args: Tuple[Hashable, ...], func: Callable[[], Any],
+                   invalidates: Iterable[Invalidacao] = ()) -> str:
+    """Executa uma ferramenta de escrita e descarta as leituras memorizadas que ela afeta.
+
+    `args` identifica a escrita por completo (user_id seguido do conteúdo escrito, como o
+    payload da reserva ou o agendamento_id); cada leitura em `invalidates` é descartada pelo
+    prefixo de `args` do tamanho indicado. Uma escrita com os mesmos `args` de outra já
+    realizada na mesma solicitação (inclusive por um nível anterior da cascata de modelos)
+    não é repetida: o agente recebe o resultado anterior.
+    """
+    parada = _limite_excedido()
+    if parada:
+        return parada
+    scope = current_scope()
+    if scope:
+        realizada, anterior = scope.find_write(tool_name, args)
+        if realizada:
+            metrics.incr(f"ferramentas.{tool_name}.escritas_repetidas")
+            return MENSAGEM_ESCRITA_REPETIDA.format(ferramenta=tool_name, resultado=_render(anterior))
+    with timed_tool(tool_name):
+        result = func()
+    if scope and not (isinstance(result, dict) and 'error' in result):
+        scope.record_write(tool_name, args, result)
+        for leitura, prefix_len in invalidates:
+            scope.invalidate(leitura, args[:prefix_len])
+    return _render(result)
@@ -1,29 +1,31 @@
 import json
-from crewai.tools import BaseTool
-from flask import current_app
-from app.utils.helpers import json_dumps
+from app.tools.common import ClientTool, canonico, cpf_key, run_read_tool, run_write_tool
 
-class DetranSearchVehiclesTool(BaseTool):
+class DetranSearchVehiclesTool(ClientTool):
     name: str = "detran_search_vehicles"
     description: str = "Busca veículos registrados no DETRAN para um CPF. Input: cpf (string)."
     
     def _run(self, cpf: str) -> str:
-        result = current_app.clients['detran'].get_vehicles(cpf)
-        return json_dumps(result)
+        client = self.clients['detran']
+        return run_read_tool(self.name, (cpf_key(cpf),), lambda: client.get_vehicles(cpf))
 
-class DetranFetchProfileTool(BaseTool):
+class DetranFetchProfileTool(ClientTool):
     name: str = "detran_fetch_profile"
     description: str = "Busca o perfil completo de um cidadão. Requer user_id. Input: user_id (string)."
     
     def _run(self, user_id: str) -> str:
-        result = current_app.clients['detran'].fetch_user_profile(user_id)
-        return json_dumps(result)
+        client = self.clients['detran']
+        return run_read_tool(self.name, (str(user_id),), lambda: client.fetch_user_profile(user_id))
 
-class DetranAtualizarVeiculosTool(BaseTool):
+class DetranAtualizarVeiculosTool(ClientTool):
     name: str = "detran_atualizar_veiculos"
+    escrita: bool = True
     description: str = "Atualiza a lista de veículos no perfil de um cidadão. Inputs: user_id (string), veiculos (JSON string da lista de veículos)."
     
     def _run(self, user_id: str, veiculos: str) -> str:
         veiculos_data = json.loads(veiculos)
-        result = current_app.clients['detran'].atualizar_veiculos(user_id, veiculos_data)
-        return json_dumps(result)
\ No newline at end of file
+        return run_write_tool(
+            self.name, (str(user_id), canonico(veiculos_data)),
+            lambda: self.clients['detran'].atualizar_veiculos(user_id, veiculos_data),
+            invalidates=[("detran_fetch_profile", 1)]
+        )
\ No newline at end of file
@@ -1,19 +1,47 @@
-from crewai.tools import BaseTool
-from flask import current_app
-from app.utils.helpers import json_dumps
+import json
+from typing import List
+from app.tools.common import ClientTool, cpf_key, run_read_tool
 
-class HemoesGetDoadorTool(BaseTool):
+class HemoesGetDoadorTool(ClientTool):
     name: str = "hemoes_get_doador"
     description: str = "Busca informações de um doador de sangue pelo CPF. Input: cpf (string)."
     
     def _run(self, cpf: str) -> str:
-        result = current_app.clients['hemoes'].get_doador(cpf)
-        return json_dumps(result)
+        client = self.clients['hemoes']
+        return run_read_tool(self.name, (cpf_key(cpf),), lambda: client.get_doador(cpf))
 
-class HemoesGetDoacaoTool(BaseTool):
+class HemoesGetDoacaoTool(ClientTool):
     name: str = "hemoes_get_doacao"
     description: str = "Busca detalhes de uma doação específica pelo ID. Input: doacao_id (integer)."
     
     def _run(self, doacao_id: int) -> str:
-        result = current_app.clients['hemoes'].get_doacao(doacao_id)
-        return json_dumps(result)
\ No newline at end of file
+        client = self.clients['hemoes']
+        return run_read_tool(self.name, (str(doacao_id),), lambda: client.get_doacao(doacao_id))
+
+def _parse_lista(valores: str) -> List[str]:
+    """Aceita uma lista JSON ou valores separados por vírgula."""
+    try:
+        parsed = json.loads(valores)
+    except (TypeError, ValueError):
+        parsed = valores.split(',')
+    if not isinstance(parsed, list):
+        parsed = [parsed]
+    return [str(v).strip() for v in parsed if str(v).strip()]
+
+class HemoesGetDoadoresTool(ClientTool):
+    name: str = "hemoes_get_doadores"
+    description: str = "Busca de uma só vez vários doadores de sangue pelos CPFs. Input: cpfs (lista JSON ou CPFs separados por vírgula)."
+    
+    def _run(self, cpfs: str) -> str:
+        client = self.clients['hemoes']
+        lista = tuple(cpf_key(cpf) for cpf in _parse_lista(cpfs))
+        return run_read_tool(self.name, lista, lambda: client.get_doadores(lista))
+
+class HemoesGetDoacoesTool(ClientTool):
+    name: str = "hemoes_get_doacoes"
+    description: str = "Busca de uma só vez os detalhes de várias doações (ex.: todo o histórico de um doador). Input: doacao_ids (lista JSON ou IDs separados por vírgula)."
+    
+    def _run(self, doacao_ids: str) -> str:
+        client = self.clients['hemoes']
+        lista = tuple(_parse_lista(doacao_ids))
+        return run_read_tool(self.name, lista, lambda: client.get_doacoes(lista))
\ No newline at end of file
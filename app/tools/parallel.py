@@ -0,0 +1,120 @@
+import contextvars
+import json
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Sequence, Tuple
+from crewai.tools import BaseTool
+from app.config import Config
+from app.utils.metrics import metrics
+from app.utils.request_scope import current_scope
+
+logger = logging.getLogger(__name__)
+
+# Compartilhado por todas as execuções: limita as chamadas simultâneas às APIs vindas de lotes
+_executor = ThreadPoolExecutor(max_workers=Config.TOOL_PARALLEL_MAX_WORKERS, thread_name_prefix='tool')
+
+Chamada = Tuple[str, Dict[str, Any]]
+
+def _parse_chamadas(chamadas: Any) -> List[Chamada]:
+    """Aceita a lista de chamadas como JSON ou já decodificada: [{"ferramenta": ..., "argumentos": {...}}]."""
+    if isinstance(chamadas, str):
+        chamadas = json.loads(chamadas)
+    if isinstance(chamadas, dict):
+        chamadas = chamadas.get('chamadas', [chamadas])
+    if not isinstance(chamadas, list):
+        raise ValueError("esperada uma lista de chamadas")
+    parsed = []
+    for chamada in chamadas:
+        if not isinstance(chamada, dict) or not chamada.get('ferramenta'):
+            raise ValueError(f"chamada inválida: {chamada!r}")
+        argumentos = chamada.get('argumentos') or {}
+        if not isinstance(argumentos, dict):
+            raise ValueError(f"argumentos inválidos para {chamada['ferramenta']}")
+        parsed.append((str(chamada['ferramenta']), argumentos))
+    return parsed
+
+def _call(tool: BaseTool, argumentos: Dict[str, Any]) -> Tuple[str, float]:
+    """Executa uma ferramenta e retorna (resultado, duração em segundos)."""
+    inicio = time.perf_counter()
+    try:
+        result = tool._run(**argumentos)
+    except Exception as e:
+        logger.warning("Falha na ferramenta %s executada em lote: %s", tool.name, e)
+        result = json.dumps({"error": f"Falha ao executar {tool.name}: {str(e)}"})
+    return result, time.perf_counter() - inicio
+
+def run_batch(tools: Dict[str, BaseTool], chamadas: Sequence[Chamada]) -> Tuple[List[str], float, float]:
+    """Executa as chamadas preservando a ordem dos resultados.
+
+    Leituras consecutivas rodam em paralelo; escritas (ferramentas com `escrita`) rodam
+    sozinhas, depois das leituras anteriores e antes das seguintes, para que cada leitura
+    veja o efeito das escritas que a precedem. Retorna (resultados, soma das durações,
+    tempo de parede), em segundos.
+    """
+    results: List[str] = [''] * len(chamadas)
+    soma = 0.0
+    inicio = time.perf_counter()
+    pendentes: List[Tuple[int, Any]] = []
+
+    def aguardar():
+        nonlocal soma
+        for i, future in pendentes:
+            results[i], duracao = future.result()
+            soma += duracao
+        pendentes.clear()
+
+    for i, (nome, argumentos) in enumerate(chamadas):
+        tool = tools.get(nome)
+        if tool is None:
+            results[i] = json.dumps({"error": f"Ferramenta desconhecida: {nome}"})
+        elif getattr(tool, 'escrita', False):
+            aguardar()
+            results[i], duracao = _call(tool, argumentos)
+            soma += duracao
+        else:
+            # Cada tarefa roda numa cópia do contexto: escopo e tempos da requisição
+            context = contextvars.copy_context()
+            pendentes.append((i, _executor.submit(context.run, _call, tool, argumentos)))
+    aguardar()
+    return results, soma, time.perf_counter() - inicio
+
+class ExecutarEmParaleloTool(BaseTool):
+    name: str = "executar_em_paralelo"
+    description: str = (
+        "Executa de uma só vez várias chamadas independentes das outras ferramentas (por exemplo, "
+        "a mesma consulta para várias datas ou vários identificadores) e devolve os resultados na mesma ordem. "
+        "Use sempre que precisar de mais de uma consulta que não dependa do resultado da outra. "
+        "Input: chamadas (JSON string de uma lista de objetos {\"ferramenta\": nome, \"argumentos\": {...}})."
+    )
+    ferramentas: Dict[str, Any] = {}
+
+    @classmethod
+    def for_tools(cls, tools: Sequence[BaseTool]) -> "ExecutarEmParaleloTool":
+        return cls(ferramentas={tool.name: tool for tool in tools})
+
+    def _run(self, chamadas: str) -> str:
+        try:
+            parsed = _parse_chamadas(chamadas)
+        except ValueError as e:
+            return json.dumps({"error": f"Entrada inválida para {self.name}: {str(e)}"})
+        if len(parsed) > Config.TOOL_PARALLEL_MAX_CALLS:
+            return json.dumps({
+                "error": f"No máximo {Config.TOOL_PARALLEL_MAX_CALLS} chamadas por lote; divida a consulta."
+            })
+
+        results, soma, parede = run_batch(self.ferramentas, parsed)
+        economia_ms = max(0.0, soma - parede) * 1000
+        metrics.incr('ferramentas.paralelo.lotes')
+        metrics.incr('ferramentas.paralelo.chamadas', len(parsed))
+        metrics.observe('ferramentas.paralelo.economia_ms', economia_ms)
+        scope = current_scope()
+        if scope is not None:
+            scope.record_parallel(len(parsed), economia_ms)
+        logger.debug("Lote de %d chamadas em %.1f ms (economia de %.1f ms).",
+                     len(parsed), parede * 1000, economia_ms)
+
+        return '\n\n'.join(
+            f"[{i}] {nome} {json.dumps(argumentos, ensure_ascii=False)}:\n{result}"
+            for i, ((nome, argumentos), result) in enumerate(zip(parsed, results), 1)
+        )
\ No newline at end of file
@@ -1,71 +1,119 @@
 import json
-from crewai.tools import BaseTool
-from flask import current_app
-from app.utils.helpers import json_dumps
+from typing import Optional
+from app.tools.common import ClientTool, canonico, run_read_tool, run_write_tool
 
-class SesaGetMunicipiosTool(BaseTool):
+# Leituras afetadas por uma reserva ou cancelamento (ferramenta, prefixo de user_id)
+INVALIDACOES_AGENDAMENTO = [
+    ("sesa_get_horarios", 0),
+    ("sesa_buscar_horarios_disponiveis", 0),
+    ("sesa_get_sugestao_agendamento", 0),
+    ("sesa_check_agendamento_existente", 1)
+]
+
+class SesaGetMunicipiosTool(ClientTool):
     name: str = "sesa_get_municipios"
     description: str = "Lista todos os municípios disponíveis para agendamento."
     
     def _run(self) -> str:
-        result = current_app.clients['sesa'].get_municipios()
-        return json_dumps(result)
+        return run_read_tool(self.name, (), self.clients['sesa'].get_municipios)
 
-class SesaGetServicosTool(BaseTool):
+class SesaGetServicosTool(ClientTool):
     name: str = "sesa_get_servicos"
     description: str = "Lista todos os serviços disponíveis para agendamento."
     
     def _run(self) -> str:
-        result = current_app.clients['sesa'].get_servicos()
-        return json_dumps(result)
+        return run_read_tool(self.name, (), self.clients['sesa'].get_servicos)
 
-class SesaGetUnidadesTool(BaseTool):
+class SesaGetUnidadesTool(ClientTool):
     name: str = "sesa_get_unidades"
     description: str = "Lista unidades de atendimento baseado no município e serviço. Inputs: municipio_id (string), servico_id (string)."
     
     def _run(self, municipio_id: str, servico_id: str) -> str:
-        result = current_app.clients['sesa'].get_unidades(municipio_id, servico_id)
-        return json_dumps(result)
+        client = self.clients['sesa']
+        return run_read_tool(
+            self.name, (str(municipio_id), str(servico_id)),
+            lambda: client.get_unidades(municipio_id, servico_id)
+        )
 
-class SesaGetHorariosTool(BaseTool):
+class SesaGetHorariosTool(ClientTool):
     name: str = "sesa_get_horarios"
     description: str = "Consulta horários disponíveis para uma unidade em uma data. Inputs: unidade_id (string), data (string YYYY-MM-DD)."
     
     def _run(self, unidade_id: str, data: str) -> str:
-        result = current_app.clients['sesa'].get_horarios(unidade_id, data)
-        return json_dumps(result)
+        client = self.clients['sesa']
+        return run_read_tool(
+            self.name, (str(unidade_id), data),
+            lambda: client.get_horarios(unidade_id, data)
+        )
+
+class SesaBuscarHorariosDisponiveisTool(ClientTool):
+    name: str = "sesa_buscar_horarios_disponiveis"
+    description: str = (
+        "Busca de uma só vez os horários livres de todas as unidades de um município para um serviço, "
+        "em uma janela de datas, ordenados pelo mais cedo ou pela unidade mais próxima. "
+        "Inputs: municipio_id (string), servico_id (string), data_inicio (string YYYY-MM-DD), "
+        "data_fim (string YYYY-MM-DD, opcional), ordenar_por ('horario' ou 'distancia', opcional), "
+        "latitude (number, opcional), longitude (number, opcional), limite (integer, opcional)."
+    )
+    
+    def _run(self, municipio_id: str, servico_id: str, data_inicio: str, data_fim: Optional[str] = None,
+             ordenar_por: str = "horario", latitude: Optional[float] = None,
+             longitude: Optional[float] = None, limite: Optional[int] = 20) -> str:
+        client = self.clients['sesa']
+        return run_read_tool(
+            self.name,
+            (str(municipio_id), str(servico_id), data_inicio, data_fim, ordenar_por, latitude, longitude, limite),
+            lambda: client.buscar_horarios_disponiveis(
+                municipio_id, servico_id, data_inicio, data_fim,
+                ordenar_por=ordenar_por, latitude=latitude, longitude=longitude, limite=limite
+            )
+        )
 
-class SesaGetSugestaoAgendamentoTool(BaseTool):
+class SesaGetSugestaoAgendamentoTool(ClientTool):
     name: str = "sesa_get_sugestao_agendamento"
     description: str = "Obtém sugestões de agendamento. Input: payload (JSON string com os critérios)."
     
     def _run(self, payload: str) -> str:
         payload_data = json.loads(payload)
-        result = current_app.clients['sesa'].get_sugestao_agendamento(payload_data)
-        return json_dumps(result)
+        client = self.clients['sesa']
+        return run_read_tool(
+            self.name, (json.dumps(payload_data, sort_keys=True),),
+            lambda: client.get_sugestao_agendamento(payload_data)
+        )
 
-class SesaReservarHorarioTool(BaseTool):
+class SesaReservarHorarioTool(ClientTool):
     name: str = "sesa_reservar_horario"
+    escrita: bool = True
     description: str = "Realiza uma reserva de horário. Inputs: user_id (string), payload (JSON string da reserva)."
     
     def _run(self, user_id: str, payload: str) -> str:
         payload_data = json.loads(payload)
         payload_data['usuario'] = user_id
-        result = current_app.clients['sesa'].reservar_horario(payload_data, user_id)
-        return json_dumps(result)
+        return run_write_tool(
+            self.name, (str(user_id), canonico(payload_data)),
+            lambda: self.clients['sesa'].reservar_horario(payload_data, user_id),
+            invalidates=INVALIDACOES_AGENDAMENTO
+        )
 
-class SesaCheckAgendamentoExistenteTool(BaseTool):
+class SesaCheckAgendamentoExistenteTool(ClientTool):
     name: str = "sesa_check_agendamento_existente"
     description: str = "Verifica agendamentos existentes para um usuário. Inputs: user_id (string), servico_id (string), ativo (boolean)."
     
     def _run(self, user_id: str, servico_id: str, ativo: bool = True) -> str:
-        result = current_app.clients['sesa'].check_agendamento_existente(servico_id, user_id, ativo)
-        return json_dumps(result)
+        client = self.clients['sesa']
+        return run_read_tool(
+            self.name, (str(user_id), str(servico_id), bool(ativo)),
+            lambda: client.check_agendamento_existente(servico_id, user_id, ativo)
+        )
 
-class SesaCancelarAgendamentoTool(BaseTool):
+class SesaCancelarAgendamentoTool(ClientTool):
     name: str = "sesa_cancelar_agendamento"
+    escrita: bool = True
     description: str = "Cancela um agendamento existente. Inputs: user_id (string), agendamento_id (integer)."
     
     def _run(self, user_id: str, agendamento_id: int) -> str:
-        result = current_app.clients['sesa'].cancelar_agendamento(agendamento_id, user_id)
-        return json_dumps(result)
\ No newline at end of file
+        return run_write_tool(
+            self.name, (str(user_id), str(agendamento_id)),
+            lambda: self.clients['sesa'].cancelar_agendamento(agendamento_id, user_id),
+            invalidates=INVALIDACOES_AGENDAMENTO
+        )
\ No newline at end of file
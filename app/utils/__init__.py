@@ -1,3 +1,5 @@
-from .helpers import json_dumps, process_query
+from .helpers import json_dumps, process_query, process_query_cascade
+from .cache import TTLCache
+from .metrics import MetricsRegistry, metrics
 
-__all__ = ['json_dumps', 'process_query']
\ No newline at end of file
+__all__ = ['json_dumps', 'process_query', 'process_query_cascade', 'TTLCache', 'MetricsRegistry', 'metrics']
\ No newline at end of file
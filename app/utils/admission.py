@@ -0,0 +1,176 @@
+import logging
+import threading
+import time
+from typing import Dict, Optional
+
+from app.config import Config
+from app.utils.cache import TTLCache
+from app.utils.metrics import metrics
+from app.utils.scheduler import CLASSE_CATALOGO, WeightedFairQueue
+
+logger = logging.getLogger(__name__)
+
+class AdmissionRejected(Exception):
+    """Requisição recusada pelo controle de admissão."""
+
+    def __init__(self, status: int, motivo: str, retry_after: float):
+        super().__init__(motivo)
+        self.status = status
+        self.motivo = motivo
+        self.retry_after = retry_after
+
+class TokenBucket:
+    """Balde de fichas: `rate` fichas por segundo, acumulando no máximo `capacity`."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def try_consume(self) -> float:
+        """Consome uma ficha; retorna 0 em caso de sucesso ou os segundos até a próxima ficha."""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate if self.rate > 0 else float('inf')
+
+class _Waiter:
+    def __init__(self, orgao: str, classe: str):
+        self.orgao = orgao
+        self.classe = classe
+        self.enqueued = time.monotonic()
+        self.event = threading.Event()
+        self.granted = False
+
+class AdmissionController:
+    """Limita execuções simultâneas de agentes (global e por órgão) com fila de espera limitada
+    e taxa por chamador e por CPF, recusando rapidamente o excedente.
+
+    A fila é servida por prioridade ponderada entre classes de requisição (ver
+    app.utils.scheduler), para que operações transacionais esperem menos sob saturação.
+    """
+
+    def __init__(self, max_concurrent: int, max_concurrent_por_orgao: Dict[str, int],
+                 max_queue: int, queue_timeout: float, retry_after: float,
+                 caller_rate: Optional[tuple] = None, cpf_rate: Optional[tuple] = None):
+        self.max_concurrent = max_concurrent
+        self.max_concurrent_por_orgao = max_concurrent_por_orgao
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.caller_rate = caller_rate
+        self.cpf_rate = cpf_rate
+        self._running = 0
+        self._running_por_orgao: Dict[str, int] = {}
+        self._waiters = WeightedFairQueue()
+        # Um balde só expira depois de ocioso pelo tempo de encher de novo, quando descartá-lo
+        # equivale a recriá-lo cheio (a expiração é renovada a cada uso, em _check_rate)
+        recarga = [capacity / per_s for per_s, capacity in filter(None, (caller_rate, cpf_rate)) if per_s > 0]
+        self._buckets = TTLCache(ttl=max([600.0] + recarga), max_entries=100000)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls) -> "AdmissionController":
+        return cls(
+            max_concurrent=Config.ADMISSION_MAX_CONCURRENT,
+            max_concurrent_por_orgao=Config.ADMISSION_MAX_CONCURRENT_POR_ORGAO,
+            max_queue=Config.ADMISSION_MAX_QUEUE,
+            queue_timeout=Config.ADMISSION_QUEUE_TIMEOUT_S,
+            retry_after=Config.ADMISSION_RETRY_AFTER_S,
+            caller_rate=(Config.RATE_LIMIT_CALLER_PER_MIN / 60, Config.RATE_LIMIT_CALLER_BURST),
+            cpf_rate=(Config.RATE_LIMIT_CPF_PER_MIN / 60, Config.RATE_LIMIT_CPF_BURST)
+        )
+
+    def _check_rate(self, kind: str, key: Optional[str], rate: Optional[tuple]):
+        if not key or not rate or rate[0] <= 0:
+            return
+        bucket_key = (kind, key)
+        bucket = self._buckets.get(bucket_key) or TokenBucket(*rate)
+        self._buckets.set(bucket_key, bucket)
+        wait = bucket.try_consume()
+        if wait > 0:
+            metrics.incr(f"admissao.rejeitados.taxa_{kind}")
+            raise AdmissionRejected(429, f"Limite de requisições por {kind} excedido.", wait)
+
+    def check_rate(self, caller: Optional[str] = None, cpf: Optional[str] = None):
+        """Consome uma ficha da taxa do chamador e do CPF, sem ocupar vaga de execução.
+
+        Para requisições que ocupam várias vagas (uma por órgão) e devem ser cobradas uma vez só;
+        as vagas são então obtidas com acquire sem chamador nem CPF.
+        """
+        with self._lock:
+            self._check_rate('chamador', caller, self.caller_rate)
+            self._check_rate('cpf', cpf, self.cpf_rate)
+
+    def _can_run(self, orgao: str) -> bool:
+        limite_orgao = self.max_concurrent_por_orgao.get(orgao, self.max_concurrent)
+        return (self._running < self.max_concurrent and
+                self._running_por_orgao.get(orgao, 0) < limite_orgao)
+
+    def _start(self, orgao: str):
+        self._running += 1
+        self._running_por_orgao[orgao] = self._running_por_orgao.get(orgao, 0) + 1
+        self._publish()
+
+    def _publish(self):
+        metrics.set_gauge('admissao.em_execucao', self._running)
+        metrics.set_gauge('admissao.fila', len(self._waiters))
+        for orgao, running in self._running_por_orgao.items():
+            metrics.set_gauge(f"admissao.em_execucao.{orgao}", running)
+
+    def _dispatch(self):
+        while self._running < self.max_concurrent:
+            waiter = self._waiters.pop(w for w in self._waiters if self._can_run(w.orgao))
+            if waiter is None:
+                break
+            self._start(waiter.orgao)
+            waiter.granted = True
+            waiter.event.set()
+        self._publish()
+
+    def acquire(self, orgao: str, caller: Optional[str] = None, cpf: Optional[str] = None,
+                classe: str = CLASSE_CATALOGO) -> float:
+        """Admite uma execução (esperando na fila, se preciso) e retorna o tempo de espera em segundos.
+
+        A taxa só é verificada para o chamador e o CPF informados (ver check_rate).
+        Lança AdmissionRejected quando a requisição deve ser recusada.
+        """
+        with self._lock:
+            self._check_rate('chamador', caller, self.caller_rate)
+            self._check_rate('cpf', cpf, self.cpf_rate)
+
+            if self._can_run(orgao) and not any(w.orgao == orgao for w in self._waiters):
+                self._start(orgao)
+                metrics.observe(f"admissao.espera_ms.{classe}", 0.0)
+                return 0.0
+
+            if len(self._waiters) >= self.max_queue:
+                metrics.incr('admissao.rejeitados.fila_cheia')
+                raise AdmissionRejected(503, "Serviço sobrecarregado; fila de espera cheia.", self.retry_after)
+
+            waiter = _Waiter(orgao, classe)
+            self._waiters.push(waiter, classe)
+            self._publish()
+
+        waiter.event.wait(self.queue_timeout)
+        with self._lock:
+            if not waiter.granted:
+                self._waiters.remove(waiter)
+                self._publish()
+                metrics.incr(f"admissao.rejeitados.tempo_espera.{classe}")
+                raise AdmissionRejected(503, "Serviço sobrecarregado; tempo de espera esgotado.", self.retry_after)
+
+        espera = time.monotonic() - waiter.enqueued
+        metrics.observe(f"admissao.espera_ms.{classe}", espera * 1000)
+        return espera
+
+    def release(self, orgao: str):
+        """Libera a vaga de uma execução concluída."""
+        with self._lock:
+            self._running -= 1
+            self._running_por_orgao[orgao] -= 1
+            self._dispatch()
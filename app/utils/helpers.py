@@ -1,23 +1,101 @@
 import json
 import logging
-from typing import Any, Dict, Optional
+import time
+from typing import Any, Dict, List, Optional
 from crewai import Agent, Task, Crew
+from app.config import Config
+from app.utils.metrics import metrics
+from app.utils.prefetch import start_prefetch
+from app.utils.prompt_budget import PromptBudget, trim_user_context
+from app.utils.raw_response import RawResponse
+from app.utils.logging_setup import truncate_body
+from app.utils.request_scope import LIMITE_ITERACOES, Escrita, RequestScope, request_scope
+from app.utils.sessions import ConversationSession
+from app.utils.timing import FASE_AGENTE, timed
 
 logger = logging.getLogger(__name__)
 
+# Sinal de baixa confiança que um nível intermediário da cascata pode devolver
+MARCADOR_BAIXA_CONFIANCA = 'BAIXA_CONFIANCA'
+# Resposta do CrewAI quando o agente esgota o limite de iterações
+MENSAGEM_LIMITE_ITERACOES = 'Agent stopped due to iteration limit or time limit'
+RESPOSTA_PARCIAL = (
+    "Não consegui concluir totalmente sua solicitação dentro do limite de processamento. "
+    "Por favor, tente novamente com uma pergunta mais específica."
+)
+RESPOSTA_PARCIAL_COM_DADOS = (
+    "Não consegui concluir totalmente sua solicitação dentro do limite de processamento. "
+    "Estas são as informações obtidas até aqui:"
+)
+
 def json_dumps(data: Any) -> str:
-    """Serializa dados para JSON com formatação."""
+    """Serializa dados para JSON com formatação (corpos brutos são repassados como estão)."""
+    if isinstance(data, RawResponse):
+        return data.text
     return json.dumps(data, indent=2)
 
+def _resumo(result: Any) -> str:
+    text = result.text if isinstance(result, RawResponse) else json.dumps(result, ensure_ascii=False)
+    return truncate_body(text, 300)
+
+def _resposta_parcial(scope: RequestScope) -> str:
+    """Resposta de uma execução interrompida pelo limite de iterações, com as escritas
+    realizadas e os resultados de ferramentas obtidos até a interrupção."""
+    partes = [
+        f"- Operação realizada ({nome} {list(argumentos)}): {_resumo(result)}"
+        for nome, argumentos, result in scope.writes
+    ]
+    partes += [
+        f"- {nome} {list(argumentos)}: {_resumo(result)}"
+        for (nome, argumentos), result in scope.results().items()
+    ]
+    if not partes:
+        return RESPOSTA_PARCIAL
+    return truncate_body('\n'.join([RESPOSTA_PARCIAL_COM_DADOS] + partes), Config.PARTIAL_RESPONSE_MAX_CHARS)
+
 def process_query(agent: Agent, query: str, orgao: str, 
-                 user_context: Optional[Dict] = None) -> Dict[str, Any]:
-    """Processa uma consulta usando um agente CrewAI."""
+                 user_context: Optional[Dict] = None,
+                 clients: Optional[Dict[str, Any]] = None,
+                 permitir_escalonamento: bool = False,
+                 session: Optional[ConversationSession] = None,
+                 escritas: Optional[List[Escrita]] = None) -> Dict[str, Any]:
+    """Processa uma consulta usando um agente CrewAI.
+    
+    Se clients for informado, os dados do cidadão identificado no user_context são
+    pré-carregados em paralelo enquanto o agente trabalha. Com permitir_escalonamento,
+    o agente é instruído a sinalizar baixa confiança em vez de arriscar uma resposta.
+    Com uma sessão de conversa, o agente recebe o resumo das trocas anteriores e as
+    ferramentas reaproveitam os resultados já obtidos. `escritas` é o registro de escritas
+    da solicitação, compartilhado entre os níveis da cascata: as já realizadas são informadas
+    ao agente e não são repetidas pelas ferramentas.
+    """
+    if session is not None:
+        user_context = session.merge_context(user_context)
+    agent_context = trim_user_context(orgao, user_context)
+    description = (
+        f"Processe a consulta do usuário sobre {orgao}: '{query}'. "
+        f"Use as ferramentas disponíveis para encontrar a informação. "
+        f"O contexto do usuário é: {agent_context}."
+    )
+    if session is not None and session.turns:
+        description += f" Histórico recente desta conversa: {session.summary()}."
+    if escritas:
+        realizadas = '; '.join(
+            f"{nome}{list(argumentos)} -> {truncate_body(json_dumps(result), 300)}"
+            for nome, argumentos, result in escritas
+        )
+        description += (
+            f" As seguintes operações já foram realizadas nesta solicitação e não devem ser "
+            f"repetidas: {realizadas}."
+        )
+    if permitir_escalonamento:
+        description += (
+            f" Se a consulta for complexa demais ou você não tiver confiança na resposta, "
+            f"responda apenas com a palavra {MARCADOR_BAIXA_CONFIANCA}."
+        )
+    
     task = Task(
-        description=(
-            f"Processe a consulta do usuário sobre {orgao}: '{query}'. "
-            f"Use as ferramentas disponíveis para encontrar a informação. "
-            f"O contexto do usuário é: {user_context}."
-        ),
+        description=description,
         agent=agent,
         expected_output=(
             "Uma resposta final, clara e concisa em português, diretamente para o usuário. "
@@ -28,12 +106,104 @@ def process_query(agent: Agent, query: str, orgao: str,
     )
     
     try:
-        crew = Crew(agents=[agent], tasks=[task], verbose=False)
-        result = crew.kickoff(inputs=user_context or {})
-        return {"success": True, "response": str(result)}
+        with request_scope(escritas) as scope:
+            limits = Config.agent_limits(orgao)
+            scope.set_limits(limits['max_tool_calls'], limits['max_seconds'])
+            scope.budget = PromptBudget(orgao, agent, description, agent_context)
+            if session is not None:
+                scope.seed(session.tool_results())
+            start_prefetch(scope, orgao, user_context, clients)
+            crew = Crew(agents=[agent], tasks=[task], verbose=False)
+            with timed(FASE_AGENTE):
+                result = crew.kickoff(inputs=agent_context or {})
+        
+        if session is not None:
+            session.store_results(scope.results())
+        
+        response = str(result)
+        if MENSAGEM_LIMITE_ITERACOES in response:
+            scope.limite_atingido = scope.limite_atingido or LIMITE_ITERACOES
+            response = _resposta_parcial(scope)
+        
+        metrics.incr(f"agente.{orgao}.execucoes")
+        metadata = scope.metadata()
+        metadata["uso"] = getattr(crew, 'usage_metrics', None) or {}
+        output = {"success": True, "response": response, "metadata": metadata}
+        if scope.limite_atingido:
+            metrics.incr(f"agente.{orgao}.interrompidos.{scope.limite_atingido}")
+            output["parcial"] = True
+            output["limite_atingido"] = scope.limite_atingido
+            metadata["parcial"] = True
+        return output
     except Exception as e:
-        logger.error(f"Erro crítico ao processar consulta para {orgao}: {e}", exc_info=True)
+        logger.error("Erro crítico ao processar consulta para %s: %s", orgao, e, exc_info=True)
         return {
             "success": False,
             "error": "Ocorreu um erro interno ao processar sua solicitação."
-        }
\ No newline at end of file
+        }
+
+def _custo_estimado(model: str, uso: Dict[str, Any]) -> float:
+    """Custo aproximado, em USD, a partir do consumo de tokens informado pelo CrewAI."""
+    entrada, saida = Config.LLM_COST_PER_1K_TOKENS.get(model, (0.0, 0.0))
+    return (uso.get('prompt_tokens', 0) * entrada + uso.get('completion_tokens', 0) * saida) / 1000
+
+def _motivo_escalonamento(result: Dict[str, Any]) -> Optional[str]:
+    """Indica por que o resultado de um nível da cascata deve ser escalonado (ou None)."""
+    if not result.get('success'):
+        return 'falha'
+    if result.get('limite_atingido'):
+        return f"limite_{result['limite_atingido']}"
+    if MARCADOR_BAIXA_CONFIANCA in result.get('response', ''):
+        return 'baixa_confianca'
+    return None
+
+def process_query_cascade(agents: List[Agent], query: str, orgao: str,
+                          user_context: Optional[Dict] = None,
+                          clients: Optional[Dict[str, Any]] = None,
+                          session: Optional[ConversationSession] = None) -> Dict[str, Any]:
+    """Processa uma consulta na cascata de modelos, escalonando ao próximo nível quando necessário.
+
+    As escritas feitas por um nível (reservas, cancelamentos, atualizações) são repassadas
+    aos seguintes, que não as repetem.
+    """
+    niveis = []
+    result: Dict[str, Any] = {}
+    escritas: List[Escrita] = []
+    
+    for i, agent in enumerate(agents):
+        ultimo = i == len(agents) - 1
+        model = getattr(agent.llm, 'model_name', Config.OPENAI_MODEL)
+        
+        inicio = time.perf_counter()
+        result = process_query(agent, query, orgao, user_context, clients,
+                               permitir_escalonamento=not ultimo, session=session, escritas=escritas)
+        latencia_ms = (time.perf_counter() - inicio) * 1000
+        
+        uso = result.get('metadata', {}).get('uso', {})
+        custo = _custo_estimado(model, uso)
+        motivo = None if ultimo else _motivo_escalonamento(result)
+        
+        metrics.observe(f"llm.tier.{model}.latencia_ms", latencia_ms)
+        metrics.observe(f"llm.tier.{model}.custo_usd", custo)
+        metrics.incr(f"llm.tier.{model}.execucoes")
+        niveis.append({
+            "modelo": model,
+            "latencia_ms": round(latencia_ms, 1),
+            "tokens": uso.get('total_tokens', 0),
+            "custo_usd": round(custo, 6),
+            "escalonado_por": motivo
+        })
+        
+        if motivo is None:
+            break
+        metrics.incr(f"llm.tier.{model}.escalonamentos.{motivo}")
+        if escritas:
+            metrics.incr(f"llm.tier.{model}.escalonamentos_com_escritas")
+        logger.info("Consulta %s escalonada de %s (%s, %d escritas repassadas).",
+                    orgao, model, motivo, len(escritas))
+    
+    if result.get('success'):
+        result['metadata']['cascata'] = niveis
+        if session is not None:
+            session.add_turn(query, result['response'])
+    return result
\ No newline at end of file
@@ -0,0 +1,107 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import time
+from typing import Dict, Optional
+
+from app.config import Config
+from app.utils.metrics import metrics
+
+# Atributos padrão de um LogRecord; o restante (passado via extra=) vai para o JSON
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+TEXT_FORMAT = '%(asctime)s - %(levelname)s - %(name)s - %(message)s'
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+def truncate_body(body, max_chars: Optional[int] = None) -> str:
+    """Limita o tamanho de corpos de resposta incluídos nos logs."""
+    limite = Config.LOG_MAX_BODY_CHARS if max_chars is None else max_chars
+    text = body if isinstance(body, str) else repr(body)
+    if len(text) <= limite:
+        return text
+    return f"{text[:limite]}… [+{len(text) - limite} caracteres]"
+
+class JsonFormatter(logging.Formatter):
+    """Formata cada registro como uma linha JSON."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'thread': record.threadName
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info:
+            entry['exc_info'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+class _DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler que descarta registros quando a fila enche, em vez de bloquear a requisição.
+
+    Os argumentos são mantidos no registro: a formatação acontece na thread do listener.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            metrics.incr('logs.descartados')
+
+def parse_levels(spec: str) -> Dict[str, str]:
+    """Interpreta "crewai=WARNING,app.clients=DEBUG" como níveis por componente."""
+    levels = {}
+    for item in (spec or '').split(','):
+        if '=' in item:
+            name, level = item.split('=', 1)
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+def configure_logging(level: Optional[str] = None, fmt: Optional[str] = None,
+                      use_queue: Optional[bool] = None):
+    """Configura o logging da aplicação: fila assíncrona, formato JSON ou texto e níveis por componente."""
+    global _listener
+    level = level or Config.LOG_LEVEL
+    fmt = fmt or Config.LOG_FORMAT
+    use_queue = Config.LOG_ASYNC if use_queue is None else use_queue
+
+    stream = logging.StreamHandler(sys.stdout)
+    stream.setFormatter(JsonFormatter() if fmt == 'json' else logging.Formatter(TEXT_FORMAT))
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+    if use_queue:
+        records: queue.Queue = queue.Queue(maxsize=Config.LOG_QUEUE_SIZE)
+        root.addHandler(_DroppingQueueHandler(records))
+        _listener = logging.handlers.QueueListener(records, stream, respect_handler_level=True)
+        _listener.start()
+    else:
+        root.addHandler(stream)
+    root.setLevel(level.upper())
+
+    for name, component_level in {**Config.LOG_LEVELS_DEFAULT, **parse_levels(Config.LOG_LEVELS)}.items():
+        logging.getLogger(name).setLevel(component_level)
+
+def shutdown_logging():
+    """Esvazia a fila de logs pendentes (chamado na saída do processo)."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+atexit.register(shutdown_logging)
\ No newline at end of file
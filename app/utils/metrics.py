@@ -0,0 +1,56 @@
+import threading
+from typing import Any, Dict
+
+class MetricsRegistry:
+    """Registro simples, thread-safe, de contadores, medidores e resumos da aplicação."""
+
+    def __init__(self):
+        self._counters: Dict[str, float] = {}
+        self._gauges: Dict[str, float] = {}
+        self._summaries: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def incr(self, name: str, value: float = 1):
+        """Incrementa um contador."""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def set_gauge(self, name: str, value: float):
+        """Define o valor atual de um medidor."""
+        with self._lock:
+            self._gauges[name] = value
+
+    def observe(self, name: str, value: float):
+        """Registra uma observação (ex.: latência) em um resumo com contagem, soma e máximo."""
+        with self._lock:
+            summary = self._summaries.setdefault(name, {'count': 0, 'sum': 0.0, 'max': 0.0})
+            summary['count'] += 1
+            summary['sum'] += value
+            summary['max'] = max(summary['max'], value)
+
+    def get(self, name: str) -> float:
+        """Retorna o valor atual de um contador."""
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Retorna uma cópia de todas as métricas."""
+        with self._lock:
+            summaries = {
+                name: dict(summary, avg=summary['sum'] / summary['count'] if summary['count'] else 0.0)
+                for name, summary in self._summaries.items()
+            }
+            return {
+                'counters': dict(self._counters),
+                'gauges': dict(self._gauges),
+                'summaries': summaries
+            }
+
+    def reset(self):
+        """Zera todas as métricas."""
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._summaries.clear()
+
+metrics = MetricsRegistry()
@@ -0,0 +1,124 @@
+import math
+import re
+import time
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional
+
+from app.config import Config
+from app.utils.metrics import metrics
+from app.utils.scheduler import normalizar_texto
+
+# Vocabulário típico de cada órgão (com repetição implícita de peso; ver SEED_WEIGHT)
+SEMENTES = {
+    'HEMOES': (
+        "hemoes hemocentro doar doacao doacoes doador doadores doadora sangue sanguineo "
+        "plaquetas plasma medula transfusao hemoterapia apto inapto intervalo ultima doacao"
+    ),
+    'DETRAN': (
+        "detran veiculo veiculos carro carros moto motocicleta placa renavam licenciamento "
+        "ipva multa multas cnh habilitacao carteira motorista vistoria transferencia emplacamento"
+    ),
+    'SESA': (
+        "sesa saude consulta consultas agendamento agendamentos agendar marcar desmarcar remarcar "
+        "horario horarios unidade unidades posto exame exames vacina vacinacao medico medica "
+        "especialidade atendimento reservar cancelar municipio"
+    )
+}
+SEED_WEIGHT = 3
+
+STOPWORDS = frozenset(
+    "a o as os de da do das dos em no na nos nas um uma uns umas e ou para por com sem que "
+    "qual quais quando como onde meu minha meus minhas seu sua seus suas eu voce voces ele ela "
+    "ja nao sim se mais muito isso esse essa este esta sobre ate tem ter ser sao foi pelo pela "
+    "preciso quero gostaria saber pode poderia favor".split()
+)
+
+_TOKEN = re.compile(r'[a-z0-9]+')
+
+def _stem(token: str) -> str:
+    """Radical grosseiro: agrupa variações (agendar/agendamento, veiculo/veiculos)."""
+    return token[:6] if len(token) > 6 else token.rstrip('s') or token
+
+def tokenize(texto: str) -> List[str]:
+    return [
+        _stem(token) for token in _TOKEN.findall(normalizar_texto(texto or ''))
+        if len(token) > 2 and token not in STOPWORDS
+    ]
+
+class OrgaoClassifier:
+    """Classificador local (TF-IDF sobre vocabulário e descrições dos agentes) que escolhe
+    o(s) órgão(s) de uma consulta, sem chamadas de rede.
+
+    Cada órgão é um "documento" formado pelas sementes de SEMENTES e pelos textos do agente
+    (papel, objetivo, backstory e descrições das ferramentas); termos comuns a todos os
+    órgãos recebem IDF zero. São selecionados os órgãos com pontuação mínima e próxima da
+    maior (multi-órgão).
+    """
+
+    def __init__(self, documentos: Dict[str, str], min_score: float, ratio: float):
+        self.min_score = min_score
+        self.ratio = ratio
+        termos = {orgao: Counter(tokenize(texto)) for orgao, texto in documentos.items()}
+        df = Counter(term for counts in termos.values() for term in counts)
+        n = len(termos)
+        self.weights: Dict[str, Dict[str, float]] = {}
+        for orgao, counts in termos.items():
+            maximo = max(counts.values(), default=1)
+            self.weights[orgao] = {
+                term: (0.5 + 0.5 * count / maximo) * math.log(n / df[term])
+                for term, count in counts.items() if df[term] < n
+            }
+
+    @classmethod
+    def from_agents(cls, agents: Dict[str, Any]) -> "OrgaoClassifier":
+        """Monta o classificador a partir dos agentes da aplicação (chaves: 'hemoes', 'detran', 'sesa')."""
+        documentos = {}
+        for nome, agent in agents.items():
+            orgao = nome.upper()
+            tools = getattr(agent, 'tools', None) or []
+            partes = [getattr(agent, 'role', ''), getattr(agent, 'goal', ''), getattr(agent, 'backstory', '')]
+            partes += [getattr(tool, 'description', '') for tool in tools]
+            partes += [SEMENTES.get(orgao, '')] * SEED_WEIGHT
+            documentos[orgao] = ' '.join(partes)
+        return cls(documentos, Config.QUERY_CLASSIFIER_MIN_SCORE, Config.QUERY_CLASSIFIER_RATIO)
+
+    def scores(self, query: str) -> Dict[str, float]:
+        termos = set(tokenize(query))
+        return {
+            orgao: sum(weights.get(term, 0.0) for term in termos)
+            for orgao, weights in self.weights.items()
+        }
+
+    def _select(self, query: str) -> List[str]:
+        inicio = time.perf_counter()
+        scores = self.scores(query)
+        melhor = max(scores.values(), default=0.0)
+        selecionados = sorted(
+            (orgao for orgao, score in scores.items()
+             if score >= self.min_score and score >= melhor * self.ratio),
+            key=lambda orgao: -scores[orgao]
+        )
+        metrics.observe('roteador.latencia_ms', (time.perf_counter() - inicio) * 1000)
+        return selecionados
+
+    def classify(self, query: str) -> List[str]:
+        """Órgãos selecionados para a consulta, do mais ao menos provável (vazio se nenhum)."""
+        selecionados = self._select(query)
+        if not selecionados:
+            metrics.incr('roteador.sem_orgao')
+        elif len(selecionados) > 1:
+            metrics.incr('roteador.multi_orgao')
+        for orgao in selecionados:
+            metrics.incr(f"roteador.{orgao}.selecionado")
+        return selecionados
+
+    def observe(self, query: str, esperado: str, selecionados: Optional[Iterable[str]] = None) -> bool:
+        """Compara a classificação com o órgão esperado (ex.: rota chamada pelo cliente) e
+        atualiza os contadores de acerto e a acurácia por rota."""
+        selecionados = list(self._select(query) if selecionados is None else selecionados)
+        acertou = bool(selecionados) and selecionados[0] == esperado
+        metrics.incr(f"roteador.{esperado}.{'acertos' if acertou else 'erros'}")
+        acertos = metrics.get(f"roteador.{esperado}.acertos")
+        total = acertos + metrics.get(f"roteador.{esperado}.erros")
+        metrics.set_gauge(f"roteador.{esperado}.acuracia", acertos / total)
+        return acertou
\ No newline at end of file
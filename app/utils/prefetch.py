@@ -0,0 +1,74 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+from app.config import Config
+from app.utils.metrics import metrics
+from app.utils.request_scope import RequestScope, cpf_key
+
+logger = logging.getLogger(__name__)
+
+class Prefetcher:
+    """Leitura que pode ser antecipada a partir do user_context, sob a mesma chave da ferramenta."""
+
+    def __init__(self, client_name: str,
+                 args: Callable[[Dict[str, Any]], Optional[Tuple[Hashable, ...]]],
+                 call: Callable[[Any, Dict[str, Any]], Any]):
+        self.client_name = client_name
+        self.args = args
+        self.call = call
+
+def _cpf(ctx: Dict[str, Any]) -> Optional[Tuple[Hashable, ...]]:
+    return (cpf_key(ctx['cpf']),) if ctx.get('cpf') else None
+
+def _user_id(ctx: Dict[str, Any]) -> Optional[Tuple[Hashable, ...]]:
+    return (str(ctx['user_id']),) if ctx.get('user_id') else None
+
+def _agendamentos_ativos(ctx: Dict[str, Any]) -> Optional[Tuple[Hashable, ...]]:
+    if ctx.get('user_id') and ctx.get('servico_id'):
+        return (str(ctx['user_id']), str(ctx['servico_id']), True)
+    return None
+
+# As chaves devem coincidir com as usadas pelas ferramentas em app/tools
+PREFETCHERS: Dict[str, Prefetcher] = {
+    'hemoes_get_doador': Prefetcher(
+        'hemoes', _cpf, lambda client, ctx: client.get_doador(ctx['cpf'])
+    ),
+    'detran_search_vehicles': Prefetcher(
+        'detran', _cpf, lambda client, ctx: client.get_vehicles(ctx['cpf'])
+    ),
+    'detran_fetch_profile': Prefetcher(
+        'detran', _user_id, lambda client, ctx: client.fetch_user_profile(str(ctx['user_id']))
+    ),
+    'sesa_check_agendamento_existente': Prefetcher(
+        'sesa', _agendamentos_ativos,
+        lambda client, ctx: client.check_agendamento_existente(ctx['servico_id'], str(ctx['user_id']), True)
+    )
+}
+
+_executor = ThreadPoolExecutor(max_workers=Config.PREFETCH_MAX_WORKERS, thread_name_prefix='prefetch')
+
+def start_prefetch(scope: RequestScope, orgao: str, user_context: Optional[Dict[str, Any]],
+                   clients: Optional[Dict[str, Any]]) -> List[str]:
+    """Dispara em paralelo os pré-carregamentos configurados para o órgão."""
+    if not Config.PREFETCH_ENABLED or not user_context or not clients:
+        return []
+
+    disparados = []
+    for tool_name in filter(None, (t.strip() for t in Config.PREFETCH.get(orgao, '').split(','))):
+        prefetcher = PREFETCHERS.get(tool_name)
+        if prefetcher is None:
+            logger.warning("Pré-carregamento desconhecido configurado para %s: %s", orgao, tool_name)
+            continue
+
+        args = prefetcher.args(user_context)
+        client = clients.get(prefetcher.client_name)
+        if args is None or client is None:
+            continue
+
+        scope.prefetch(
+            _executor, tool_name, args,
+            lambda p=prefetcher, c=client: p.call(c, user_context)
+        )
+        metrics.incr(f"prefetch.{tool_name}.disparados")
+        disparados.append(tool_name)
+    return disparados
@@ -0,0 +1,133 @@
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, Optional, Set
+
+from app.config import Config
+from app.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    module = frame.f_globals.get('__name__', os.path.basename(code.co_filename))
+    return f"{module}:{code.co_name}"
+
+class SamplingProfiler:
+    """Profiler por amostragem de pilhas, restrito às threads das requisições sorteadas.
+
+    Uma thread em segundo plano lê sys._current_frames() a cada `interval` segundos e
+    acumula as pilhas no formato "collapsed" (func1;func2;func3 contagem), pronto para
+    ferramentas de flamegraph. O custo recai só sobre a thread de amostragem.
+    """
+
+    def __init__(self, interval: float, sample_rate: float, output_dir: str, max_depth: int = 64):
+        self.interval = interval
+        self.sample_rate = sample_rate
+        self.output_dir = output_dir
+        self.max_depth = max_depth
+        self.started_at: Optional[float] = None
+        self._stacks: Counter = Counter()
+        self._threads: Set[int] = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._sampler is not None and self._sampler.is_alive()
+
+    def start(self, sample_rate: Optional[float] = None):
+        """Inicia (ou reinicia) a coleta, descartando amostras anteriores."""
+        self.stop()
+        if sample_rate is not None:
+            self.sample_rate = sample_rate
+        with self._lock:
+            self._stacks.clear()
+        self.started_at = time.time()
+        self._stop.clear()
+        self._sampler = threading.Thread(target=self._run, name='profiler-sampler', daemon=True)
+        self._sampler.start()
+        logger.info("Profiling iniciado (taxa de amostragem: %.2f%%).", self.sample_rate * 100)
+
+    def stop(self):
+        """Interrompe a coleta, mantendo as amostras para gravação."""
+        if self.running:
+            self._stop.set()
+            self._sampler.join(timeout=1)
+            logger.info("Profiling interrompido.")
+        self._sampler = None
+
+    def should_sample(self) -> bool:
+        """Sorteia se a requisição atual deve ser perfilada."""
+        return self.running and random.random() < self.sample_rate
+
+    def begin(self, thread_id: int):
+        with self._lock:
+            self._threads.add(thread_id)
+        metrics.incr('profiling.requisicoes_amostradas')
+
+    def end(self, thread_id: int):
+        with self._lock:
+            self._threads.discard(thread_id)
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            with self._lock:
+                threads = set(self._threads)
+            if not threads:
+                continue
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own or thread_id not in threads:
+                    continue
+                stack = []
+                while frame is not None and len(stack) < self.max_depth:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                with self._lock:
+                    self._stacks[';'.join(reversed(stack))] += 1
+
+    def summary(self, top: int = 30) -> Dict[str, Any]:
+        """Agrega as amostras por função (próprias e inclusivas)."""
+        own: Counter = Counter()
+        inclusive: Counter = Counter()
+        with self._lock:
+            stacks = dict(self._stacks)
+        for stack, count in stacks.items():
+            funcs = stack.split(';')
+            own[funcs[-1]] += count
+            for func in set(funcs):
+                inclusive[func] += count
+        return {
+            "amostras": sum(stacks.values()),
+            "intervalo_ms": self.interval * 1000,
+            "proprias": own.most_common(top),
+            "inclusivas": inclusive.most_common(top)
+        }
+
+    def dump(self) -> Dict[str, str]:
+        """Grava as pilhas (formato collapsed) e o resumo por função em output_dir."""
+        os.makedirs(self.output_dir, exist_ok=True)
+        prefix = os.path.join(self.output_dir, time.strftime('profile-%Y%m%d-%H%M%S'))
+        with self._lock:
+            stacks = dict(self._stacks)
+        with open(f"{prefix}.folded", 'w', encoding='utf-8') as f:
+            for stack, count in sorted(stacks.items()):
+                f.write(f"{stack} {count}\n")
+        with open(f"{prefix}.json", 'w', encoding='utf-8') as f:
+            json.dump(self.summary(top=100), f, indent=2)
+        return {"collapsed": f"{prefix}.folded", "resumo": f"{prefix}.json"}
+
+    @classmethod
+    def from_config(cls) -> "SamplingProfiler":
+        return cls(
+            interval=Config.PROFILING_INTERVAL_MS / 1000,
+            sample_rate=Config.PROFILING_SAMPLE_RATE,
+            output_dir=Config.PROFILING_OUTPUT_DIR
+        )
\ No newline at end of file
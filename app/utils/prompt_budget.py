@@ -0,0 +1,130 @@
+import json
+import logging
+from typing import Any, Dict, Optional
+
+from app.config import Config
+from app.utils.metrics import metrics
+from app.utils.raw_response import RawResponse
+
+try:
+    import tiktoken
+    _encoding = tiktoken.get_encoding('cl100k_base')
+except Exception:  # tiktoken ausente ou sem acesso ao arquivo de encoding
+    _encoding = None
+
+logger = logging.getLogger(__name__)
+
+def count_tokens(text: str) -> int:
+    """Conta os tokens de um texto (aproximação de 4 caracteres/token sem o tiktoken)."""
+    if not text:
+        return 0
+    if _encoding is not None:
+        return len(_encoding.encode(text, disallowed_special=()))
+    return len(text) // 4 + 1
+
+def trim_user_context(orgao: str, user_context: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Mantém no user_context apenas as chaves relevantes para o órgão, com valores curtos."""
+    if not user_context:
+        return user_context
+
+    chaves = Config.PROMPT_CONTEXT_KEYS.get(orgao)
+    limite = Config.PROMPT_CONTEXT_MAX_VALUE_CHARS
+    trimmed = {}
+    for key, value in user_context.items():
+        if chaves is not None and key not in chaves:
+            continue
+        if isinstance(value, str) and len(value) > limite:
+            value = value[:limite] + '…'
+        elif isinstance(value, (dict, list)):
+            serialized = json.dumps(value, ensure_ascii=False)
+            if len(serialized) > limite:
+                continue
+        trimmed[key] = value
+    return trimmed
+
+def _compact_data(data: Any, max_items: int, depth: int = 0) -> Any:
+    """Resume estruturas grandes: listas viram os primeiros itens mais a contagem do restante."""
+    if isinstance(data, list):
+        items = [_compact_data(item, max_items, depth + 1) for item in data[:max_items]]
+        if len(data) > max_items:
+            items.append(f"... mais {len(data) - max_items} itens omitidos")
+        return items
+    if isinstance(data, dict):
+        if depth >= 3:
+            return {key: value for key, value in data.items() if not isinstance(value, (dict, list))}
+        return {key: _compact_data(value, max_items, depth + 1) for key, value in data.items()}
+    if isinstance(data, str) and len(data) > 300:
+        return data[:300] + '…'
+    return data
+
+class PromptBudget:
+    """Mede o prompt de uma execução por seção e compacta as observações das ferramentas.
+
+    As seções fixas (papel, backstory, ferramentas, contexto e consulta) são medidas na
+    criação; o que sobra do orçamento do órgão é destinado ao histórico de observações.
+    Observações que excedem o limite individual, ou que chegam depois de o histórico
+    esgotar sua parte, são resumidas antes de voltar ao agente.
+    """
+
+    def __init__(self, orgao: str, agent: Any, description: str,
+                 user_context: Optional[Dict[str, Any]]):
+        self.orgao = orgao
+        self.budget = Config.PROMPT_BUDGET.get(orgao, Config.PROMPT_BUDGET_DEFAULT)
+        tools = getattr(agent, 'tools', None) or []
+        self.sections = {
+            'role': count_tokens(getattr(agent, 'role', '')),
+            'backstory': count_tokens(f"{getattr(agent, 'goal', '')} {getattr(agent, 'backstory', '')}"),
+            'tools': sum(count_tokens(f"{t.name}: {t.description}") for t in tools),
+            'context': count_tokens(json.dumps(user_context, ensure_ascii=False)) if user_context else 0,
+            'task': count_tokens(description),
+            'history': 0
+        }
+        self.compactadas = 0
+
+    @property
+    def history_budget(self) -> int:
+        fixed = sum(tokens for section, tokens in self.sections.items() if section != 'history')
+        return max(self.budget - fixed, 0)
+
+    def render(self, result: Any) -> str:
+        """Serializa o resultado de uma ferramenta respeitando o orçamento de histórico."""
+        if isinstance(result, RawResponse):
+            # Corpo bruto: repassado sem reserialização; só é decodificado se precisar compactar
+            text = result.text
+            tokens = count_tokens(text)
+        else:
+            text = json.dumps(result, indent=2)
+            tokens = count_tokens(text)
+        restante = self.history_budget - self.sections['history']
+        limite = min(Config.PROMPT_MAX_OBSERVATION_TOKENS, max(restante, Config.PROMPT_MIN_OBSERVATION_TOKENS))
+
+        if tokens > limite:
+            self.compactadas += 1
+            metrics.incr(f"prompt.{self.orgao}.observacoes_compactadas")
+            if isinstance(result, RawResponse):
+                result = result.json()
+            # Primeiro sem indentação; só então resumindo listas e textos longos
+            text = json.dumps(result, ensure_ascii=False, separators=(',', ':'))
+            tokens = count_tokens(text)
+            if tokens > limite:
+                max_items = 10 if restante > 0 else 3
+                text = json.dumps(_compact_data(result, max_items), ensure_ascii=False, separators=(',', ':'))
+                tokens = count_tokens(text)
+            if tokens > limite:
+                # Corte proporcional como último recurso
+                text = text[:max(int(len(text) * limite / tokens), 1)] + '… [resultado truncado]'
+                tokens = count_tokens(text)
+
+        self.sections['history'] += tokens
+        return text
+
+    def report(self) -> Dict[str, Any]:
+        """Tamanho do prompt por seção, para os metadados da resposta."""
+        total = sum(self.sections.values())
+        metrics.observe(f"prompt.{self.orgao}.tokens", total)
+        return {
+            "secoes": dict(self.sections),
+            "total": total,
+            "orcamento": self.budget,
+            "observacoes_compactadas": self.compactadas
+        }
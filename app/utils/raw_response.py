@@ -0,0 +1,135 @@
+import json
+import re
+from typing import Any, Dict, Iterator, Mapping, Optional
+
+_WS = re.compile(r'[ \t\n\r]*')
+_decoder = json.JSONDecoder()
+_FECHAMENTO = {'{': '}', '[': ']'}
+
+def invalid_json() -> Dict[str, str]:
+    """Resposta de erro devolvida quando o corpo de um serviço não é um JSON válido."""
+    return {
+        "error": "Invalid JSON",
+        "message": "O serviço retornou uma resposta inválida."
+    }
+
+class RawResponse:
+    """Corpo JSON bruto de uma resposta, decodificado apenas sob demanda.
+
+    As ferramentas podem repassar o texto ao agente sem decodificar e reserializar;
+    json() decodifica (uma única vez) e iter_items() percorre listas grandes item a item.
+    """
+
+    __slots__ = ('content', 'status_code', 'headers', '_text', '_json')
+
+    def __init__(self, content: bytes, status_code: int = 200, headers: Optional[Mapping[str, str]] = None):
+        self.content = content
+        self.status_code = status_code
+        self.headers = headers or {}
+        self._text: Optional[str] = None
+        self._json: Any = None
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            self._text = self.content.decode('utf-8') if self.content else ''
+        return self._text
+
+    def json(self) -> Any:
+        """Decodifica o corpo inteiro (resultado reaproveitado nas chamadas seguintes)."""
+        if self._json is None:
+            self._json = json.loads(self.text) if self.content else {"success": True}
+        return self._json
+
+    @property
+    def is_list(self) -> bool:
+        text = self.text
+        idx = _WS.match(text).end()
+        return text[idx:idx + 1] == '['
+
+    @property
+    def truncated(self) -> bool:
+        """Indica se o corpo abre um objeto ou lista e não termina com o fechamento correspondente.
+
+        Verificação barata (não decodifica o corpo): detecta respostas cortadas, mas um erro no
+        meio dos itens só aparece ao percorrê-los (iter_items() levanta ValueError).
+        """
+        if self._json is not None:
+            return False
+        text = self.text
+        idx = _WS.match(text).end()
+        inicio = text[idx:idx + 1]
+        return inicio in _FECHAMENTO and text.rstrip(' \t\n\r')[-1:] != _FECHAMENTO[inicio]
+
+    def has_list(self, key: str = 'data') -> bool:
+        """Indica se o corpo (não truncado) é uma lista ou um objeto com uma lista em `key`."""
+        if self._json is not None:
+            return isinstance(self._json, list) or (
+                isinstance(self._json, dict) and isinstance(self._json.get(key), list))
+        if self.truncated:
+            return False
+        text = self.text
+        idx = _WS.match(text).end()
+        if text[idx:idx + 1] == '{':
+            try:
+                idx = self._seek_key(text, idx + 1, key)
+            except ValueError:
+                return False
+        return idx is not None and text[idx:idx + 1] == '['
+
+    def iter_items(self, key: str = 'data') -> Iterator[Any]:
+        """Percorre os itens da lista do corpo (lista pura ou em `key`) sem decodificar o restante."""
+        if self._json is not None:
+            data = self._json if isinstance(self._json, list) else (
+                self._json.get(key, []) if isinstance(self._json, dict) else [])
+            yield from (data if isinstance(data, list) else [])
+            return
+
+        text = self.text
+        idx = _WS.match(text).end()
+        if text[idx:idx + 1] == '{':
+            idx = self._seek_key(text, idx + 1, key)
+            if idx is None:
+                return
+        if text[idx:idx + 1] != '[':
+            return
+
+        idx = _WS.match(text, idx + 1).end()
+        if text[idx:idx + 1] == ']':
+            return
+        while True:
+            item, idx = _decoder.raw_decode(text, idx)
+            yield item
+            idx = _WS.match(text, idx).end()
+            separador = text[idx:idx + 1]
+            if separador == ']':
+                return
+            if separador != ',':
+                raise ValueError(f"JSON inválido na posição {idx}")
+            idx = _WS.match(text, idx + 1).end()
+
+    @staticmethod
+    def _seek_key(text: str, idx: int, key: str) -> Optional[int]:
+        """Posição do valor de `key` no objeto de nível superior, pulando as demais chaves."""
+        while True:
+            idx = _WS.match(text, idx).end()
+            if text[idx:idx + 1] != '"':
+                return None
+            nome, idx = _decoder.raw_decode(text, idx)
+            idx = _WS.match(text, idx).end()
+            if text[idx:idx + 1] != ':':
+                raise ValueError(f"JSON inválido na posição {idx}")
+            idx = _WS.match(text, idx + 1).end()
+            if nome == key:
+                return idx
+            _, idx = _decoder.raw_decode(text, idx)
+            idx = _WS.match(text, idx).end()
+            if text[idx:idx + 1] != ',':
+                return None
+            idx += 1
+
+    def __len__(self) -> int:
+        return len(self.content)
+
+    def __repr__(self) -> str:
+        return f"RawResponse({len(self.content)} bytes)"
\ No newline at end of file
@@ -0,0 +1,241 @@
+import re
+import threading
+import time
+from concurrent.futures import Executor, Future
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional, Tuple
+from app.utils.metrics import metrics
+
+MemoKey = Tuple[str, Tuple[Hashable, ...]]
+# Escrita bem-sucedida: (ferramenta, argumentos, resultado)
+Escrita = Tuple[str, Tuple[Hashable, ...], Any]
+
+LIMITE_ITERACOES = 'iteracoes'
+LIMITE_CHAMADAS_FERRAMENTAS = 'chamadas_ferramentas'
+LIMITE_TEMPO = 'tempo'
+
+def _is_error(result: Any) -> bool:
+    return isinstance(result, dict) and 'error' in result
+
+def cpf_key(cpf: str) -> str:
+    """Normaliza um CPF para uso em chaves de memorização."""
+    return re.sub(r'[^\d]', '', str(cpf))
+
+class RequestScope:
+    """Estado compartilhado pelas ferramentas durante uma única execução de process_query.
+
+    `writes` pode ser uma lista compartilhada entre execuções (os níveis da cascata de
+    modelos), para que uma escrita feita por um nível não seja repetida pelo seguinte.
+    """
+
+    def __init__(self, writes: Optional[List[Escrita]] = None):
+        self.memo_hits = 0
+        self.memo_misses = 0
+        self._memo: Dict[MemoKey, Any] = {}
+        # chave -> (pré-carregamento em andamento, geração em que foi disparado)
+        self._inflight: Dict[MemoKey, Tuple[Future, int]] = {}
+        # Incrementada a cada invalidate: resultados obtidos antes de uma escrita não são memorizados
+        self._generation = 0
+        # chave pré-carregada -> se alguma ferramenta chegou a usá-la
+        self._prefetched: Dict[MemoKey, bool] = {}
+        # chave semeada a partir da sessão de conversa -> se foi reaproveitada
+        self._seeded: Dict[MemoKey, bool] = {}
+        self._lock = threading.Lock()
+        # Orçamento de prompt da execução (app.utils.prompt_budget.PromptBudget), se houver
+        self.budget = None
+        self.tool_calls = 0
+        self.max_tool_calls: Optional[int] = None
+        self.deadline: Optional[float] = None
+        self.limite_atingido: Optional[str] = None
+        # Lotes de ferramentas executados em paralelo (app.tools.parallel)
+        self.parallel_batches = 0
+        self.parallel_calls = 0
+        self.parallel_saved_ms = 0.0
+        self.writes: List[Escrita] = writes if writes is not None else []
+
+    def set_limits(self, max_tool_calls: Optional[int] = None, max_seconds: Optional[float] = None):
+        """Define o máximo de chamadas de ferramentas e o prazo (em segundos) da execução."""
+        self.max_tool_calls = max_tool_calls
+        self.deadline = time.monotonic() + max_seconds if max_seconds else None
+
+    def consume_tool_call(self) -> Optional[str]:
+        """Contabiliza uma chamada de ferramenta e retorna o limite excedido, se houver."""
+        with self._lock:
+            self.tool_calls += 1
+            if self.max_tool_calls is not None and self.tool_calls > self.max_tool_calls:
+                self.limite_atingido = self.limite_atingido or LIMITE_CHAMADAS_FERRAMENTAS
+                return LIMITE_CHAMADAS_FERRAMENTAS
+            if self.deadline is not None and time.monotonic() > self.deadline:
+                self.limite_atingido = self.limite_atingido or LIMITE_TEMPO
+                return LIMITE_TEMPO
+            return None
+
+    def record_parallel(self, chamadas: int, economia_ms: float):
+        """Contabiliza um lote de chamadas executado em paralelo e o tempo de parede economizado."""
+        with self._lock:
+            self.parallel_batches += 1
+            self.parallel_calls += chamadas
+            self.parallel_saved_ms += economia_ms
+
+    def record_write(self, tool_name: str, args: Tuple[Hashable, ...], result: Any):
+        """Registra uma escrita bem-sucedida."""
+        with self._lock:
+            self.writes.append((tool_name, args, result))
+
+    def find_write(self, tool_name: str, args: Tuple[Hashable, ...]) -> Tuple[bool, Any]:
+        """Procura uma escrita idêntica já realizada; retorna (encontrada, resultado)."""
+        with self._lock:
+            for nome, argumentos, result in self.writes:
+                if nome == tool_name and argumentos == args:
+                    return True, result
+            return False, None
+
+    def _lookup(self, key: MemoKey) -> Tuple[bool, Any]:
+        with self._lock:
+            if key in self._memo:
+                self.memo_hits += 1
+                if key in self._prefetched:
+                    self._prefetched[key] = True
+                if key in self._seeded:
+                    self._seeded[key] = True
+                return True, self._memo[key]
+            return False, None
+
+    def memoize(self, tool_name: str, args: Tuple[Hashable, ...], func: Callable[[], Any]) -> Any:
+        """Retorna o resultado memorizado de (ferramenta, argumentos) ou executa func e o memoriza."""
+        key = (tool_name, args)
+        found, result = self._lookup(key)
+        if found:
+            return result
+
+        with self._lock:
+            inflight = self._inflight.get(key)
+        if inflight is not None:
+            # Pré-carregamento em andamento: aguarda em vez de repetir a chamada
+            try:
+                inflight[0].result()
+            except Exception:
+                pass
+            found, result = self._lookup(key)
+            if found:
+                return result
+
+        with self._lock:
+            self.memo_misses += 1
+            geracao = self._generation
+        result = func()
+        if not _is_error(result):
+            with self._lock:
+                if self._generation == geracao:
+                    self._memo[key] = result
+        return result
+
+    def prefetch(self, executor: Executor, tool_name: str, args: Tuple[Hashable, ...],
+                 func: Callable[[], Any]):
+        """Dispara em segundo plano uma leitura cujo resultado ficará disponível para memoize."""
+        key = (tool_name, args)
+
+        def run():
+            result = func()
+            with self._lock:
+                inflight = self._inflight.get(key)
+                # Descartado se a chave foi invalidada (e talvez pré-carregada de novo) nesse meio-tempo
+                if inflight is not None and inflight[1] == geracao:
+                    if not _is_error(result):
+                        self._memo[key] = result
+                    del self._inflight[key]
+            return result
+
+        with self._lock:
+            if key in self._memo or key in self._inflight:
+                return
+            geracao = self._generation
+            self._prefetched[key] = False
+            self._inflight[key] = (executor.submit(run), geracao)
+
+    def seed(self, results: Dict[MemoKey, Any]):
+        """Pré-popula a memorização com resultados obtidos em turnos anteriores da conversa."""
+        with self._lock:
+            for key, value in results.items():
+                if key not in self._memo:
+                    self._memo[key] = value
+                    self._seeded[key] = False
+
+    def results(self) -> Dict[MemoKey, Any]:
+        """Resultados memorizados (válidos) ao final da execução."""
+        with self._lock:
+            return dict(self._memo)
+
+    def invalidate(self, tool_name: str, args_prefix: Tuple[Hashable, ...] = ()) -> int:
+        """Descarta os resultados memorizados de uma ferramenta cujos argumentos começam com args_prefix.
+
+        Pré-carregamentos em andamento dessas chaves também são descartados, e nenhuma leitura
+        iniciada antes da invalidação chega a ser memorizada.
+        """
+        def afetada(key: MemoKey) -> bool:
+            return key[0] == tool_name and key[1][:len(args_prefix)] == args_prefix
+
+        with self._lock:
+            self._generation += 1
+            keys = [key for key in self._memo if afetada(key)]
+            for key in keys:
+                del self._memo[key]
+                self._seeded.pop(key, None)
+            for key in [key for key in self._inflight if afetada(key)]:
+                self._inflight.pop(key)[0].cancel()
+            return len(keys)
+
+    def close(self):
+        """Cancela pré-carregamentos pendentes e contabiliza seu aproveitamento."""
+        with self._lock:
+            for future, _ in self._inflight.values():
+                future.cancel()
+            for (tool_name, _), used in self._prefetched.items():
+                metrics.incr(f"prefetch.{tool_name}.{'aproveitados' if used else 'desperdicados'}")
+
+    def metadata(self) -> Dict[str, Any]:
+        """Resumo do uso do escopo para os metadados da resposta."""
+        with self._lock:
+            usados = sum(1 for used in self._prefetched.values() if used)
+            metadata = {
+                "chamadas_ferramentas": self.tool_calls,
+                "memo": {"hits": self.memo_hits, "misses": self.memo_misses},
+                "prefetch": {"disparados": len(self._prefetched), "aproveitados": usados}
+            }
+            if self.parallel_batches:
+                metadata["paralelo"] = {
+                    "lotes": self.parallel_batches,
+                    "chamadas": self.parallel_calls,
+                    "economia_ms": round(self.parallel_saved_ms, 1)
+                }
+            if self.writes:
+                metadata["escritas"] = [
+                    {"ferramenta": nome, "argumentos": list(argumentos)}
+                    for nome, argumentos, _ in self.writes
+                ]
+            if self._seeded:
+                metadata["sessao"] = {
+                    "semeados": len(self._seeded),
+                    "reaproveitados": sum(1 for used in self._seeded.values() if used)
+                }
+        if self.budget is not None:
+            metadata["prompt"] = self.budget.report()
+        return metadata
+
+_current_scope: ContextVar[Optional[RequestScope]] = ContextVar('request_scope', default=None)
+
+def current_scope() -> Optional[RequestScope]:
+    """Retorna o escopo da requisição em andamento, se houver."""
+    return _current_scope.get()
+
+@contextmanager
+def request_scope(writes: Optional[List[Escrita]] = None) -> Iterator[RequestScope]:
+    """Abre um escopo de requisição válido até o fim do bloco."""
+    scope = RequestScope(writes)
+    token = _current_scope.set(scope)
+    try:
+        yield scope
+    finally:
+        _current_scope.reset(token)
+        scope.close()
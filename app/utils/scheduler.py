@@ -0,0 +1,84 @@
+import re
+import unicodedata
+from typing import Any, Dict, Iterable, Optional, TypeVar
+
+from app.config import Config
+
+CLASSE_TRANSACIONAL = 'transacional'
+CLASSE_CONSULTA_PESSOAL = 'consulta_pessoal'
+CLASSE_CATALOGO = 'catalogo'
+
+# Flexões dos verbos de ação (infinitivo, indicativo, subjuntivo/imperativo, gerúndio); os
+# substantivos homônimos ficam de fora: "marca(s)", "agenda", "agendamento", "reserva(s)" e
+# "marco" (também "março" sem acento)
+_FLEXOES = r'ar|am|ei|ou|amos|aram|ando|ara|arei|aremos|aria|ariam|arem|asse|e|em|emos'
+_TRANSACIONAL = re.compile(
+    r'\b(?:(?:marc|marqu|agend|reserv)(?:' + _FLEXOES + r')'
+    r'|(?:desmarc|desmarqu|remarc|remarqu|cancel|atualiz)(?:' + _FLEXOES + r'|a|o))\b'
+)
+_PESSOAL = re.compile(r'\b(meu|minha|meus|minhas|eu)\b')
+
+def normalizar_texto(texto: str) -> str:
+    texto = unicodedata.normalize('NFKD', texto.lower())
+    return ''.join(c for c in texto if not unicodedata.combining(c))
+
+def classificar_requisicao(query: str, user_context: Optional[Dict[str, Any]] = None) -> str:
+    """Classe de prioridade de uma consulta: transacional, consulta pessoal ou catálogo."""
+    texto = normalizar_texto(query or '')
+    if _TRANSACIONAL.search(texto):
+        return CLASSE_TRANSACIONAL
+    if (isinstance(user_context, dict) and (user_context.get('cpf') or user_context.get('user_id'))) \
+            or _PESSOAL.search(texto):
+        return CLASSE_CONSULTA_PESSOAL
+    return CLASSE_CATALOGO
+
+T = TypeVar('T')
+
+class WeightedFairQueue:
+    """Fila justa ponderada (start-time fair queuing) entre classes de prioridade.
+
+    Cada item recebe uma etiqueta de término = max(tempo virtual, término anterior da classe)
+    + 1/peso; sai primeiro a menor etiqueta. Sob saturação, cada classe recebe uma fatia
+    proporcional ao seu peso, e nenhuma fica sem atendimento.
+    """
+
+    def __init__(self, weights: Optional[Dict[str, float]] = None):
+        self.weights = weights or Config.SCHEDULER_WEIGHTS
+        self._virtual_time = 0.0
+        self._last_finish: Dict[str, float] = {}
+        self._items: Dict[int, tuple] = {}
+        self._seq = 0
+
+    def push(self, item: T, classe: str):
+        start = max(self._virtual_time, self._last_finish.get(classe, 0.0))
+        finish = start + 1.0 / self.weights.get(classe, 1.0)
+        self._last_finish[classe] = finish
+        self._seq += 1
+        self._items[id(item)] = (finish, self._seq, start, item)
+
+    def remove(self, item: T):
+        self._items.pop(id(item), None)
+        self._reset_if_empty()
+
+    def _reset_if_empty(self):
+        """Fila vazia: zera as etiquetas, para que o histórico de uma classe não a atrase depois."""
+        if not self._items:
+            self._virtual_time = 0.0
+            self._last_finish.clear()
+
+    def pop(self, eligible: Iterable[T]) -> Optional[T]:
+        """Retira, dentre os itens elegíveis, o de menor etiqueta de término."""
+        candidatos = [self._items[id(item)] for item in eligible if id(item) in self._items]
+        if not candidatos:
+            return None
+        finish, _, start, item = min(candidatos, key=lambda entry: (entry[0], entry[1]))
+        del self._items[id(item)]
+        self._virtual_time = max(self._virtual_time, start)
+        self._reset_if_empty()
+        return item
+
+    def __iter__(self):
+        return iter([entry[3] for entry in sorted(self._items.values(), key=lambda e: (e[0], e[1]))])
+
+    def __len__(self) -> int:
+        return len(self._items)
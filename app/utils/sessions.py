@@ -0,0 +1,135 @@
+import re
+import secrets
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Dict, Optional, Tuple
+
+from app.config import Config
+from app.utils.cache import TTLCache
+from app.utils.metrics import metrics
+from app.utils.request_scope import MemoKey, cpf_key
+
+# Chaves do user_context que não ficam guardadas na sessão (credenciais valem só para a requisição)
+_CHAVE_SENSIVEL = re.compile(r'token|senha|password|secret|authorization', re.IGNORECASE)
+
+def _principal(user_context: Optional[Dict[str, Any]]) -> Optional[str]:
+    """Titular identificado no user_context (CPF ou user_id)."""
+    if not isinstance(user_context, dict):
+        return None
+    if user_context.get('cpf'):
+        return f"cpf:{cpf_key(user_context['cpf'])}"
+    if user_context.get('user_id'):
+        return f"user:{user_context['user_id']}"
+    return None
+
+def _truncar(texto: str, limite: int) -> str:
+    texto = ' '.join(str(texto).split())
+    return texto if len(texto) <= limite else texto[:limite] + '…'
+
+class ConversationSession:
+    """Estado de uma conversa: últimas trocas, contexto do usuário e resultados de ferramentas.
+
+    Os resultados das ferramentas são semeados no escopo de cada nova execução, de modo que
+    perguntas de seguimento reaproveitam catálogos e dados do cidadão já consultados.
+    """
+
+    def __init__(self, session_id: str, orgao: str, principal: Optional[str] = None):
+        self.id = session_id
+        self.orgao = orgao
+        self.principal = principal
+        self.user_context: Dict[str, Any] = {}
+        self.turns: deque = deque(maxlen=Config.SESSION_MAX_TURNS)
+        self._results: "OrderedDict[MemoKey, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def merge_context(self, user_context: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Combina o contexto dos turnos anteriores com o da requisição atual (que prevalece).
+
+        Credenciais (chaves como user_token) são usadas na requisição atual, mas não são guardadas.
+        """
+        with self._lock:
+            if not isinstance(user_context, dict):
+                return dict(self.user_context)
+            self.user_context.update(
+                (chave, valor) for chave, valor in user_context.items() if not _CHAVE_SENSIVEL.search(str(chave))
+            )
+            return {**self.user_context, **user_context}
+
+    def add_turn(self, query: str, response: str):
+        with self._lock:
+            self.turns.append((query, response))
+
+    def summary(self) -> str:
+        """Resumo compacto das últimas trocas, para o prompt do agente."""
+        limite = Config.SESSION_SUMMARY_CHARS
+        with self._lock:
+            return ' | '.join(
+                f"Usuário: {_truncar(query, limite)} / Assistente: {_truncar(response, limite)}"
+                for query, response in self.turns
+            )
+
+    def tool_results(self) -> Dict[MemoKey, Any]:
+        """Resultados de ferramentas ainda válidos."""
+        now = time.monotonic()
+        with self._lock:
+            for key in [key for key, (expires, _) in self._results.items() if expires < now]:
+                del self._results[key]
+            return {key: value for key, (_, value) in self._results.items()}
+
+    def store_results(self, results: Dict[MemoKey, Any]):
+        """Substitui os resultados guardados pelos do fim de uma execução.
+
+        Resultados semeados que não voltaram foram invalidados por uma escrita e são descartados;
+        os que voltaram inalterados mantêm a validade original. Os novos recebem a validade da
+        ferramenta (SESSION_TOOL_TTL, ou SESSION_TOOL_RESULT_TTL).
+        """
+        now = time.monotonic()
+        with self._lock:
+            for key in [key for key in self._results if key not in results]:
+                del self._results[key]
+            for key, value in results.items():
+                anterior = self._results.get(key)
+                if anterior is not None and anterior[1] is value:
+                    continue
+                ttl = Config.SESSION_TOOL_TTL.get(key[0], Config.SESSION_TOOL_RESULT_TTL)
+                if ttl <= 0:
+                    continue
+                self._results[key] = (now + ttl, value)
+            while len(self._results) > Config.SESSION_MAX_TOOL_RESULTS:
+                self._results.popitem(last=False)
+
+class SessionStore:
+    """Sessões de conversa em memória, com expiração por inatividade e limite de entradas."""
+
+    def __init__(self, ttl: float, max_entries: int):
+        self._sessions = TTLCache(ttl=ttl, max_entries=max_entries)
+
+    @classmethod
+    def from_config(cls) -> "SessionStore":
+        return cls(ttl=Config.SESSION_TTL, max_entries=Config.SESSION_MAX_ENTRIES)
+
+    def resolve(self, conversation_id: Optional[str], orgao: str,
+                user_context: Optional[Dict[str, Any]] = None) -> ConversationSession:
+        """Retorna a sessão da conversa ou abre uma nova.
+
+        Só são aceitos identificadores emitidos por este servidor; uma sessão de outro órgão
+        ou vinculada a outro titular não é reaproveitada. Uma sessão vinculada a um titular
+        só é retomada por requisições que identificam o mesmo titular.
+        """
+        principal = _principal(user_context)
+        session = self._sessions.get(conversation_id) if conversation_id else None
+        if session is not None and session.orgao == orgao and session.principal in (None, principal):
+            session.principal = session.principal or principal
+            # Renova a expiração a cada turno
+            self._sessions.set(session.id, session)
+            metrics.incr(f"sessoes.{orgao}.retomadas")
+            return session
+
+        session = ConversationSession(secrets.token_urlsafe(16), orgao, principal)
+        self._sessions.set(session.id, session)
+        metrics.incr(f"sessoes.{orgao}.criadas")
+        return session
+
+    def __len__(self) -> int:
+        return len(self._sessions)
\ No newline at end of file
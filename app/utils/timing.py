@@ -0,0 +1,157 @@
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+# Fases registradas por timed_phase
+FASE_ADMISSAO = 'admissao'
+FASE_TOKEN = 'token'
+FASE_LLM = 'llm'
+FASE_AGENTE = 'agente'
+
+class RequestTimings:
+    """Tempos de uma requisição por fase: admissão, tokens, ferramentas, serviços e LLM.
+
+    As ferramentas executadas em paralelo compartilham a mesma instância (o contexto é
+    copiado para as threads), daí o lock nas atualizações.
+    """
+
+    def __init__(self):
+        self.inicio = time.perf_counter()
+        self.total: Optional[float] = None
+        # fase -> [segundos, ocorrências]
+        self.phases: Dict[str, List[float]] = {}
+        # serviço -> [segundos, chamadas]
+        self.upstream: Dict[str, List[float]] = {}
+        self.tools: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def add(self, phase: str, seconds: float):
+        with self._lock:
+            acumulado = self.phases.setdefault(phase, [0.0, 0])
+            acumulado[0] += seconds
+            acumulado[1] += 1
+
+    def add_upstream(self, service: str, seconds: float):
+        with self._lock:
+            acumulado = self.upstream.setdefault(service, [0.0, 0])
+            acumulado[0] += seconds
+            acumulado[1] += 1
+
+    def add_tool(self, name: str, seconds: float, upstream: float):
+        with self._lock:
+            self.tools.append({
+                "ferramenta": name,
+                "ms": round(seconds * 1000, 1),
+                "upstream_ms": round(upstream * 1000, 1)
+            })
+
+    def finish(self):
+        self.total = time.perf_counter() - self.inicio
+
+    def to_dict(self) -> Dict[str, Any]:
+        total = self.total if self.total is not None else time.perf_counter() - self.inicio
+        with self._lock:
+            result: Dict[str, Any] = {"total_ms": round(total * 1000, 1)}
+            for phase, (seconds, count) in self.phases.items():
+                result[f"{phase}_ms"] = round(seconds * 1000, 1)
+                if phase == FASE_LLM:
+                    result["llm_iteracoes"] = count
+            result["upstream"] = {
+                service: {"ms": round(seconds * 1000, 1), "chamadas": count}
+                for service, (seconds, count) in self.upstream.items()
+            }
+            result["ferramentas"] = list(self.tools)
+        return result
+
+    def server_timing(self, max_tools: int = 20) -> str:
+        """Valor do cabeçalho Server-Timing (durações em ms)."""
+        data = self.to_dict()
+        entries = []
+        for phase in (FASE_ADMISSAO, FASE_TOKEN, FASE_AGENTE, FASE_LLM):
+            if f"{phase}_ms" in data:
+                desc = f';desc="{data["llm_iteracoes"]} iteracoes"' if phase == FASE_LLM else ''
+                entries.append(f"{phase};dur={data[f'{phase}_ms']}{desc}")
+        for service, values in data["upstream"].items():
+            entries.append(f'upstream-{service};dur={values["ms"]};desc="{values["chamadas"]} chamadas"')
+        for i, tool in enumerate(data["ferramentas"][:max_tools], 1):
+            entries.append(
+                f'ferramenta-{i};dur={tool["ms"]};desc="{tool["ferramenta"]} (upstream {tool["upstream_ms"]}ms)"'
+            )
+        entries.append(f"total;dur={data['total_ms']}")
+        return ', '.join(entries)
+
+_current_timings: ContextVar[Optional[RequestTimings]] = ContextVar('request_timings', default=None)
+# Tempo de serviço acumulado pela chamada de ferramenta em andamento (por contexto/thread)
+_tool_upstream: ContextVar[Optional[List[float]]] = ContextVar('tool_upstream', default=None)
+
+def current_timings() -> Optional[RequestTimings]:
+    return _current_timings.get()
+
+@contextmanager
+def request_timings() -> Iterator[RequestTimings]:
+    """Coleta os tempos por fase das operações executadas dentro do bloco."""
+    timings = RequestTimings()
+    token = _current_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        timings.finish()
+        _current_timings.reset(token)
+
+@contextmanager
+def timed(phase: str) -> Iterator[None]:
+    """Soma a duração do bloco à fase informada da requisição cronometrada, se houver."""
+    timings = _current_timings.get()
+    if timings is None:
+        yield
+        return
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(phase, time.perf_counter() - inicio)
+
+def timed_phase(phase: str) -> Callable:
+    """Decorador que soma a duração da função à fase informada (sem custo fora de uma requisição cronometrada)."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            timings = _current_timings.get()
+            if timings is None:
+                return func(*args, **kwargs)
+            inicio = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                timings.add(phase, time.perf_counter() - inicio)
+        return wrapper
+    return decorator
+
+def record_upstream(service: str, seconds: float):
+    """Registra uma chamada a um serviço externo (e a atribui à ferramenta em andamento)."""
+    timings = _current_timings.get()
+    if timings is None:
+        return
+    timings.add_upstream(service, seconds)
+    cell = _tool_upstream.get()
+    if cell is not None:
+        cell[0] += seconds
+
+@contextmanager
+def timed_tool(name: str) -> Iterator[None]:
+    """Cronometra uma chamada de ferramenta, com o tempo gasto nos serviços durante ela."""
+    timings = _current_timings.get()
+    if timings is None:
+        yield
+        return
+    cell = [0.0]
+    token = _tool_upstream.set(cell)
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        _tool_upstream.reset(token)
+        timings.add_tool(name, time.perf_counter() - inicio, cell[0])
\ No newline at end of file
@@ -0,0 +1,114 @@
+"""Mede a vazão de execuções de agentes fora do Flask (threads e processos).
+
+As ferramentas recebem o registro de clientes (app.clients.ClientRegistry) na criação, então
+uma execução não precisa de contexto de aplicação. O benchmark sobe um servidor local que
+imita as APIs da SESA com latência fixa e repete, em cada execução, o roteiro típico de um
+agente de agendamento: pensamento do modelo (simulado por --llm-ms) intercalado com as
+chamadas de ferramentas, dentro de um escopo de requisição. Compara execução sequencial,
+pool de threads e pool de processos, todos sem app_context.
+
+Uso: python benchmarks/agent_throughput.py [--execucoes 48] [--workers 8] [--latencia-ms 80] [--llm-ms 150]
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_LATENCIA = {'s': 0.08}
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        time.sleep(_LATENCIA['s'])
+        corpo = json.dumps({"data": [{"id": i, "nome": f"Item {i}", "hora": "08:00"} for i in range(20)]}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def log_message(self, *args):
+        pass
+
+# Runtime do processo atual (criado no próprio processo: clientes não são serializáveis)
+_runtime = None
+_llm_s = 0.0
+
+def _iniciar(llm_ms: float):
+    global _runtime, _llm_s
+    from app.agents.runtime import AgentRuntime
+    _runtime = AgentRuntime.from_config()
+    _llm_s = llm_ms / 1000
+
+def _execucao(i: int) -> float:
+    """Roteiro de uma execução do agente da SESA; retorna a duração em segundos."""
+    from app.utils.request_scope import request_scope
+    tools = {tool.name: tool for tool in _runtime.agents['sesa'].tools}
+    roteiro = [
+        ('sesa_get_municipios', {}),
+        ('sesa_get_servicos', {}),
+        ('sesa_get_unidades', {'municipio_id': str(i), 'servico_id': '1'}),
+        ('sesa_get_horarios', {'unidade_id': str(i), 'data': '2024-06-03'}),
+        ('sesa_get_horarios', {'unidade_id': str(i), 'data': '2024-06-04'})
+    ]
+    inicio = time.perf_counter()
+    with request_scope():
+        for nome, argumentos in roteiro:
+            time.sleep(_llm_s)
+            tools[nome]._run(**argumentos)
+        time.sleep(_llm_s)  # resposta final
+    return time.perf_counter() - inicio
+
+def _medir(executor, execucoes: int) -> dict:
+    inicio = time.perf_counter()
+    duracoes = sorted(executor.map(_execucao, range(execucoes)))
+    total = time.perf_counter() - inicio
+    return {
+        'exec_s': execucoes / total,
+        'p50_ms': duracoes[len(duracoes) // 2] * 1000,
+        'p99_ms': duracoes[int(len(duracoes) * 0.99)] * 1000
+    }
+
+class _Sequencial:
+    def map(self, func, items):
+        return [func(item) for item in items]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--execucoes', type=int, default=48)
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--latencia-ms', type=float, default=80)
+    parser.add_argument('--llm-ms', type=float, default=150)
+    args = parser.parse_args()
+
+    _LATENCIA['s'] = args.latencia_ms / 1000
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    # Lidos por app.config na importação (também pelos processos do pool)
+    os.environ['API_BASE_URL'] = f"http://127.0.0.1:{server.server_port}"
+    os.environ['HTTP_CACHE_ENABLED'] = 'False'
+    os.environ['PACING_INITIAL'] = str(args.workers)
+    os.environ['PACING_MAX_LIMIT'] = str(max(64, args.workers * 2))
+
+    _iniciar(args.llm_ms)
+    resultados = {'sequencial': _medir(_Sequencial(), max(4, args.execucoes // args.workers))}
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        resultados[f'threads ({args.workers})'] = _medir(executor, args.execucoes)
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_iniciar, initargs=(args.llm_ms,)) as executor:
+        list(executor.map(_execucao, range(args.workers)))  # aquecimento: cria os runtimes
+        resultados[f'processos ({args.workers})'] = _medir(executor, args.execucoes)
+
+    server.shutdown()
+    print(f"{'modo':<16}{'exec/s':>10}{'p50 (ms)':>12}{'p99 (ms)':>12}")
+    for nome, r in resultados.items():
+        print(f"{nome:<16}{r['exec_s']:>10.2f}{r['p50_ms']:>12.1f}{r['p99_ms']:>12.1f}")
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
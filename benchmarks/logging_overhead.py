@@ -0,0 +1,91 @@
+"""Mede o custo do logging no caminho de uma requisição (BaseApiClient._make_request).
+
+Sobe um servidor HTTP local que responde erro 500 com corpo grande (o caso que mais loga)
+e compara: logging desligado, handler síncrono em texto e fila assíncrona em JSON.
+
+Uso: python benchmarks/logging_overhead.py [--requisicoes 2000] [--threads 8]
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.clients.base import BaseApiClient
+from app.utils.logging_setup import configure_logging, shutdown_logging
+
+CORPO_ERRO = b'{"errors": [{"message": "' + b'x' * 50000 + b'"}]}'
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self.send_response(500)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(CORPO_ERRO)))
+        self.end_headers()
+        self.wfile.write(CORPO_ERRO)
+
+    def log_message(self, *args):
+        pass
+
+def _executar(client: BaseApiClient, url: str, requisicoes: int, threads: int) -> dict:
+    latencias = []
+    def chamada(_):
+        inicio = time.perf_counter()
+        client._make_request('GET', url)
+        latencias.append(time.perf_counter() - inicio)
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(chamada, range(requisicoes)))
+    total = time.perf_counter() - inicio
+    latencias.sort()
+    return {
+        'req_s': requisicoes / total,
+        'p50_ms': latencias[len(latencias) // 2] * 1000,
+        'p99_ms': latencias[int(len(latencias) * 0.99)] * 1000
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requisicoes', type=int, default=2000)
+    parser.add_argument('--threads', type=int, default=8)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/erro"
+    client = BaseApiClient(SimpleNamespace(base_url=url))
+
+    cenarios = [
+        ('desligado', dict(level='CRITICAL', fmt='text', use_queue=False)),
+        ('sincrono_texto', dict(level='INFO', fmt='text', use_queue=False)),
+        ('assincrono_json', dict(level='INFO', fmt='json', use_queue=True))
+    ]
+    stdout = sys.stdout
+    resultados = {}
+    for nome, opcoes in cenarios:
+        with tempfile.TemporaryFile('w') as destino:
+            # O handler de saída captura sys.stdout no momento da configuração
+            sys.stdout = destino
+            configure_logging(**opcoes)
+            sys.stdout = stdout
+            _executar(client, url, min(200, args.requisicoes), args.threads)  # aquecimento
+            resultados[nome] = _executar(client, url, args.requisicoes, args.threads)
+            shutdown_logging()
+
+    server.shutdown()
+    logging.getLogger().handlers.clear()
+    print(f"{'cenário':<18}{'req/s':>10}{'p50 (ms)':>12}{'p99 (ms)':>12}")
+    for nome, r in resultados.items():
+        print(f"{nome:<18}{r['req_s']:>10.1f}{r['p50_ms']:>12.2f}{r['p99_ms']:>12.2f}")
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -0,0 +1,97 @@
+"""Compara o caminho de dicionários genéricos com os registros de app/models/records.py.
+
+Gera uma resposta sintética no formato HEMOES ('fields=*.*', com relações expandidas e
+campos administrativos) e mede, para cada caminho: tempo de decodificação, tempo de
+serialização para o agente, memória retida pelos itens e tamanho da observação.
+
+Uso: python benchmarks/model_decoding.py [--itens 2000] [--repeticoes 5]
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models.records import DoadorRecord
+
+def _resposta(itens: int) -> bytes:
+    data = []
+    for i in range(itens):
+        item = {
+            "id": i,
+            "cpf": f"{i:011d}",
+            "nome": f"Doador {i}",
+            "sexo": "F" if i % 2 else "M",
+            "data_nascimento": "1990-01-01",
+            "tipo_sanguineo": "O",
+            "fator_rh": "+",
+            "apto_doacao": True,
+            "data_ultima_doacao": "2024-05-10",
+            "doacoes": [{"id": i * 10 + k, "data": "2024-05-10", "volume": 450, "status": "ok"} for k in range(3)],
+            "user_created": {"id": "a1b2", "first_name": "Admin", "email": "admin@hemoes.es.gov.br"},
+            "user_updated": {"id": "a1b2", "first_name": "Admin", "email": "admin@hemoes.es.gov.br"},
+            "date_created": "2023-01-01T10:00:00Z",
+            "date_updated": "2024-05-10T10:00:00Z",
+            "sort": None,
+            "status": "published"
+        }
+        item.update({f"campo_extra_{k}": f"valor {k}" for k in range(20)})
+        data.append(item)
+    return json.dumps({"data": data}).encode('utf-8')
+
+def _medir(nome: str, body: bytes, decodificar, serializar, repeticoes: int) -> dict:
+    decode_s = serialize_s = 0.0
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        itens = decodificar(body)
+        decode_s += time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        texto = serializar(itens)
+        serialize_s += time.perf_counter() - inicio
+        del itens
+
+    gc.collect()
+    tracemalloc.start()
+    itens = decodificar(body)
+    gc.collect()
+    retido = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del itens
+    return {
+        'caminho': nome,
+        'decodificar_ms': decode_s / repeticoes * 1000,
+        'serializar_ms': serialize_s / repeticoes * 1000,
+        'retido_kb': retido / 1024,
+        'observacao_kb': len(texto.encode('utf-8')) / 1024
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--itens', type=int, default=2000)
+    parser.add_argument('--repeticoes', type=int, default=5)
+    args = parser.parse_args()
+    body = _resposta(args.itens)
+
+    resultados = [
+        _medir('dict', body,
+               lambda b: json.loads(b)['data'],
+               lambda itens: json.dumps({"data": itens}, indent=2),
+               args.repeticoes),
+        _medir('registros', body,
+               lambda b: DoadorRecord.decode_list(json.loads(b)['data']),
+               lambda itens: json.dumps({"data": [r.to_dict() for r in itens]}, indent=2),
+               args.repeticoes)
+    ]
+
+    print(f"resposta: {args.itens} itens, {len(body) / 1024:.0f} KB")
+    print(f"{'caminho':<12}{'decodificar (ms)':>18}{'serializar (ms)':>17}{'retido (KB)':>14}{'observação (KB)':>17}")
+    for r in resultados:
+        print(f"{r['caminho']:<12}{r['decodificar_ms']:>18.1f}{r['serializar_ms']:>17.1f}"
+              f"{r['retido_kb']:>14.0f}{r['observacao_kb']:>17.0f}")
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
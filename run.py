@@ -2,12 +2,10 @@ import os
 import logging
 from dotenv import load_dotenv
 from app import create_app
+from app.utils.logging_setup import configure_logging
 
-# --- Configuração de Logging ---
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(name)s - %(message)s'
-)
+# --- Configuração de Logging (fila assíncrona; ver LOG_* em app/config.py) ---
+configure_logging()
 logger = logging.getLogger(__name__)
 
 def main():
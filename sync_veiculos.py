@@ -0,0 +1,38 @@
+import argparse
+import json
+import logging
+from dotenv import load_dotenv
+
+logger = logging.getLogger(__name__)
+
+def main():
+    """Sincroniza em lote os veículos do DETRAN a partir de um arquivo de CPF/user_id."""
+    load_dotenv()
+
+    # Importa após carregar o .env, pois a configuração lê as variáveis na importação
+    from app.utils.logging_setup import configure_logging
+    from app.auth.manager import CompleteAuthenticationManager
+    from app.clients import DetranClient
+    from app.pipelines import DetranSyncPipeline, ler_pares
+
+    configure_logging()
+
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument('entrada', help="Arquivo CSV (cpf,user_id[,user_token]) ou JSONL.")
+    parser.add_argument('--checkpoint', help="Arquivo de checkpoint para retomar execuções interrompidas.")
+    parser.add_argument('--workers', type=int, help="Número máximo de sincronizações simultâneas.")
+    parser.add_argument('--relatorio', help="Arquivo onde gravar o relatório final (JSON).")
+    args = parser.parse_args()
+
+    client = DetranClient(CompleteAuthenticationManager())
+    pipeline = DetranSyncPipeline(client, max_workers=args.workers, checkpoint_path=args.checkpoint)
+    relatorio = pipeline.run(ler_pares(args.entrada))
+
+    if args.relatorio:
+        with open(args.relatorio, 'w', encoding='utf-8') as f:
+            json.dump(relatorio, f, indent=2, ensure_ascii=False)
+    else:
+        print(json.dumps(relatorio, indent=2, ensure_ascii=False))
+
+if __name__ == '__main__':
+    main()
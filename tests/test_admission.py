@@ -0,0 +1,44 @@
+import pytest
+from flask import Flask
+
+from app.routes.admission import admission_args
+from app.utils.admission import AdmissionController, AdmissionRejected, TokenBucket
+
+def _controller(caller_rate=None, cpf_rate=None):
+    return AdmissionController(max_concurrent=2, max_concurrent_por_orgao={}, max_queue=0,
+                               queue_timeout=0.01, retry_after=1, caller_rate=caller_rate, cpf_rate=cpf_rate)
+
+def test_token_bucket():
+    bucket = TokenBucket(rate=1.0, capacity=2)
+    assert bucket.try_consume() == 0.0
+    assert bucket.try_consume() == 0.0
+    assert 0 < bucket.try_consume() <= 1.0
+
+def test_limite_por_chamador():
+    controller = _controller(caller_rate=(1 / 60, 2))
+    for _ in range(2):
+        controller.acquire('SESA', caller='10.0.0.1')
+        controller.release('SESA')
+    with pytest.raises(AdmissionRejected) as e:
+        controller.acquire('SESA', caller='10.0.0.1')
+    assert e.value.status == 429 and e.value.retry_after > 0
+    controller.acquire('SESA', caller='10.0.0.2')
+
+def test_balde_expira_so_depois_de_encher():
+    # 30 fichas a 1 por minuto: 30 minutos até encher, acima do mínimo de 10 minutos
+    assert _controller(caller_rate=(1 / 60, 30))._buckets.ttl == pytest.approx(1800)
+    assert _controller(caller_rate=(1.0, 10))._buckets.ttl == 600
+
+def test_fila_cheia():
+    controller = _controller()
+    controller.acquire('SESA')
+    controller.acquire('SESA')
+    with pytest.raises(AdmissionRejected) as e:
+        controller.acquire('SESA')
+    assert e.value.status == 503
+
+def test_chamador_ignora_x_client_id():
+    app = Flask(__name__)
+    with app.test_request_context('/sesa', method='POST', json={"query": "oi"},
+                                  headers={'X-Client-Id': 'outro'}, environ_base={'REMOTE_ADDR': '10.0.0.1'}):
+        assert admission_args()['caller'] == '10.0.0.1'
\ No newline at end of file
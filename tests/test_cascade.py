@@ -0,0 +1,133 @@
+from types import SimpleNamespace
+
+from app.tools.common import run_read_tool
+from app.tools.detran_tools import DetranAtualizarVeiculosTool
+from app.tools.sesa_tools import SesaCancelarAgendamentoTool, SesaReservarHorarioTool
+from app.utils import helpers
+from app.utils.helpers import (MARCADOR_BAIXA_CONFIANCA, MENSAGEM_LIMITE_ITERACOES, RESPOSTA_PARCIAL,
+                               RESPOSTA_PARCIAL_COM_DADOS, process_query_cascade)
+
+class FakeCrew:
+    """Substitui o Crew: cada agente de teste define o que faz na execução (`roteiro`)."""
+
+    def __init__(self, agents, tasks, verbose=False):
+        self.agent = agents[0]
+        self.task = tasks[0]
+
+    def kickoff(self, inputs=None):
+        return self.agent.roteiro(self.task)
+
+def _agent(model, roteiro):
+    return SimpleNamespace(llm=SimpleNamespace(model_name=model), role='', goal='', backstory='',
+                           tools=[], roteiro=roteiro)
+
+class FakeSesa:
+    def __init__(self, erro=None):
+        self.erro = erro
+        self.reservas = []
+        self.cancelamentos = []
+
+    def reservar_horario(self, payload, user_id):
+        self.reservas.append(payload)
+        return self.erro or {"success": True, "agendamento_id": 90 + len(self.reservas)}
+
+    def cancelar_agendamento(self, agendamento_id, user_id):
+        self.cancelamentos.append(agendamento_id)
+        return {"success": True}
+
+class FakeDetran:
+    def __init__(self):
+        self.envios = []
+
+    def atualizar_veiculos(self, user_id, veiculos):
+        self.envios.append(veiculos)
+        return {"success": True}
+
+def _cascata(roteiros):
+    """Dois níveis: o primeiro sinaliza baixa confiança e o segundo responde."""
+    def nivel(roteiro, resposta):
+        def executar(task):
+            roteiro(task)
+            return resposta
+        return executar
+    return [
+        _agent('rapido', nivel(roteiros[0], MARCADOR_BAIXA_CONFIANCA)),
+        _agent('capaz', nivel(roteiros[1], 'Pronto.'))
+    ]
+
+def test_cascata_nao_repete_escrita_do_nivel_anterior(monkeypatch):
+    monkeypatch.setattr(helpers, 'Crew', FakeCrew)
+    sesa = FakeSesa()
+    tool = SesaReservarHorarioTool(clients={'sesa': sesa})
+    observacoes = []
+    descricoes = []
+
+    def reservar(task):
+        descricoes.append(task.description)
+        observacoes.append(tool._run('u1', '{"unidade": "5", "data": "2024-06-03", "hora": "08:00"}'))
+
+    result = process_query_cascade(_cascata([reservar, reservar]), 'marcar consulta', 'SESA')
+
+    assert result['success'] and result['response'] == 'Pronto.'
+    assert len(sesa.reservas) == 1
+    assert 'OPERAÇÃO JÁ REALIZADA' in observacoes[1]
+    assert 'sesa_reservar_horario' in descricoes[1] and 'sesa_reservar_horario' not in descricoes[0]
+    assert [n['escalonado_por'] for n in result['metadata']['cascata']] == ['baixa_confianca', None]
+    assert [e['ferramenta'] for e in result['metadata']['escritas']] == ['sesa_reservar_horario']
+
+def test_escritas_diferentes_do_mesmo_usuario_sao_executadas(monkeypatch):
+    monkeypatch.setattr(helpers, 'Crew', FakeCrew)
+    sesa = FakeSesa()
+    detran = FakeDetran()
+    reservar = SesaReservarHorarioTool(clients={'sesa': sesa})
+    cancelar = SesaCancelarAgendamentoTool(clients={'sesa': sesa})
+    atualizar = DetranAtualizarVeiculosTool(clients={'detran': detran})
+
+    def primeiro(task):
+        reservar._run('u1', '{"unidade": "5", "data": "2024-06-03", "hora": "08:00"}')
+        cancelar._run('u1', 91)
+        atualizar._run('u1', '[{"id": "1", "plate": "ABC1D23"}]')
+
+    def segundo(task):
+        # Mesmo conteúdo com as chaves em outra ordem: é a mesma escrita
+        reservar._run('u1', '{"hora": "08:00", "data": "2024-06-03", "unidade": "5"}')
+        reservar._run('u1', '{"unidade": "5", "data": "2024-06-03", "hora": "09:00"}')
+        cancelar._run('u1', 92)
+        atualizar._run('u1', '[{"id": "1", "plate": "ABC1D23"}, {"id": "2", "plate": "XYZ9K87"}]')
+
+    result = process_query_cascade(_cascata([primeiro, segundo]), 'marcar e cancelar', 'SESA')
+
+    assert [r['hora'] for r in sesa.reservas] == ['08:00', '09:00']
+    assert sesa.cancelamentos == [91, 92]
+    assert len(detran.envios) == 2
+    assert len(result['metadata']['escritas']) == 6
+
+def test_escrita_com_erro_nao_e_registrada(monkeypatch):
+    monkeypatch.setattr(helpers, 'Crew', FakeCrew)
+    sesa = FakeSesa(erro={"error": "Horário indisponível"})
+    tool = SesaReservarHorarioTool(clients={'sesa': sesa})
+
+    def reservar(task):
+        tool._run('u1', '{"unidade": "5", "data": "2024-06-03", "hora": "08:00"}')
+
+    result = process_query_cascade(_cascata([reservar, reservar]), 'marcar consulta', 'SESA')
+    assert len(sesa.reservas) == 2
+    assert 'escritas' not in result['metadata']
+
+def test_resposta_parcial_usa_resultados_obtidos(monkeypatch):
+    monkeypatch.setattr(helpers, 'Crew', FakeCrew)
+
+    def roteiro(task):
+        run_read_tool('sesa_get_horarios', ('5', '2024-06-03'), lambda: {"data": [{"hora": "08:00"}]})
+        return MENSAGEM_LIMITE_ITERACOES
+
+    result = process_query_cascade([_agent('capaz', roteiro)], 'horários livres', 'SESA')
+    assert result['parcial'] and result['limite_atingido'] == 'iteracoes'
+    assert result['metadata']['parcial'] is True
+    assert result['response'].startswith(RESPOSTA_PARCIAL_COM_DADOS)
+    assert '08:00' in result['response']
+
+def test_resposta_parcial_sem_resultados(monkeypatch):
+    monkeypatch.setattr(helpers, 'Crew', FakeCrew)
+    result = process_query_cascade([_agent('capaz', lambda task: MENSAGEM_LIMITE_ITERACOES)], 'oi', 'SESA')
+    assert result['response'] == RESPOSTA_PARCIAL
\ No newline at end of file
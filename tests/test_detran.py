@@ -0,0 +1,41 @@
+from types import SimpleNamespace
+
+from app.clients.detran import DetranClient, _extrair_veiculos_perfil, diff_veiculos
+
+GOL = {"id": "1", "plate": "ABC1D23", "model": "Gol", "brandLogo": ""}
+UNO = {"id": "2", "plate": "XYZ9K87", "model": "Uno", "brandLogo": ""}
+
+def test_diff_veiculos():
+    uno_prata = dict(UNO, model="Uno Prata")
+    moto = {"id": "", "plate": "MOT0A00", "model": "CG", "brandLogo": ""}
+    assert diff_veiculos([GOL, UNO], [uno_prata, moto]) == {
+        "adicionados": [moto],
+        "removidos": [GOL],
+        "alterados": [uno_prata]
+    }
+
+def test_diff_veiculos_sem_mudancas():
+    assert diff_veiculos([GOL, UNO], [UNO, GOL]) == {"adicionados": [], "removidos": [], "alterados": []}
+
+def test_extrair_veiculos_perfil():
+    perfil = {"services": [
+        {"serviceCode": "outro", "data": {"veiculos": [UNO]}},
+        {"serviceCode": "meusVeiculos", "data": {"veiculos": [GOL]}}
+    ]}
+    assert _extrair_veiculos_perfil(perfil) == [GOL]
+    assert _extrair_veiculos_perfil({"services": []}) is None
+    assert _extrair_veiculos_perfil({"serviceCode": "meusVeiculos", "data": None}) is None
+
+def test_atualizar_veiculos_sem_token_nao_revela_ultimo_envio():
+    tokens = {"u1": "tok"}
+    auth = SimpleNamespace(base_url="http://detran", get_user_token=lambda user_id: tokens.get(user_id))
+    client = DetranClient(auth)
+    client._make_request = lambda *args, **kwargs: {"success": True}
+
+    assert client.atualizar_veiculos("u1", [GOL]) == {"success": True}
+    assert client.atualizar_veiculos("u1", [GOL])["skipped"] is True
+
+    del tokens["u1"]
+    result = client.atualizar_veiculos("u1", [GOL])
+    assert result["error"] == "Authentication Error"
+    assert "skipped" not in result
\ No newline at end of file
@@ -0,0 +1,51 @@
+from app.pipelines.detran_sync import STATUS_FALHA, STATUS_SINCRONIZADO, DetranSyncPipeline, _veiculos_da_resposta
+
+VEICULO = {"id": 7, "placa": "ABC1D23", "modelo": "Gol", "logoMarca": "vw.png"}
+
+class FakeDetranClient:
+    def __init__(self, vehicles):
+        self.vehicles = vehicles
+        self.enviados = []
+
+    def get_vehicles(self, cpf):
+        return self.vehicles
+
+    def atualizar_veiculos(self, user_id, veiculos, user_token_override=None):
+        self.enviados.append((user_id, veiculos))
+        return {"success": True}
+
+def test_veiculos_da_resposta_formatos_reconhecidos():
+    esperado = [{"id": "7", "plate": "ABC1D23", "model": "Gol", "brandLogo": "vw.png"}]
+    assert _veiculos_da_resposta([VEICULO]) == esperado
+    assert _veiculos_da_resposta({"data": [VEICULO]}) == esperado
+    assert _veiculos_da_resposta({"veiculos": [VEICULO]}) == esperado
+    assert _veiculos_da_resposta({"data": []}) == []
+    assert _veiculos_da_resposta([]) == []
+
+def test_veiculos_da_resposta_formato_desconhecido():
+    assert _veiculos_da_resposta({"items": [VEICULO]}) is None
+    assert _veiculos_da_resposta({"data": None}) is None
+    assert _veiculos_da_resposta({"data": {"veiculos": [VEICULO]}}) is None
+    assert _veiculos_da_resposta("ABC1D23") is None
+    assert _veiculos_da_resposta(None) is None
+
+def test_sincronizar_nao_apaga_veiculos_com_formato_inesperado():
+    client = FakeDetranClient({"resultado": "ok"})
+    resultado = DetranSyncPipeline(client).sincronizar("123", "u1")
+    assert resultado == {"status": STATUS_FALHA, "etapa": "get_vehicles", "error": "formato inesperado"}
+    assert client.enviados == []
+
+def test_sincronizar_envia_lista_vazia_explicita():
+    client = FakeDetranClient({"data": []})
+    assert DetranSyncPipeline(client).sincronizar("123", "u1") == {"status": STATUS_SINCRONIZADO}
+    assert client.enviados == [("u1", [])]
+
+def test_sincronizar_mantem_veiculo_sem_placa():
+    client = FakeDetranClient([VEICULO, {"id": 8, "modelo": "Uno"}])
+    assert DetranSyncPipeline(client).sincronizar("123", "u1") == {"status": STATUS_SINCRONIZADO}
+    assert [v["id"] for v in client.enviados[0][1]] == ["7", "8"]
+
+def test_sincronizar_falha_com_item_invalido():
+    client = FakeDetranClient([VEICULO, "ABC1D23"])
+    assert DetranSyncPipeline(client).sincronizar("123", "u1")["status"] == STATUS_FALHA
+    assert client.enviados == []
\ No newline at end of file
@@ -0,0 +1,43 @@
+import threading
+
+from langchain_core.outputs import Generation
+
+from app.llm.cache import PII_POLICY_NAMESPACE, DiskCompletionCache
+
+def _cache(tmp_path, **kwargs):
+    return DiskCompletionCache(str(tmp_path / 'llm.sqlite3'), ttl=60, max_bytes=10 ** 6, **kwargs)
+
+def test_lookup_e_update(tmp_path):
+    cache = _cache(tmp_path)
+    cache.update('prompt', 'modelo', [Generation(text='resposta')])
+    assert cache.lookup('prompt', 'modelo')[0].text == 'resposta'
+    assert cache.lookup('prompt', 'outro modelo') is None
+
+def test_user_id_isola_namespace(tmp_path):
+    cache = _cache(tmp_path, pii_policy=PII_POLICY_NAMESPACE)
+    prompt = "O contexto do usuário é: {'user_id': '%s'}."
+    cache.update(prompt % 'u1', 'modelo', [Generation(text='dados de u1')])
+    cache.update(prompt % 'u2', 'modelo', [Generation(text='dados de u2')])
+    cache.clear(user_id='u1')
+    assert cache.lookup(prompt % 'u1', 'modelo') is None
+    assert cache.lookup(prompt % 'u2', 'modelo')[0].text == 'dados de u2'
+
+def test_user_id_excluido_por_padrao(tmp_path):
+    cache = _cache(tmp_path)
+    cache.update('{"user_id": 42}', 'modelo', [Generation(text='x')])
+    assert cache.lookup('{"user_id": 42}', 'modelo') is None
+
+def test_contagem_de_escritas_concorrentes(tmp_path):
+    cache = _cache(tmp_path)
+
+    def gravar(i):
+        for j in range(25):
+            cache.update(f'p{i}-{j}', 'm', [Generation(text='x')])
+
+    threads = [threading.Thread(target=gravar, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # 100 escritas: duas remoções e nenhuma escrita perdida na contagem
+    assert cache._writes_since_evict == 0
\ No newline at end of file
@@ -0,0 +1,34 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.utils.metrics import metrics
+from app.utils.orgao_classifier import OrgaoClassifier, tokenize
+
+@pytest.fixture(scope='module')
+def classifier():
+    agents = {
+        nome: SimpleNamespace(role='', goal='', backstory='', tools=[])
+        for nome in ('hemoes', 'detran', 'sesa')
+    }
+    return OrgaoClassifier.from_agents(agents)
+
+def test_tokenize_agrupa_variacoes_e_remove_stopwords():
+    assert tokenize("Quero agendar os agendamentos") == ['agenda', 'agenda']
+    assert tokenize("veículos do veiculo") == ['veicul', 'veicul']
+
+@pytest.mark.parametrize('query, orgaos', [
+    ("Quero doar sangue", ['HEMOES']),
+    ("Qual a multa do meu carro?", ['DETRAN']),
+    ("Agendar consulta no posto de saúde", ['SESA']),
+    ("Bom dia", []),
+    ("Posso doar sangue? E qual a multa do meu carro?", ['DETRAN', 'HEMOES'])
+])
+def test_classify(classifier, query, orgaos):
+    assert classifier.classify(query) == orgaos
+
+def test_observe_atualiza_acuracia(classifier):
+    antes = metrics.get('roteador.SESA.acertos')
+    assert classifier.observe("marcar um exame", 'SESA')
+    assert not classifier.observe("doar sangue", 'SESA')
+    assert metrics.get('roteador.SESA.acertos') == antes + 1
\ No newline at end of file
@@ -0,0 +1,47 @@
+import time
+from email.utils import formatdate
+
+import pytest
+
+from app.clients.pacing import AdaptiveLimiter, parse_retry_after
+
+def test_parse_retry_after():
+    assert parse_retry_after({'Retry-After': '3'}) == 3.0
+    assert parse_retry_after({'Retry-After': '-1'}) == 0.0
+    assert parse_retry_after({'Retry-After': formatdate(time.time() + 30, usegmt=True)}) == pytest.approx(30, abs=2)
+    assert parse_retry_after({'Retry-After': 'amanhã'}) is None
+    assert parse_retry_after({}) is None
+
+def test_limite_cresce_quando_usado():
+    limiter = AdaptiveLimiter('teste', initial=2, max_limit=3)
+    for _ in range(20):
+        assert limiter.acquire() and limiter.acquire()
+        limiter.release(0.01)
+        limiter.release(0.01)
+    assert limiter.limit == 3
+
+def test_limite_reduz_em_sobrecarga_e_pausa_com_retry_after():
+    limiter = AdaptiveLimiter('teste', initial=10, backoff=0.5, acquire_timeout=0.05)
+    assert limiter.acquire()
+    limiter.release(None, 429, {'Retry-After': '1'})
+    assert limiter.limit == 5
+    assert limiter.paused_until > time.monotonic()
+    # Pausado: a vaga não é concedida antes do prazo de acquire
+    assert not limiter.acquire()
+
+def test_reducoes_espacadas_pela_latencia_de_referencia():
+    limiter = AdaptiveLimiter('teste', initial=16, backoff=0.5, latency_tolerance=2.0)
+    limiter.acquire()
+    limiter.release(0.5)
+    for _ in range(3):
+        limiter.acquire()
+        limiter.release(None, 503)
+    # Uma rajada de falhas dentro da mesma latência de referência reduz uma única vez
+    assert limiter.limit == 8
+
+def test_acquire_respeita_limite():
+    limiter = AdaptiveLimiter('teste', initial=1, acquire_timeout=0.05)
+    assert limiter.acquire()
+    assert not limiter.acquire()
+    limiter.release(0.01)
+    assert limiter.acquire()
\ No newline at end of file
@@ -0,0 +1,63 @@
+import json
+import threading
+import time
+
+import pytest
+
+from app.tools.parallel import ExecutarEmParaleloTool, _parse_chamadas, run_batch
+
+class FakeTool:
+    def __init__(self, name, escrita=False, duracao=0.0, eventos=None):
+        self.name = name
+        self.escrita = escrita
+        self.duracao = duracao
+        self.eventos = eventos if eventos is not None else []
+        self._lock = threading.Lock()
+
+    def _run(self, **argumentos):
+        with self._lock:
+            self.eventos.append(('inicio', self.name))
+        time.sleep(self.duracao)
+        if argumentos.get('falhar'):
+            raise RuntimeError('falhou')
+        with self._lock:
+            self.eventos.append(('fim', self.name))
+        return f"{self.name}:{argumentos.get('x')}"
+
+def test_parse_chamadas():
+    chamadas = '[{"ferramenta": "a", "argumentos": {"x": 1}}, {"ferramenta": "b"}]'
+    assert _parse_chamadas(chamadas) == [('a', {"x": 1}), ('b', {})]
+    assert _parse_chamadas({"chamadas": [{"ferramenta": "a"}]}) == [('a', {})]
+    for invalida in ('{"x": 1}', '[1]', '[{"ferramenta": "a", "argumentos": [1]}]', '"a"'):
+        with pytest.raises(ValueError):
+            _parse_chamadas(invalida)
+
+def test_leituras_em_paralelo_preservam_a_ordem():
+    tools = {nome: FakeTool(nome, duracao=0.1) for nome in ('a', 'b', 'c')}
+    results, soma, parede = run_batch(tools, [('a', {"x": 1}), ('b', {"x": 2}), ('c', {"x": 3}), ('a', {"x": 4})])
+    assert results == ['a:1', 'b:2', 'c:3', 'a:4']
+    assert soma >= 0.4 and parede < 0.3
+
+def test_escrita_e_barreira():
+    eventos = []
+    tools = {
+        'ler': FakeTool('ler', duracao=0.05, eventos=eventos),
+        'gravar': FakeTool('gravar', escrita=True, eventos=eventos)
+    }
+    run_batch(tools, [('ler', {}), ('ler', {}), ('gravar', {}), ('ler', {})])
+    inicio_escrita = eventos.index(('inicio', 'gravar'))
+    assert eventos[:inicio_escrita].count(('fim', 'ler')) == 2
+    assert eventos[inicio_escrita + 1] == ('fim', 'gravar')
+
+def test_falhas_e_ferramentas_desconhecidas():
+    results, _, _ = run_batch({'a': FakeTool('a')}, [('a', {"falhar": True}), ('x', {})])
+    assert 'Falha ao executar a' in json.loads(results[0])['error']
+    assert json.loads(results[1]) == {"error": "Ferramenta desconhecida: x"}
+
+def test_ferramenta_limita_chamadas_por_lote(monkeypatch):
+    from app.config import Config
+    monkeypatch.setattr(Config, 'TOOL_PARALLEL_MAX_CALLS', 2)
+    tool = ExecutarEmParaleloTool.for_tools([FakeTool('a')])
+    assert 'No máximo 2' in json.loads(tool._run(json.dumps([{"ferramenta": "a"}] * 3)))['error']
+    saida = tool._run(json.dumps([{"ferramenta": "a", "argumentos": {"x": 1}}]))
+    assert saida.startswith('[1] a {"x": 1}:\na:1')
\ No newline at end of file
@@ -0,0 +1,64 @@
+import pytest
+
+from app.models.records import DoacaoRecord, DoadorRecord, HorarioRecord, project_response
+from app.clients.sesa import _extrair_itens
+from app.utils.raw_response import RawResponse, invalid_json
+
+def test_iter_items_lista_pura_e_envelopada():
+    assert list(RawResponse(b' [1, {"a": 2}] ').iter_items()) == [1, {"a": 2}]
+    corpo = b'{"meta": {"total": 2}, "data": [{"id": 1}, {"id": 2}], "links": null}'
+    assert list(RawResponse(corpo).iter_items('data')) == [{"id": 1}, {"id": 2}]
+    assert list(RawResponse(b'{"data": []}').iter_items()) == []
+    assert list(RawResponse(b'{"outro": [1]}').iter_items()) == []
+
+def test_has_list():
+    assert RawResponse(b'[]').has_list()
+    assert RawResponse(b'{"meta": {}, "data": [1]}').has_list()
+    assert not RawResponse(b'{"data": {"id": 1}}').has_list()
+    assert not RawResponse(b'"texto"').has_list()
+    assert not RawResponse(b'{"data": [{"id": 1}, {"id": 2').has_list()
+
+def test_truncated():
+    assert RawResponse(b'{"data": [{"id": 1}, {"id": 2').truncated
+    assert RawResponse(b'[1, 2').truncated
+    assert not RawResponse(b'[1, 2]\n').truncated
+    assert not RawResponse(b'"texto"').truncated
+
+def test_iter_items_json_invalido():
+    with pytest.raises(ValueError):
+        list(RawResponse(b'{"data": [{"id": 1} {"id": 2}]}').iter_items())
+
+def test_json_decodifica_uma_vez():
+    raw = RawResponse(b'{"data": [1]}')
+    assert raw.json() is raw.json()
+    assert RawResponse(b'').json() == {"success": True}
+
+def test_project_response_corpo_truncado():
+    assert project_response(RawResponse(b'{"data": [{"id": 1}, {"id": 2'), DoacaoRecord) == invalid_json()
+
+def test_project_response_item_invalido():
+    corpo = b'{"data": [{"hora": "08:00"}, {"hora": "09:00",}]}'
+    assert project_response(RawResponse(corpo), HorarioRecord) == invalid_json()
+
+def test_project_response_raw():
+    corpo = b'{"data": [{"hora": "08:00", "extra": 1}, "09:00", {}]}'
+    assert project_response(RawResponse(corpo), HorarioRecord) == {
+        "data": [{"hora": "08:00", "extra": 1}, {"hora": "09:00"}, {}]
+    }
+    assert project_response(RawResponse(b'["08:00"]'), HorarioRecord) == [{"hora": "08:00"}]
+
+def test_project_response_preserva_campos_desconhecidos():
+    horarios = [{"horario": "08:00", "profissional": "Dra. Ana"}, {"data": "2024-06-03", "turno": "manhã"}]
+    assert project_response({"data": horarios}, HorarioRecord) == {"data": [
+        {"hora": "08:00", "profissional": "Dra. Ana"}, {"data": "2024-06-03", "turno": "manhã"}
+    ]}
+    doador = {"id": 4, "apto_doacao": "sim", "peso": 72, "observacoes": "retorno em 60 dias"}
+    assert project_response([doador], DoadorRecord) == [
+        {"id": 4, "apto": True, "peso": 72, "observacoes": "retorno em 60 dias"}
+    ]
+
+def test_extrair_itens_json_invalido():
+    assert _extrair_itens(RawResponse(b'[{"id": 1}, {"id": 2')) is None
+    assert _extrair_itens(RawResponse(b'[{"id": 1} {"id": 2}]')) is None
+    assert _extrair_itens(RawResponse(b'{"data": [{"id": 1}]}')) == [{"id": 1}]
+    assert _extrair_itens({"error": "x"}) == []
\ No newline at end of file
@@ -0,0 +1,17 @@
+from app.models.records import VeiculoRecord
+
+def test_veiculo_sem_placa_nao_e_descartado():
+    record = VeiculoRecord.decode({"id": 3, "modelo": "Uno"})
+    assert record is not None
+    assert record.to_dict() == {"id": "3", "plate": "", "model": "Uno", "brandLogo": ""}
+
+def test_veiculo_preserva_campos_desconhecidos():
+    item = {"id": 7, "placa": "ABC1D23", "modelo": "Gol", "renavam": "123456789", "cor": {"nome": "Prata"}}
+    assert VeiculoRecord.decode(item).to_dict() == {
+        "id": "7", "plate": "ABC1D23", "model": "Gol", "brandLogo": "",
+        "renavam": "123456789", "cor": {"nome": "Prata"}
+    }
+
+def test_veiculo_ida_e_volta_nao_perde_dados():
+    perfil = {"id": "7", "plate": "ABC1D23", "model": "Gol", "brandLogo": "vw.png", "apelido": "carro"}
+    assert VeiculoRecord.decode(perfil).to_dict() == perfil
\ No newline at end of file
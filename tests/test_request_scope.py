@@ -0,0 +1,62 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from app.utils.request_scope import RequestScope, current_scope, request_scope
+
+def test_memoize_reaproveita_resultado():
+    scope = RequestScope()
+    chamadas = []
+    for _ in range(2):
+        assert scope.memoize('ferramenta', ('1',), lambda: chamadas.append(1) or {"ok": True}) == {"ok": True}
+    assert len(chamadas) == 1
+    assert scope.metadata()['memo'] == {"hits": 1, "misses": 1}
+
+def test_memoize_nao_guarda_erros():
+    scope = RequestScope()
+    scope.memoize('ferramenta', (), lambda: {"error": "x"})
+    assert scope.results() == {}
+
+def test_invalidate_por_prefixo():
+    scope = RequestScope()
+    scope.memoize('horarios', ('u1', 'd1'), lambda: 1)
+    scope.memoize('horarios', ('u2', 'd1'), lambda: 2)
+    assert scope.invalidate('horarios', ('u1',)) == 1
+    assert list(scope.results()) == [('horarios', ('u2', 'd1'))]
+
+def test_invalidate_descarta_pre_carregamento_em_andamento():
+    scope = RequestScope()
+    liberar = threading.Event()
+    iniciado = threading.Event()
+    valores = iter(["antes da escrita", "depois da escrita"])
+
+    def ler():
+        valor = next(valores)
+        if valor == "antes da escrita":
+            iniciado.set()
+            liberar.wait(5)
+        return {"valor": valor}
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        scope.prefetch(executor, 'agendamentos', ('u1',), ler)
+        iniciado.wait(5)
+        scope.invalidate('agendamentos', ('u1',))
+        liberar.set()
+    # O pré-carregamento terminou depois da escrita: seu resultado não é memorizado nem devolvido
+    assert scope.results() == {}
+    assert scope.memoize('agendamentos', ('u1',), ler) == {"valor": "depois da escrita"}
+
+def test_leitura_iniciada_antes_de_invalidate_nao_e_memorizada():
+    scope = RequestScope()
+
+    def ler():
+        scope.invalidate('agendamentos', ('u1',))
+        return {"valor": "antigo"}
+
+    assert scope.memoize('agendamentos', ('u1',), ler) == {"valor": "antigo"}
+    assert scope.results() == {}
+
+def test_request_scope_contexto():
+    assert current_scope() is None
+    with request_scope() as scope:
+        assert current_scope() is scope
+    assert current_scope() is None
\ No newline at end of file
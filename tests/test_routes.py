@@ -0,0 +1,152 @@
+from types import SimpleNamespace
+
+import pytest
+from flask import Flask
+
+from app.clients.sesa import SesaClient
+from app.config import Config
+from app.routes.admin import admin_bp
+from app.routes.query import query_bp
+from app.routes.sesa import sesa_bp
+from app.utils.admission import AdmissionController
+from app.utils.timing import record_upstream, request_timings, timed_tool
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+    app.register_blueprint(query_bp)
+    return app.test_client()
+
+@pytest.mark.parametrize('body', [{"query": 123}, {"query": ["a"]}, {"query": "  "}, {"outro": "x"}, ["query"]])
+def test_query_invalida(client, body):
+    response = client.post('/query', json=body)
+    assert response.status_code == 400
+    assert 'query' in response.get_json()['error']
+
+class FakeRuntime:
+    def __init__(self, erro=None):
+        self.erro = erro
+
+    def run(self, orgao, query, user_context, session=None):
+        if self.erro:
+            raise self.erro
+        return {"success": True, "response": f"ok {orgao}"}
+
+def _query_app(runtime, orgaos=('DETRAN', 'SESA')):
+    app = Flask(__name__)
+    app.register_blueprint(query_bp)
+    app.classifier = SimpleNamespace(classify=lambda query: list(orgaos))
+    app.sessions = SimpleNamespace(resolve=lambda conversation_id, orgao, user_context: SimpleNamespace(id=f"c-{orgao}"))
+    app.runtime = runtime
+    app.admission = AdmissionController(max_concurrent=4, max_concurrent_por_orgao={}, max_queue=0,
+                                        queue_timeout=0.01, retry_after=1, caller_rate=(1 / 60, 2))
+    return app
+
+def test_query_multi_orgao_cobra_taxa_uma_vez():
+    client = _query_app(FakeRuntime()).test_client()
+    for _ in range(2):
+        response = client.post('/query', json={"query": "veículos e consultas"})
+        assert response.status_code == 200
+        assert response.get_json()['success']
+    assert client.post('/query', json={"query": "veículos e consultas"}).status_code == 429
+
+def test_query_erro_nao_expoe_excecao():
+    client = _query_app(FakeRuntime(erro=RuntimeError("senha=xyz")), orgaos=('SESA',)).test_client()
+    body = client.post('/query', json={"query": "consulta"}).get_json()
+    assert body['success'] is False
+    assert body['error'] == "Ocorreu um erro interno ao processar sua solicitação."
+
+class FakeSesaClient(SesaClient):
+    """Cliente da SESA sem autenticação nem rede, com um município sem unidades."""
+
+    def __init__(self):
+        self.chamadas = 0
+
+    def get_unidades(self, municipio_id, servico_id):
+        self.chamadas += 1
+        return {"data": []}
+
+@pytest.fixture
+def sesa_client():
+    app = Flask(__name__)
+    app.register_blueprint(sesa_bp)
+    sesa = FakeSesaClient()
+    app.clients = {'sesa': sesa}
+    return app.test_client(), sesa
+
+BUSCA = {"municipio_id": "1", "servico_id": "2", "data_inicio": "2024-06-03"}
+
+@pytest.mark.parametrize('extra', [
+    {"latitude": "abc", "longitude": -40.3},
+    {"latitude": -20.3},
+    {"latitude": 91, "longitude": 0},
+    {"latitude": True, "longitude": 0},
+    {"limite": "dez"},
+    {"limite": 0},
+    {"limite": 2.5},
+    {"ordenar_por": "preco"},
+    {"data_inicio": 20240603}
+])
+def test_horarios_disponiveis_parametros_invalidos(sesa_client, extra):
+    client, sesa = sesa_client
+    response = client.post('/sesa/horarios-disponiveis', json={**BUSCA, **extra})
+    assert response.status_code == 400
+    assert sesa.chamadas == 0
+
+def test_horarios_disponiveis_parametros_validos(sesa_client):
+    client, sesa = sesa_client
+    body = {**BUSCA, "latitude": "-20.3", "longitude": -40.3, "limite": "5", "ordenar_por": "distancia"}
+    response = client.post('/sesa/horarios-disponiveis', json=body)
+    assert response.status_code == 200
+    assert response.get_json() == {"success": True, "total": 0, "horarios": [], "falhas": []}
+    assert sesa.chamadas == 1
+
+class FakeSesaHorarios(SesaClient):
+    """Uma unidade com horários; cada consulta de horários registra uma chamada à SESA."""
+
+    NAME = 'sesa'
+
+    def __init__(self):
+        pass
+
+    def get_unidades(self, municipio_id, servico_id):
+        return {"data": [{"id": 1, "nome": "UBS Centro"}]}
+
+    def get_horarios(self, unidade_id, data):
+        record_upstream(self.NAME, 0.01)
+        return {"data": [{"hora": "08:00"}]}
+
+def test_busca_de_horarios_registra_tempo_da_sesa():
+    with request_timings() as timings:
+        with timed_tool('sesa_buscar_horarios_disponiveis'):
+            result = FakeSesaHorarios().buscar_horarios_disponiveis("1", "2", "2024-06-03", "2024-06-04")
+    assert result['total'] == 2
+    assert timings.to_dict()['upstream']['sesa']['chamadas'] == 2
+    assert timings.tools[0]['upstream_ms'] == pytest.approx(20.0)
+
+class FakeProfiler:
+    running = False
+    sample_rate = 0.05
+
+    def start(self, taxa=None):
+        self.running = True
+        self.sample_rate = taxa or self.sample_rate
+
+@pytest.fixture
+def admin_client(monkeypatch):
+    monkeypatch.setattr(Config, 'ADMIN_TOKEN', 'segredo')
+    app = Flask(__name__)
+    app.register_blueprint(admin_bp)
+    app.profiler = FakeProfiler()
+    return app.test_client()
+
+@pytest.mark.parametrize('taxa', ["abc", [0.1], True, 0, 1.5, "nan"])
+def test_profiling_taxa_invalida(admin_client, taxa):
+    response = admin_client.post('/admin/profiling', json={"acao": "iniciar", "taxa": taxa},
+                                 headers={'X-Admin-Token': 'segredo'})
+    assert response.status_code == 400
+
+def test_profiling_taxa_valida(admin_client):
+    response = admin_client.post('/admin/profiling', json={"acao": "iniciar", "taxa": "0.2"},
+                                 headers={'X-Admin-Token': 'segredo'})
+    assert response.get_json() == {"ativo": True, "taxa_amostragem": 0.2}
\ No newline at end of file
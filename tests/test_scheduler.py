@@ -0,0 +1,59 @@
+import pytest
+
+from app.utils.scheduler import (CLASSE_CATALOGO, CLASSE_CONSULTA_PESSOAL, CLASSE_TRANSACIONAL,
+                                 WeightedFairQueue, classificar_requisicao)
+
+@pytest.mark.parametrize('query', [
+    "Quero marcar uma consulta",
+    "agende um exame para amanhã",
+    "Reservar horário na unidade de Vitória",
+    "cancela meu agendamento",
+    "Preciso desmarcar a consulta",
+    "remarque para sexta",
+    "atualize meus veículos",
+    "já agendei, quero cancelar"
+])
+def test_transacional(query):
+    assert classificar_requisicao(query) == CLASSE_TRANSACIONAL
+
+@pytest.mark.parametrize('query', [
+    "Qual a marca do carro?",
+    "marcas de carro",
+    "Quais agendamentos existem em Vitória?",
+    "listar horarios de agendamento",
+    "vagas em março",
+    "como funciona a reserva de horários"
+])
+def test_catalogo(query):
+    assert classificar_requisicao(query) == CLASSE_CATALOGO
+
+def test_consulta_pessoal():
+    assert classificar_requisicao("Qual a marca do meu carro?") == CLASSE_CONSULTA_PESSOAL
+    assert classificar_requisicao("horários livres", {"cpf": "123"}) == CLASSE_CONSULTA_PESSOAL
+
+def test_fila_ponderada_respeita_pesos():
+    fila = WeightedFairQueue({'a': 3.0, 'b': 1.0})
+    itens = [('a', i) for i in range(6)] + [('b', i) for i in range(2)]
+    for item in itens:
+        fila.push(item, item[0])
+    ordem = [fila.pop(fila)[0] for _ in range(len(itens))]
+    assert ordem[:4].count('a') == 3
+    assert fila.pop(fila) is None
+
+def test_fila_zera_etiquetas_ao_esvaziar():
+    fila = WeightedFairQueue({'a': 1.0, 'b': 1.0})
+    for i in range(5):
+        fila.push(('a', i), 'a')
+    while fila.pop(fila) is not None:
+        pass
+    # Depois de esvaziar, 'a' não carrega o atraso da rajada anterior: empata com 'b' e sai
+    # pela ordem de chegada
+    fila.push(('a', 5), 'a')
+    fila.push(('b', 0), 'b')
+    assert fila.pop(fila) == ('a', 5)
+
+def test_fila_remove():
+    fila = WeightedFairQueue({'a': 1.0})
+    fila.push('x', 'a')
+    fila.remove('x')
+    assert len(fila) == 0 and fila.pop(['x']) is None
\ No newline at end of file
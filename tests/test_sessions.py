@@ -0,0 +1,35 @@
+from app.utils.sessions import SessionStore
+
+def _store():
+    return SessionStore(ttl=60, max_entries=10)
+
+def test_retoma_sessao_do_mesmo_titular():
+    store = _store()
+    session = store.resolve(None, 'SESA', {"cpf": "123.456.789-00"})
+    assert store.resolve(session.id, 'SESA', {"cpf": "12345678900"}) is session
+
+def test_nao_retoma_sessao_de_outro_titular_ou_sem_titular():
+    store = _store()
+    session = store.resolve(None, 'SESA', {"cpf": "12345678900"})
+    assert store.resolve(session.id, 'SESA', {"cpf": "99999999999"}) is not session
+    assert store.resolve(session.id, 'SESA', None) is not session
+    assert store.resolve(session.id, 'SESA', {"nome": "Maria"}) is not session
+
+def test_sessao_anonima_e_vinculada_ao_primeiro_titular():
+    store = _store()
+    session = store.resolve(None, 'DETRAN')
+    assert store.resolve(session.id, 'DETRAN', {"user_id": "u1"}) is session
+    assert session.principal == "user:u1"
+    assert store.resolve(session.id, 'DETRAN') is not session
+
+def test_sessao_de_outro_orgao():
+    store = _store()
+    session = store.resolve(None, 'SESA')
+    assert store.resolve(session.id, 'DETRAN') is not session
+
+def test_credenciais_nao_ficam_na_sessao():
+    session = _store().resolve(None, 'SESA', {"cpf": "123"})
+    merged = session.merge_context({"cpf": "123", "user_token": "segredo", "Authorization": "Bearer x"})
+    assert merged["user_token"] == "segredo"
+    assert session.user_context == {"cpf": "123"}
+    assert session.merge_context({"cpf": "123"}) == {"cpf": "123"}
\ No newline at end of file